@@ -0,0 +1,155 @@
+"""Interface of the backends that collect network adapter information"""
+
+from typing import NamedTuple
+
+
+class Route(NamedTuple):
+    """IPv4 route"""
+    index: int  # Network adapter index
+    destination: str  # Destination prefix (e.g., "0.0.0.0/0")
+    next_hop: str  # Gateway ("0.0.0.0" if the destination is on-link)
+    route_metric: int
+    interface_metric: int
+
+    @property
+    def metric(self) -> int:
+        """Metric used to choose between routes (the lowest wins)."""
+        return self.route_metric + self.interface_metric
+
+
+class AdapterBackend:
+    """Backend of NetworkAdapters. get_info() and get_adapter() return
+    AdapterInfo records; the configuration methods are optional and raise
+    NotImplementedError if the platform does not support them."""
+
+    enconding = "utf-8"  # Enconding of the command outputs
+
+    def __init__(self) -> None:
+        self.failed_queries = {}  # Queries of the last get_info() that failed
+
+    def disable_adapter(self, alias: str) -> None:
+        """Disable the given network adapter.
+
+        Args:
+            alias (str): Network adapter alias.
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def enable_adapter(self, alias: str) -> None:
+        """Enable the given network adapter.
+
+        Args:
+            alias (str): Network adapter alias.
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def get_adapter(self, index: int):
+        """Get the information about a network adapter.
+
+        Args:
+            index (int): Network adapter index.
+
+        Raises:
+            KeyError: There is no network adapter for the given index.
+
+        Returns:
+            AdapterInfo: Information about the network adapter.
+        """
+        adapters = self.get_info()
+        if index not in adapters:
+            raise KeyError("Invalid network adapter index")
+
+        return adapters[index]
+
+    def get_arp_table(self, ip_netap: str) -> list:
+        """Get the ARP table of a network adapter.
+
+        Args:
+            ip_netap (str): Network adapter IP.
+
+        Returns:
+            list: Entries ({"iaddr": ..., "phyaddr": ..., "itype": ...}).
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def get_info(self) -> dict:
+        """Get the information about the network adapters.
+
+        Returns:
+            dict: AdapterInfo records by network adapter index, sorted.
+        """
+        raise NotImplementedError
+
+    def iter_routes(self, index: int = None):
+        """Get the IPv4 route table, one route at a time, without keeping
+        it in memory.
+
+        Args:
+            index (int, optional): Only the routes of this network adapter.
+                Defaults to None (all).
+
+        Yields:
+            Route: Each route.
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def reset_def_gateway(self, index: int) -> None:
+        """Remove the default gateway for a given network adapter.
+
+        Args:
+            index (int): Network adapter index.
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def reset_dns_servers(self, index: int) -> None:
+        """Remove the DNS servers set for a given network adapter.
+
+        Args:
+            index (int): Network adapter index.
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def reset_ip(self, index: int) -> None:
+        """Remove the ip address for a given network adapter.
+
+        Args:
+            index (int): Network adapter index.
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def set_def_gateway(self, index: int, ip: str) -> None:
+        """Set the default gateway for a given network adapter.
+
+        Args:
+            index (int): Network adapter index.
+            ip (str): Address to be set.
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def set_dns_servers(self, index: int, pref_dns: str, alt_dns: str) -> None:
+        """Set the DNS servers for a given network adapter.
+
+        Args:
+            index (int): Network adapter index.
+            pref_dns (str): Address for the preferred DNS server.
+            alt_dns (str): Address for the alternate DNS server.
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def set_ip_mask(self, index: int, ip: str, mask: str) -> None:
+        """Set the address and subnet mask for a given network adapter.
+
+        Args:
+            index (int): Network adapter index.
+            ip (str): Address to be set.
+            mask (str): Subnet mask to be set.
+        """
+        raise NotImplementedError("Not supported by this backend")
+
+    def set_net_dhcp(self, index: int) -> None:
+        """Remove the default gateway and set DHCP for a given network adapter.
+
+        Args:
+            index (int): Network adapter index.
+        """
+        raise NotImplementedError("Not supported by this backend")
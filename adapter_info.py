@@ -0,0 +1,206 @@
+"""Compact record with the information of a network adapter"""
+
+from collections.abc import Mapping
+from typing import NamedTuple
+
+import ipv4
+
+
+class IPAddress(NamedTuple):
+    """IPv4 address assigned to a network adapter"""
+    ip_int: int  # Packed address
+    prefix_length: int = None
+    prefix_origin: str = ""  # "Manual", "Dhcp", "WellKnown"...
+    suffix_origin: str = ""
+
+    @property
+    def ip(self) -> str:
+        """IP address."""
+        return ipv4.unpack(self.ip_int)
+
+    @property
+    def manual(self) -> bool:
+        """The address was assigned manually."""
+        return "Manual" in (self.prefix_origin, self.suffix_origin)
+
+    @property
+    def mask(self) -> str:
+        """Subnet mask."""
+        return ipv4.subnet_mask(self.prefix_length)
+
+    @property
+    def network(self) -> tuple:
+        """First and last address of the subnet, as integers."""
+        return ipv4.network(self.ip_int, self.prefix_length)
+
+
+def sort_addresses(addresses) -> tuple:
+    """Put the primary address first: the first manual one (Issue #4) or,
+    if there is none, the first one. The rest keep their order.
+
+    Args:
+        addresses (Iterable[IPAddress]): Addresses of a network adapter.
+
+    Returns:
+        tuple: Addresses, primary first.
+    """
+    addresses = tuple(addresses)
+    primary = next((n for n, addr in enumerate(addresses) if addr.manual), 0)
+
+    return addresses[primary:primary + 1] + addresses[:primary] + addresses[
+        primary + 1:]
+
+
+class AdapterInfo(Mapping):
+    """Information about a network adapter. Addresses are stored as
+    integers and converted to text when accessed. ip, prefix_length and
+    the origins are those of the primary address (the first of
+    addresses). It can also be read like the dictionaries previously
+    returned by get_info() (info["ip"], info.keys(), ...)."""
+
+    __slots__ = ("index", "name", "desc", "status", "mac", "ip_int",
+                 "prefix_length", "prefix_origin", "suffix_origin",
+                 "gateway_int", "pref_dns_int", "alt_dns_int", "addresses")
+
+    # Keys of the dictionary view
+    KEYS = ("prefix_origin", "pref_dns", "alt_dns", "gateway", "status",
+            "mac", "ip", "suffix_origin", "name", "desc", "mask",
+            "prefix_length", "addresses")
+
+    # Compared by value but mutable (e.g., set_addresses()), so unhashable
+    __hash__ = None
+
+    def __init__(self, index: int, name: str = "", desc: str = "",
+                 status: str = "", mac: str = "", ip: str = "",
+                 prefix_length: int = None, prefix_origin: str = "",
+                 suffix_origin: str = "", gateway: str = "",
+                 pref_dns: str = "", alt_dns: str = "",
+                 addresses=None) -> None:
+        self.index = index
+        self.name = name
+        self.desc = desc
+        self.status = status
+        self.mac = mac
+        self.ip_int = ipv4.pack(ip)
+        self.prefix_length = prefix_length
+        self.prefix_origin = prefix_origin
+        self.suffix_origin = suffix_origin
+        self.gateway_int = ipv4.pack(gateway)
+        self.pref_dns_int = ipv4.pack(pref_dns)
+        self.alt_dns_int = ipv4.pack(alt_dns)
+        # All the IPv4 addresses, primary first
+        self.addresses = ()
+        if addresses is not None:
+            self.set_addresses(addresses)
+        elif self.ip_int is not None:
+            self.addresses = (IPAddress(self.ip_int, prefix_length,
+                                        prefix_origin, suffix_origin),)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, AdapterInfo):
+            return self.astuple() == other.astuple()
+        return Mapping.__eq__(self, other)
+
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+
+        if key == "prefix_length":
+            return "" if self.prefix_length is None else self.prefix_length
+
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self) -> int:
+        return len(self.KEYS)
+
+    def __repr__(self) -> str:
+        return (f"AdapterInfo(index={self.index}, name={self.name!r},"
+                f" status={self.status!r}, ip={self.ip!r},"
+                f" prefix_length={self.prefix_length})")
+
+    @property
+    def alt_dns(self) -> str:
+        """Alternate DNS server."""
+        return ipv4.unpack(self.alt_dns_int)
+
+    def astuple(self) -> tuple:
+        """Get all the fields (addresses as integers).
+
+        Returns:
+            tuple: Values in the order of __slots__.
+        """
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    @classmethod
+    def from_dict(cls, index: int, info: dict) -> "AdapterInfo":
+        """Create the record from a dictionary with the keys of KEYS.
+
+        Args:
+            index (int): Network adapter index.
+            info (dict): Network adapter information.
+
+        Returns:
+            AdapterInfo: Network adapter record.
+        """
+        prefix_length = info.get("prefix_length", "")
+
+        return cls(index=index,
+                   name=info.get("name", ""),
+                   desc=info.get("desc", ""),
+                   status=info.get("status", ""),
+                   mac=info.get("mac", ""),
+                   ip=info.get("ip", ""),
+                   prefix_length=None if prefix_length == "" else int(
+                       prefix_length),
+                   prefix_origin=info.get("prefix_origin", ""),
+                   suffix_origin=info.get("suffix_origin", ""),
+                   gateway=info.get("gateway", ""),
+                   pref_dns=info.get("pref_dns", ""),
+                   alt_dns=info.get("alt_dns", ""),
+                   addresses=info.get("addresses"))
+
+    @property
+    def gateway(self) -> str:
+        """Default gateway."""
+        return ipv4.unpack(self.gateway_int)
+
+    @property
+    def ip(self) -> str:
+        """IP address."""
+        return ipv4.unpack(self.ip_int)
+
+    @property
+    def mask(self) -> str:
+        """Subnet mask."""
+        return ipv4.unpack(self.mask_int)
+
+    @property
+    def mask_int(self):
+        """Subnet mask as an integer (None if there is no prefix length)."""
+        if self.prefix_length is None:
+            return None
+
+        return ipv4.MASKS[self.prefix_length]
+
+    @property
+    def pref_dns(self) -> str:
+        """Preferred DNS server."""
+        return ipv4.unpack(self.pref_dns_int)
+
+    def set_addresses(self, addresses) -> None:
+        """Set the IPv4 addresses and take the primary one (see
+        sort_addresses()) as ip, prefix_length and origins.
+
+        Args:
+            addresses (Iterable[IPAddress]): Addresses of the network
+                adapter.
+        """
+        self.addresses = sort_addresses(addresses)
+        primary = self.addresses[0] if self.addresses else IPAddress(None)
+        self.ip_int = primary.ip_int
+        self.prefix_length = primary.prefix_length
+        self.prefix_origin = primary.prefix_origin
+        self.suffix_origin = primary.suffix_origin
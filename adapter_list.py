@@ -0,0 +1,372 @@
+"""Virtualized list of network adapter cards
+
+Only the cards of the rows in or near the viewport are Tk widgets, placed
+as windows of a canvas. The scroll region is computed from a model of the
+row heights, so hundreds of network adapters (e.g., the virtual switch
+ports of a Hyper-V host) do not create hundreds of cards. The cards of
+the rows that leave the viewport are kept in a pool (CardPool) and
+rebound to the rows that enter it, so scrolling and refreshing reuse the
+same Tk widgets, tooltips and menus instead of creating new ones.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+import tkinter as tk
+from typing import Callable
+
+from adapter_info import AdapterInfo
+from net_adap_widget import NetAdapWidget
+from snapshot_diff import SnapshotDiff
+
+ROW_HEIGHT = 170  # Estimated height of a row (pixels) until one is measured
+PAD_X = 10  # Space at the left of the cards (pixels)
+PAD_Y = 10  # Space above and below each card (pixels)
+OVERSCAN = 2  # Rows created above and below the viewport
+
+
+class CardPool:
+    """Cards that are not shown. A card is rebound to another network
+    adapter instead of being destroyed and created again."""
+
+    def __init__(self, factory: Callable) -> None:
+        # Creates a card, called with the AdapterInfo and the bootstyle
+        self.factory = factory
+        self.created = 0  # Cards created by the factory
+        self.reused = 0  # Cards rebound to another network adapter
+        self._free = []  # Cards ready to be rebound
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def acquire(self, info: AdapterInfo,
+                bootstyle: str = "default") -> NetAdapWidget:
+        """Get a card for a network adapter: a free card rebound to it or,
+        if there is none, a new one.
+
+        Args:
+            info (AdapterInfo): Network adapter information.
+            bootstyle (str, optional): ttk.Labelframe border style.
+                Defaults to "default".
+
+        Returns:
+            NetAdapWidget: Card showing the network adapter.
+        """
+        if self._free:
+            card = self._free.pop()
+            card.rebind(info, bootstyle=bootstyle)
+            self.reused += 1
+            return card
+
+        self.created += 1
+
+        return self.factory(info, bootstyle)
+
+    def release(self, card: NetAdapWidget) -> None:
+        """Keep a card that is no longer shown.
+
+        Args:
+            card (NetAdapWidget): Card to rebind later.
+        """
+        self._free.append(card)
+
+
+class RowModel:
+    """Heights of the rows of the list, by key (network adapter index).
+    Rows that have not been measured yet use the height of the first one
+    measured."""
+
+    def __init__(self, estimate: int = ROW_HEIGHT) -> None:
+        self.estimate = estimate  # Height of the rows not measured
+        self._keys = []  # Key of each row, in order
+        self._heights = {}  # Key -> measured height
+        self._offsets = [0]  # Top of each row and, last, the total height
+        self._measured = False  # The estimate comes from a measured row
+        self._dirty = False  # The offsets must be computed again
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @property
+    def height(self) -> int:
+        """Total height of the rows."""
+        self._update()
+        return self._offsets[-1]
+
+    def key(self, row: int):
+        """Get the key of a row.
+
+        Args:
+            row (int): Row.
+
+        Returns:
+            Hashable: Key of the row.
+        """
+        return self._keys[row]
+
+    def offset(self, row: int) -> int:
+        """Get the top of a row.
+
+        Args:
+            row (int): Row.
+
+        Returns:
+            int: Pixels from the top of the list.
+        """
+        self._update()
+        return self._offsets[row]
+
+    def set_height(self, key, height: int) -> bool:
+        """Set the measured height of a row.
+
+        Args:
+            key (Hashable): Key of the row.
+            height (int): Height in pixels.
+
+        Returns:
+            bool: True if the offsets of the rows have changed.
+        """
+        if not self._measured:
+            self._measured = True
+            if height != self.estimate:
+                self.estimate = height
+                self._dirty = True
+
+        if self._heights.get(key, self.estimate) != height:
+            self._dirty = True
+        self._heights[key] = height
+
+        return self._dirty
+
+    def set_keys(self, keys) -> None:
+        """Set the rows of the list. The heights of the keys that are
+        no longer in the list are forgotten.
+
+        Args:
+            keys (Iterable): Key of each row, in order.
+        """
+        self._keys = list(keys)
+        present = set(self._keys)
+        self._heights = {key: height for key, height in self._heights.items()
+                         if key in present}
+        self._dirty = True
+
+    def _update(self) -> None:
+        """Compute the offsets of the rows if any height has changed."""
+        if self._dirty:
+            self._offsets = [0] + list(accumulate(
+                self._heights.get(key, self.estimate) for key in self._keys))
+            self._dirty = False
+
+    def visible(self, top: float, bottom: float) -> range:
+        """Get the rows that intersect a vertical span of the list.
+
+        Args:
+            top (float): Top of the span (pixels).
+            bottom (float): Bottom of the span (pixels).
+
+        Returns:
+            range: Rows in the span.
+        """
+        self._update()
+        count = len(self._keys)
+        first = min(max(bisect_right(self._offsets, top) - 1, 0), count)
+        last = min(max(bisect_right(self._offsets, bottom), first), count)
+
+        return range(first, last)
+
+
+class AdapterList:
+    """Cards of the network adapters in a canvas. Only the cards of the
+    visible rows (plus OVERSCAN above and below) exist; the rest are
+    drawn as they are scrolled into view."""
+
+    def __init__(self, canvas: tk.Canvas, scrollbar=None,
+                 disabled: bool = False, overscan: int = OVERSCAN) -> None:
+        self.canvas = canvas
+        self.scrollbar = scrollbar  # Updated when the view changes
+        self.disabled = disabled  # Cards without configuration (no admin)
+        self.overscan = overscan
+        self.adapters = {}  # AdapterInfo by network adapter index, in order
+        self.rows = RowModel()
+        self.pool = CardPool(self._create_card)  # Cards not shown
+        self._cards = {}  # Network adapter index -> card shown
+        self._windows = {}  # Card -> canvas window
+        self._new = set()  # Indexes of the network adapters highlighted
+        self._render_id = None  # Pending render (after_idle)
+        self._region = None  # Scroll region set in the canvas
+
+        canvas.configure(yscrollcommand=self._on_scroll)
+        canvas.bind("<Configure>", lambda _: self.schedule_render(), add="+")
+
+    def __len__(self) -> int:
+        return len(self.adapters)
+
+    def _acquire(self, info: AdapterInfo) -> NetAdapWidget:
+        """Show a card for a network adapter, taken from the pool.
+
+        Args:
+            info (AdapterInfo): Network adapter information.
+
+        Returns:
+            NetAdapWidget: Card showing the network adapter.
+        """
+        card = self.pool.acquire(
+            info, "primary" if info.index in self._new else "default")
+        self.canvas.itemconfigure(self._windows[card], state="normal")
+
+        return card
+
+    def cards(self) -> dict:
+        """Get the cards shown.
+
+        Returns:
+            dict: NetAdapWidget by network adapter index.
+        """
+        return dict(self._cards)
+
+    def _create_card(self, info: AdapterInfo,
+                     bootstyle: str) -> NetAdapWidget:
+        """Create a card and its canvas window (factory of the pool).
+
+        Args:
+            info (AdapterInfo): Network adapter information.
+            bootstyle (str): ttk.Labelframe border style.
+
+        Returns:
+            NetAdapWidget: New card.
+        """
+        card = NetAdapWidget.from_info(info, disabled=self.disabled)
+        card.create(frame=self.canvas, bootstyle=bootstyle)
+        card.on_change = self._on_card_change
+        card.labelframe.bind(
+            "<Configure>",
+            lambda event, c=card: self._on_card_resize(c, event.height),
+            add="+")
+        self._windows[card] = self.canvas.create_window(
+            PAD_X, 0, window=card.labelframe, anchor="nw")
+
+        return card
+
+    def _on_card_change(self, info: AdapterInfo) -> None:
+        """Keep the information shown by a card after a change applied
+        from it (e.g., a new IP address).
+
+        Args:
+            info (AdapterInfo): Network adapter information.
+        """
+        if info.index in self.adapters:
+            self.adapters[info.index] = info
+
+    def _on_card_resize(self, card: NetAdapWidget, height: int) -> None:
+        """Measure the row of a card when its size changes (e.g., the
+        secondary IP addresses are expanded).
+
+        Args:
+            card (NetAdapWidget): Card resized.
+            height (int): New height of the card (pixels).
+        """
+        if self._cards.get(card.index) is not card:
+            return
+
+        if self.rows.set_height(card.index, height + 2 * PAD_Y):
+            self.schedule_render()
+
+    def _on_scroll(self, first: str, last: str) -> None:
+        """Update the scrollbar and draw the rows scrolled into view.
+
+        Args:
+            first (str): Fraction of the list above the view.
+            last (str): Fraction of the list above the bottom of the view.
+        """
+        if self.scrollbar is not None:
+            self.scrollbar.set(first, last)
+        self.schedule_render()
+
+    def _release(self, index: int) -> None:
+        """Hide the card of a network adapter and keep it in the pool.
+
+        Args:
+            index (int): Network adapter index.
+        """
+        card = self._cards.pop(index)
+        self.canvas.itemconfigure(self._windows[card], state="hidden")
+        self.pool.release(card)
+
+    def render(self) -> None:
+        """Show the cards of the visible rows, reusing those of the rows
+        that are no longer visible, and update the scroll region."""
+        self._render_id = None
+
+        width, height = self._view_size()
+        region = (0, 0, width, self.rows.height)
+        if region != self._region:
+            self._region = region
+            self.canvas.configure(scrollregion=region)
+
+        top = self.canvas.canvasy(0)
+        bottom = top + height
+        rows = self.rows.visible(top, bottom)
+        first = max(rows.start - self.overscan, 0)
+        last = min(rows.stop + self.overscan, len(self.rows))
+
+        wanted = {self.rows.key(row) for row in range(first, last)}
+        for index in [index for index in self._cards if index not in wanted]:
+            self._release(index)
+
+        for row in range(first, last):
+            index = self.rows.key(row)
+            card = self._cards.get(index)
+            if card is None:
+                card = self._cards[index] = self._acquire(self.adapters[index])
+            self.canvas.coords(self._windows[card], PAD_X,
+                               self.rows.offset(row) + PAD_Y)
+
+    def schedule_render(self) -> None:
+        """Render the list once the pending events have been handled."""
+        if self._render_id is None:
+            self._render_id = self.canvas.after_idle(self.render)
+
+    def update(self, adapters: dict, diff: SnapshotDiff = None) -> None:
+        """Show a new snapshot of the network adapters. Only the cards of
+        the changed network adapters are updated; the added ones are
+        highlighted.
+
+        Args:
+            adapters (dict): AdapterInfo by network adapter index, in
+                order.
+            diff (SnapshotDiff, optional): Differences with the snapshot
+                shown. Defaults to None (everything is new and nothing
+                is highlighted).
+        """
+        if diff is None:
+            diff = SnapshotDiff(added=[], removed=list(self._cards),
+                                changed={})
+
+        self.adapters = dict(adapters)
+        self._new = set(diff.added)
+
+        for index in diff.removed:
+            if index in self._cards:
+                self._release(index)
+
+        for index, card in self._cards.items():
+            if index in diff.changed:
+                card.update_widgets(self.adapters[index])
+            card.set_bootstyle("primary" if index in self._new
+                               else "default")
+
+        self.rows.set_keys(self.adapters)
+        self.render()
+
+    def _view_size(self) -> tuple:
+        """Get the size of the canvas: the requested one until the canvas
+        is shown (e.g., at startup).
+
+        Returns:
+            tuple: Width and height in pixels.
+        """
+        if self.canvas.winfo_ismapped():
+            return (self.canvas.winfo_width(), self.canvas.winfo_height())
+
+        return (int(self.canvas.cget("width")),
+                int(self.canvas.cget("height")))
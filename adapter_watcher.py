@@ -0,0 +1,212 @@
+"""Watch network adapter changes and notify them in batches"""
+
+import base64
+from concurrent.futures import CancelledError
+import queue
+import sys
+import threading
+from time import monotonic
+import traceback
+from typing import Callable
+
+from convergence import backoff_delays
+import execution
+from powershell import POWERSHELL
+
+DEBOUNCE = 1.0  # Seconds without events before notifying
+MAX_DELAY = 5.0  # Maximum seconds between the first event and the notice
+EVENT_KINDS = ("adapter", "ip", "route")
+POLL_INTERVAL = 10  # Seconds between WMI checks of adapters and addresses
+RESTART_DELAY = 1.0  # Seconds before restarting a source that has ended
+RESTART_BACKOFF = 2  # Factor applied to the delay after each restart
+MAX_RESTART_DELAY = 300.0  # Maximum seconds before restarting a source
+STABLE_TIME = 60.0  # Seconds a source must run to reset the restart delay
+
+# Subscribes to the changes of adapters, IP addresses and routes and writes
+# a line with the kind of each change. WMI has no events of its own for
+# adapters and addresses, so it checks them every $interval seconds (set
+# before the script); route changes are reported without polling.
+WATCH_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+$classes = @{adapter = 'MSFT_NetAdapter'; ip = 'MSFT_NetIPAddress'}
+foreach ($kind in $classes.Keys) {
+    $query = "SELECT * FROM __InstanceOperationEvent WITHIN $interval " +
+             "WHERE TargetInstance ISA '" + $classes[$kind] + "'"
+    Register-CimIndicationEvent -Namespace root/StandardCimv2 `
+        -Query $query -SourceIdentifier $kind | Out-Null
+}
+Register-CimIndicationEvent -Namespace root/cimv2 `
+    -ClassName Win32_IP4RouteTableEvent -SourceIdentifier route | Out-Null
+while ($true) {
+    $change = Wait-Event
+    [Console]::Out.WriteLine($change.SourceIdentifier)
+    [Console]::Out.Flush()
+    Remove-Event -EventIdentifier $change.EventIdentifier
+}
+"""
+
+
+def watch_command(interval: int = POLL_INTERVAL) -> list:
+    """Get the command of a hidden PowerShell writing the change events.
+
+    Args:
+        interval (int, optional): Seconds between the checks of adapters
+            and addresses. Defaults to POLL_INTERVAL.
+
+    Returns:
+        list: Program and arguments.
+    """
+    script = f"$interval = {int(interval)}\n" + WATCH_SCRIPT
+    encoded = base64.b64encode(script.encode("utf-16-le")).decode()
+
+    return [POWERSHELL, "-NoLogo", "-NoProfile", "-NonInteractive",
+            "-EncodedCommand", encoded]
+
+
+class EventSource:
+    """Source of network change events. Iterating it blocks and yields
+    the kind of each change ("adapter", "ip" or "route") until the source
+    ends or is closed."""
+
+    def __iter__(self):
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Stop the source, ending the iteration."""
+
+
+class PowerShellEventSource(EventSource):
+    """Change events from CIM indications in a long-running PowerShell.
+    The process is started by the execution layer, so it is killed with
+    its tree when the source is closed or the application exits. Once
+    closed, iterating the source yields nothing."""
+
+    def __init__(self, interval: int = POLL_INTERVAL) -> None:
+        self.interval = interval
+        self._cancel = None  # Cancellation of the running process
+        self._closed = False
+
+    def __iter__(self):
+        self._cancel = execution.CancelToken()
+        cancel = self._cancel
+        if self._closed:
+            return
+
+        try:
+            for line in execution.stream(watch_command(self.interval),
+                                         cancel=cancel):
+                kind = line.decode(errors="ignore").strip()
+                if kind in EVENT_KINDS:
+                    yield kind
+        except CancelledError:
+            pass
+
+    def close(self) -> None:
+        self._closed = True
+        if self._cancel is not None:
+            self._cancel.cancel()
+
+
+class AdapterWatcher:
+    """Read the events of a source in the background and notify them once
+    the burst is over: after DEBOUNCE seconds without events, or MAX_DELAY
+    seconds after the first one."""
+
+    def __init__(self, callback: Callable, source: EventSource = None,
+                 debounce: float = DEBOUNCE,
+                 max_delay: float = MAX_DELAY) -> None:
+        # Called from the watcher thread with the set of kinds of change
+        self.callback = callback
+        self.source = source if source else PowerShellEventSource()
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.restarts = 0  # Times the source has been started again
+        self._events = queue.Queue()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _notify(self) -> None:
+        """Group the queued events and call the callback for each burst."""
+        pending = set()
+        first = last = 0
+        while not self._stop.is_set():
+            timeout = None
+            if pending:
+                timeout = max(0, min(last + self.debounce,
+                                     first + self.max_delay) - monotonic())
+
+            try:
+                kind = self._events.get(timeout=timeout)
+            except queue.Empty:
+                kind = ""
+
+            if kind:
+                if not pending:
+                    first = monotonic()
+                pending.add(kind)
+                last = monotonic()
+                continue
+
+            if pending and not self._stop.is_set():
+                try:
+                    self.callback(pending)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    traceback.print_exc()
+                pending = set()
+
+            if kind is None:  # The source has ended
+                break
+
+    def _read(self) -> None:
+        """Move the events of the source to the queue. If the source ends
+        or cannot be started, it is started again after a delay that grows
+        while it keeps failing."""
+        delays = backoff_delays(first=RESTART_DELAY, factor=RESTART_BACKOFF,
+                                maximum=MAX_RESTART_DELAY)
+        while not self._stop.is_set():
+            start = monotonic()
+            reason = "it has ended"
+            try:
+                for kind in self.source:
+                    if self._stop.is_set():
+                        break
+                    self._events.put(kind)
+            except (OSError, ValueError) as err:
+                reason = f"it has failed ({err})"
+
+            if self._stop.is_set():
+                break
+
+            if monotonic() - start >= STABLE_TIME:
+                delays = backoff_delays(first=RESTART_DELAY,
+                                        factor=RESTART_BACKOFF,
+                                        maximum=MAX_RESTART_DELAY)
+            delay = next(delays)
+            print(f"Network changes are not being watched: {reason}."
+                  f" Restarting in {delay:g} s", file=sys.stderr)
+            if self._stop.wait(delay):
+                break
+            self.restarts += 1
+
+        self._events.put(None)
+
+    def is_alive(self) -> bool:
+        """Check if the watcher is running.
+
+        Returns:
+            bool: True if it is running.
+        """
+        return any(th.is_alive() for th in self._threads)
+
+    def start(self) -> None:
+        """Start reading and notifying events in background threads."""
+        self._stop.clear()
+        self._threads = [
+            execution.start_thread(self._read, name="watcher-read"),
+            execution.start_thread(self._notify, name="watcher-notify")]
+
+    def stop(self) -> None:
+        """Stop the watcher and its source."""
+        self._stop.set()
+        self.source.close()
+        self._events.put(None)
@@ -0,0 +1,79 @@
+"""Find the network adapter that owns an IPv4 address or a subnet"""
+
+from bisect import bisect_right
+
+import ipv4
+
+
+class AddressIndex:
+    """Index of the IPv4 addresses of the network adapters (result of
+    get_info()): a dictionary from address to adapter and the subnets
+    sorted by first address, so that the adapter of any address is found
+    with a binary search.
+
+    Subnets are nested or disjoint, so each one keeps the position of the
+    smallest subnet that contains it. If several adapters have the same
+    subnet, the one with the lowest index (or its primary address) wins.
+    """
+
+    def __init__(self, adapters: dict) -> None:
+        self._owners = {}  # Address -> network adapter index
+        subnets = {}  # (first, last) -> network adapter index
+        for index in sorted(adapters):
+            for addr in adapters[index].addresses:
+                self._owners.setdefault(addr.ip_int, index)
+                if addr.prefix_length is not None:
+                    subnets.setdefault(addr.network, index)
+
+        # Sorted by first address and, if equal, largest subnet first
+        ordered = sorted(subnets, key=lambda net: (net[0], -net[1]))
+        self._firsts = [first for first, _ in ordered]
+        self._lasts = [last for _, last in ordered]
+        self._indexes = [subnets[net] for net in ordered]
+        self._parents = []  # Position of the enclosing subnet (-1 if none)
+        stack = []
+        for pos, (first, _) in enumerate(ordered):
+            while stack and self._lasts[stack[-1]] < first:
+                stack.pop()
+            self._parents.append(stack[-1] if stack else -1)
+            stack.append(pos)
+
+    def __len__(self) -> int:
+        return len(self._owners)
+
+    def find_subnet(self, ip):
+        """Get the network adapter connected to the subnet of an address
+        (the most specific one if several subnets contain it).
+
+        Args:
+            ip (str | int): IPv4 address, as text or packed.
+
+        Returns:
+            int | None: Network adapter index or None if no subnet
+                contains the address.
+        """
+        ip = ipv4.pack(ip) if isinstance(ip, str) else ip
+        if ip is None:
+            return None
+
+        pos = bisect_right(self._firsts, ip) - 1
+        while pos >= 0:
+            if self._lasts[pos] >= ip:
+                return self._indexes[pos]
+            pos = self._parents[pos]
+
+        return None
+
+    def owner(self, ip):
+        """Get the network adapter that has an address assigned.
+
+        Args:
+            ip (str | int): IPv4 address, as text or packed.
+
+        Returns:
+            int | None: Network adapter index or None if no adapter has
+                the address.
+        """
+        ip = ipv4.pack(ip) if isinstance(ip, str) else ip
+
+        return self._owners.get(ip)
@@ -1,82 +1,65 @@
 """Find out the MAC address of a network adapter to which it is connected"""
 
-import subprocess
-import threading
+from concurrent.futures import CancelledError
 import traceback
 import tkinter as tk
 import ttkbootstrap as ttk
 from ttkbootstrap.dialogs.dialogs import Messagebox
 
-from network_adapters import NetworkAdapters
+from address_index import AddressIndex
+import execution
+from execution import CancelToken
+import ipv4
+from network_adapters import NetworkAdapters, NetworkBackend
+from powershell import ProcessRunner
 
 
 APPNAME = "Sinamawin"
+PING_COUNT = 20  # Echo requests sent to the target
+PING_TIMEOUT = 30  # Seconds after which the ping is killed
 
 
-def get_arp_table(ip_netap: str, ip_target: str = ""):
-    """Get the ARP table of a network adapter.
+def get_arp_table(ip_netap: str, ip_target: str = "", runner=None,
+                  cancel: CancelToken = None):
+    """Get the ARP table of a network adapter. The ping to the target runs
+    in the background, killed after PING_TIMEOUT seconds or when the
+    cancellation token is cancelled.
 
     Args:
         ip_netap (str): Network adapter IP.
         ip_target (str, optional): IP to ping. Defaults to "" (disabled).
+        runner (optional): Object with a run(args) method returning a
+            CommandResult, used for the ping and the ARP table. Defaults
+            to None (new processes and the backend of the platform).
+        cancel (CancelToken, optional): Cancellation of the ping. Defaults
+            to None (until it ends or times out).
     """
 
     def ping():
-        p = subprocess.Popen(["powershell.exe", "ping",
-                              str(ip_target), "-n 20"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-        p.communicate()
+        try:
+            (runner if runner else ProcessRunner(cancel=cancel)).run(
+                ["powershell.exe", "ping", str(ip_target),
+                 "-n", str(PING_COUNT)], timeout=PING_TIMEOUT)
+        except (CancelledError, TimeoutError, OSError):
+            pass
 
     if ip_target:
-        t_ping = threading.Thread(target=ping)
-        t_ping.start()
+        execution.start_thread(ping, name="arp-ping")
 
-    p = subprocess.Popen(["powershell.exe", "arp -a -N", str(ip_netap)],
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.PIPE,
-                         stdin=subprocess.DEVNULL,
-                         creationflags=subprocess.CREATE_NO_WINDOW)
+    if runner:
+        return NetworkAdapters(runner=runner).get_arp_table(ip_netap)
 
-    na = NetworkAdapters()
-    output, error = p.communicate()
-    out_dec = output.decode(na.enconding)
+    return NetworkBackend().get_arp_table(ip_netap)
 
-    data_arp = []
 
-    if out_dec.find("---") == -1 or error:
-        return data_arp
-
-    ret = out_dec.split("\r\n")
-    ret = [elem.strip() for elem in ret if elem.strip() != ""]
-
-    for line in ret:
-        data = [elem.strip() for elem in line.split(" ") if elem.strip() != ""]
-        if na.validate_ipv4(data[0]):
-            data_arp.append({
-                "iaddr": str(data[0]),
-                "phyaddr": str((data[1])).upper(),
-                "itype": str(data[2])
-            })
-
-    return data_arp
-
-
-def arp_widget(adapters: list) -> None:
-    """Create the ARP module popup window.
+def arp_widget(adapters: dict) -> None:
+    """Create the ARP module popup window. Every IP address of the network
+    adapters can be selected and, when a target IP address is entered,
+    the network adapter connected to its subnet is selected.
 
     Args:
-        adapters (list): List of dictionaries with information
-            about network adapters.
-            [
-                {
-                'ip': '192.168.1.1',
-                'name': 'Ethernet'
-                },
-                ...
-            ]
+        adapters (dict): AdapterInfo records by network adapter index
+            (result of get_info()).
     """
     try:
         popup = ttk.Toplevel(
@@ -94,10 +77,35 @@ def arp_widget(adapters: list) -> None:
         l_desc.grid(row=0, column=0, columnspan=4,
                     padx=15, pady=(15, 10), sticky="w")
 
+        # The ping of the last run is killed when running again or closing
+        ping = {"cancel": CancelToken()}
+
+        def on_destroy(event):
+            if event.widget is popup:
+                ping["cancel"].cancel()
+
+        popup.bind("<Destroy>", on_destroy, add="+")
+
         # -- IP address --
+        def on_change_target(*_):
+            """Select the network adapter connected to the target."""
+            target = ipv4.pack(ip_var.get().strip())
+            index = addr_index.find_subnet(target)
+            if index is None:
+                return
+
+            a_info = adapters[index]
+            addr = next((addr for addr in a_info.addresses
+                         if addr.network[0] <= target <= addr.network[1]),
+                        a_info.addresses[0])
+            cb_iface.set(f"{addr.ip} ({a_info.name})")
+            on_change_iface()
+
+        addr_index = AddressIndex(adapters)
         l_ip_addr = ttk.Label(popup, text="IP address target:")
+        ip_var = tk.StringVar()
         d_ip_addr = ttk.Entry(
-            popup, width=20, justify="center")
+            popup, width=20, justify="center", textvariable=ip_var)
 
         l_ip_addr.grid(row=1, column=0, padx=(15, 5), pady=5)
         d_ip_addr.grid(row=1, column=1, padx=5, pady=5)
@@ -110,9 +118,9 @@ def arp_widget(adapters: list) -> None:
                 b_run.configure(state="enabled")
 
         cb_iface_val = ["-- Select interface --"]
-        for adap in adapters:
-            if adap["ip"]:
-                cb_iface_val.append(f"{adap['ip']} ({adap['name']})")
+        for a_info in adapters.values():
+            for addr in a_info.addresses:
+                cb_iface_val.append(f"{addr.ip} ({a_info.name})")
 
         cb_iface = ttk.Combobox(popup,
                                 state="readonly",
@@ -122,6 +130,7 @@ def arp_widget(adapters: list) -> None:
 
         cb_iface.grid(row=1, column=2, padx=5, pady=5)
         cb_iface.bind("<<ComboboxSelected>>", on_change_iface)
+        ip_var.trace_add("write", on_change_target)
 
         # -- Run button --
         def run_btn():
@@ -130,11 +139,9 @@ def arp_widget(adapters: list) -> None:
             """
             cb_selec = cb_iface.get()
             ip_netap = cb_selec.split(" ")[0]
-            ip_target = d_ip_addr.get()
-
-            na = NetworkAdapters()
+            ip_target = ip_var.get().strip()
 
-            if ip_target and not na.validate_ipv4(ip_target):
+            if ip_target and not ipv4.is_valid(ip_target):
                 Messagebox.show_error(
                     message="Invalid IP address.",
                     title=f"{APPNAME} - Invalid data",
@@ -143,7 +150,9 @@ def arp_widget(adapters: list) -> None:
                     parent=popup)
                 return
 
-            data = get_arp_table(ip_netap, ip_target)
+            ping["cancel"].cancel()
+            ping["cancel"] = CancelToken()
+            data = get_arp_table(ip_netap, ip_target, cancel=ping["cancel"])
             t_arp.configure(state="normal")
             t_arp.delete(1.0, tk.END)
 
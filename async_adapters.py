@@ -0,0 +1,569 @@
+"""Query and configure network adapters with asyncio"""
+
+import asyncio
+from concurrent import futures
+import functools
+import subprocess
+import threading
+from typing import Callable
+
+from adapter_info import AdapterInfo
+import execution
+from net_config import ConfigTransaction, TransactionResult, parse_result
+from network_adapters import (ENCONDING_COMMAND, QUERY_TIMEOUT,
+                              NetworkAdapters, NetworkBackend,
+                              cache_enconding, cached_enconding,
+                              parse_snapshot, snapshot_script)
+from powershell import CREATE_NO_WINDOW, TIMEOUT, CommandResult, get_pool
+from tk_dispatch import get_dispatcher
+
+MAX_PROCESSES = 4  # Commands run at the same time by a runner
+
+_BRIDGE = None  # Bridge of the application (see get_bridge())
+_BRIDGE_LOCK = threading.Lock()
+
+
+class AsyncCommandRunner:
+    """Run commands with asyncio subprocesses. A command whose task is
+    cancelled or that does not finish in time is killed with its process
+    tree."""
+
+    def __init__(self, limit: int = MAX_PROCESSES,
+                 timeout: float = TIMEOUT) -> None:
+        self.limit = limit
+        self.timeout = timeout
+        self._semaphore = None  # Created in the event loop of the first run
+
+    async def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Run a command, waiting while there are already `limit` running.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the process.
+                Defaults to None (runner timeout).
+
+        Raises:
+            TimeoutError: The process did not finish in time.
+
+        Returns:
+            CommandResult: Output, error and exit code of the process.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.limit)
+
+        async with self._semaphore:
+            proc = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                stdin=subprocess.DEVNULL,
+                creationflags=CREATE_NO_WINDOW)
+
+            try:
+                output, error = await asyncio.wait_for(
+                    proc.communicate(),
+                    self.timeout if timeout is None else timeout)
+            except asyncio.TimeoutError as err:
+                raise TimeoutError(
+                    f"'{args[0]}' did not finish in time") from err
+            finally:
+                if proc.returncode is None:
+                    execution.kill_tree(proc.pid)
+                    proc.kill()
+                    await proc.wait()
+
+        return CommandResult(output, error, proc.returncode)
+
+
+class AsyncNetworkAdapters:
+    """Asynchronous version of NetworkAdapters. It uses the same scripts
+    and parsers, so the results are the same. The configuration changes
+    are run as ConfigTransaction scripts, like the widgets do."""
+
+    def __init__(self, runner=None) -> None:
+        # Object with a coroutine run(args, timeout) returning a
+        # CommandResult. Defaults to a PoolRunner, which shares the warm
+        # PowerShell sessions with NetworkAdapters.
+        self._runner = runner if runner else PoolRunner()
+
+    async def commit(self,
+                     transaction: ConfigTransaction) -> TransactionResult:
+        """Run a configuration transaction.
+
+        Args:
+            transaction (ConfigTransaction): Changes to apply.
+
+        Raises:
+            NotImplementedError: The result could not be read.
+
+        Returns:
+            TransactionResult: Result of each step and of the rollback.
+        """
+        if not transaction.steps:
+            return TransactionResult([], False, [])
+
+        enconding = await self.get_enconding()
+        output = await self._runner.run(
+            ["powershell.exe", transaction.script()])
+
+        return parse_result(output, enconding)
+
+    async def _configure(self, args: list, message: str) -> None:
+        """Run a configuration command and check its error output.
+
+        Args:
+            args (list): Program and arguments.
+            message (str): Message of the exception for unidentified
+                errors.
+
+        Raises:
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given alias.
+            NotImplementedError: Unidentified error.
+        """
+        enconding = await self.get_enconding()
+        error = (await self._runner.run(args)).stderr.decode(enconding)
+
+        if "PermissionDenied" in error:
+            raise PermissionError("No administrator permissions")
+        if "ObjectNotFound" in error:
+            raise KeyError("Invalid network adapter index")
+        if error:
+            raise NotImplementedError(message)
+
+    async def disable_adapter(self, alias: str) -> None:
+        """Disable a network adapter.
+
+        Args:
+            alias (str): Network adapter alias.
+
+        Raises:
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given alias.
+            NotImplementedError: Unidentified error.
+        """
+        await self._configure(["powershell.exe", "Disable-NetAdapter",
+                               "-Name", f"'{alias}'", "-Confirm:$false"],
+                              "An error occurred while disabling the"
+                              " network adapter")
+
+    async def enable_adapter(self, alias: str) -> None:
+        """Enable a network adapter.
+
+        Args:
+            alias (str): Network adapter alias.
+
+        Raises:
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given alias.
+            NotImplementedError: Unidentified error.
+        """
+        await self._configure(["powershell.exe", "Enable-NetAdapter",
+                               "-Name", f"'{alias}'"],
+                              "An error occurred while enabling the"
+                              " network adapter")
+
+    async def get_adapter(self, index: int) -> AdapterInfo:
+        """Get the information about a network adapter.
+
+        Args:
+            index (int): Network adapter index.
+
+        Raises:
+            KeyError: There is no network adapter for the given index.
+
+        Returns:
+            AdapterInfo: Information about the network adapter.
+        """
+        try:
+            adapters = await self._get_snapshot(index)
+        except ValueError:
+            adapters = await self.get_info()
+
+        if index not in adapters:
+            raise KeyError("Invalid network adapter index")
+
+        return adapters[index]
+
+    async def get_enconding(self) -> str:
+        """Get terminal enconding, shared with NetworkAdapters.
+
+        Returns:
+            str: Terminal enconding.
+        """
+        enconding = cached_enconding()
+        if enconding:
+            return enconding
+
+        try:
+            return cache_enconding(
+                (await self._runner.run(ENCONDING_COMMAND)).stdout)
+        except (OSError, TypeError, ValueError):
+            return "utf-8"
+
+    async def get_info(self, timeout: float = QUERY_TIMEOUT) -> dict:
+        """Get the information about the network adapters. If the JSON
+        snapshot fails, NetworkAdapters.get_info() is run in a thread with
+        this runner.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the individual
+                commands of the fallback. Defaults to QUERY_TIMEOUT.
+
+        Returns:
+            dict: Same as NetworkAdapters.get_info().
+        """
+        try:
+            return await self._get_snapshot()
+        except ValueError:
+            runner = BlockingRunner(self._runner, asyncio.get_running_loop())
+            return await asyncio.to_thread(
+                NetworkAdapters(runner=runner).get_info, snapshot=False,
+                timeout=timeout)
+
+    async def _get_snapshot(self, index: int = None) -> dict:
+        """Get the information with the JSON snapshot script.
+
+        Args:
+            index (int, optional): Only get the information of this network
+                adapter. Defaults to None (all).
+
+        Raises:
+            ValueError: The output is not a valid snapshot.
+
+        Returns:
+            dict: Same as NetworkAdapters.get_info().
+        """
+        enconding = await self.get_enconding()
+        output = await self._runner.run(
+            ["powershell.exe", snapshot_script(index)])
+
+        return parse_snapshot(output.stdout, enconding)
+
+    async def reset_def_gateway(self, index: int) -> None:
+        """Remove the default gateway of a network adapter.
+
+        Args:
+            index (int): Network adapter index.
+
+        Raises:
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given index.
+            NotImplementedError: Unidentified error.
+        """
+        await self._transaction(index, "reset_def_gateway")
+
+    async def reset_dns_servers(self, index: int) -> None:
+        """Remove the DNS servers set (obtain them automatically).
+
+        Args:
+            index (int): Network adapter index.
+
+        Raises:
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given index.
+            NotImplementedError: Unidentified error.
+        """
+        await self._transaction(index, "reset_dns_servers")
+
+    async def set_def_gateway(self, index: int, ip: str) -> None:
+        """Replace the default gateway of a network adapter.
+
+        Args:
+            index (int): Network adapter index.
+            ip (str): Address to be set.
+
+        Raises:
+            ValueError: Invalid address.
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given index.
+            NotImplementedError: Unidentified error.
+        """
+        await self._transaction(index, "set_def_gateway", ip)
+
+    async def set_dns_servers(self, index: int, pref_dns: str,
+                              alt_dns: str) -> None:
+        """Set the DNS servers of a network adapter.
+
+        Args:
+            index (int): Network adapter index.
+            pref_dns (str): Address for the preferred DNS server.
+            alt_dns (str): Address for the alternate DNS server.
+
+        Raises:
+            ValueError: Invalid address.
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given index.
+            NotImplementedError: Unidentified error.
+        """
+        await self._transaction(index, "set_dns_servers", pref_dns, alt_dns)
+
+    async def set_ip_mask(self, index: int, ip: str, mask: str) -> None:
+        """Set the address and subnet mask of a network adapter.
+
+        Args:
+            index (int): Network adapter index.
+            ip (str): Address to be set.
+            mask (str): Subnet mask to be set.
+
+        Raises:
+            ValueError: Invalid address or subnet mask.
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given index.
+            NotImplementedError: Unidentified error.
+        """
+        await self._transaction(index, "set_ip_mask", ip, mask)
+
+    async def set_net_dhcp(self, index: int) -> None:
+        """Remove the default gateway and enable DHCP.
+
+        Args:
+            index (int): Network adapter index.
+
+        Raises:
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given index.
+            NotImplementedError: Unidentified error.
+        """
+        await self._transaction(index, "set_net_dhcp")
+
+    async def _transaction(self, index: int, step: str, *args) -> None:
+        """Run a single change as a transaction and raise its error.
+
+        Args:
+            index (int): Network adapter index.
+            step (str): Method of ConfigTransaction (e.g., "set_ip_mask").
+            *args: Arguments of the method.
+
+        Raises:
+            ValueError: Invalid arguments.
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given index.
+            NotImplementedError: Unidentified error.
+        """
+        transaction = ConfigTransaction(index)
+        getattr(transaction, step)(*args)
+        (await self.commit(transaction)).raise_for_error()
+
+
+class BlockingRunner:
+    """Synchronous runner (run(args) -> CommandResult) over an asynchronous
+    runner whose event loop runs in another thread. It lets NetworkAdapters
+    and ConfigTransaction run on top of PoolRunner or AsyncCommandRunner."""
+
+    def __init__(self, runner, loop: asyncio.AbstractEventLoop) -> None:
+        self.runner = runner
+        self.loop = loop
+
+    def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Run a command in the event loop and wait for its result.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the command.
+                Defaults to None (runner timeout).
+
+        Returns:
+            CommandResult: Output, error and exit code of the command.
+        """
+        return asyncio.run_coroutine_threadsafe(
+            self.runner.run(args, timeout=timeout), self.loop).result()
+
+
+class PoolRunner:
+    """Asynchronous runner over the pool of PowerShell sessions. The
+    commands run in the default executor of the event loop, so the
+    coroutines do not start a new powershell.exe for each command. If the
+    task is cancelled (e.g., by asyncio.wait_for()), the session running
+    the command is killed."""
+
+    def __init__(self, pool=None) -> None:
+        # Object with run(args, timeout, cancel) returning a CommandResult.
+        # Defaults to None (pool of the application, see get_pool()).
+        self.pool = pool
+
+    async def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Run a command in a session of the pool.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the command.
+                Defaults to None (pool timeout).
+
+        Raises:
+            TimeoutError: The command did not finish in time.
+
+        Returns:
+            CommandResult: Output, error and exit code of the command.
+        """
+        pool = self.pool if self.pool else get_pool()
+        cancel = execution.CancelToken()
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, functools.partial(pool.run, args, timeout=timeout,
+                                        cancel=cancel))
+        except asyncio.CancelledError:
+            cancel.cancel()
+            raise
+
+
+class ThreadedAdapters:
+    """Asynchronous version of a blocking backend (e.g.,
+    LinuxNetworkAdapters) whose methods read local files instead of
+    running PowerShell. Each method runs in a thread, so the event loop is
+    not blocked. The configuration changes are not supported."""
+
+    def __init__(self, backend=None) -> None:
+        # AdapterBackend whose methods are run. Defaults to a new
+        # NetworkBackend.
+        self._backend = backend if backend else NetworkBackend()
+
+    async def commit(self,
+                     transaction: ConfigTransaction) -> TransactionResult:
+        """Run a configuration transaction (not supported).
+
+        Args:
+            transaction (ConfigTransaction): Changes to apply.
+
+        Raises:
+            NotImplementedError: Not supported by this backend.
+        """
+        # pylint: disable=unused-argument
+        raise NotImplementedError("Not supported by this backend")
+
+    async def disable_adapter(self, alias: str) -> None:
+        """Disable a network adapter.
+
+        Args:
+            alias (str): Network adapter alias.
+        """
+        await asyncio.to_thread(self._backend.disable_adapter, alias)
+
+    async def enable_adapter(self, alias: str) -> None:
+        """Enable a network adapter.
+
+        Args:
+            alias (str): Network adapter alias.
+        """
+        await asyncio.to_thread(self._backend.enable_adapter, alias)
+
+    async def get_adapter(self, index: int) -> AdapterInfo:
+        """Get the information about a network adapter.
+
+        Args:
+            index (int): Network adapter index.
+
+        Raises:
+            KeyError: There is no network adapter for the given index.
+
+        Returns:
+            AdapterInfo: Information about the network adapter.
+        """
+        return await asyncio.to_thread(self._backend.get_adapter, index)
+
+    async def get_info(self) -> dict:
+        """Get the information about the network adapters.
+
+        Returns:
+            dict: AdapterInfo records by network adapter index, sorted.
+        """
+        return await asyncio.to_thread(self._backend.get_info)
+
+
+class TkAsyncBridge:
+    """Event loop running in a background thread next to Tk. Coroutines
+    are submitted from the Tk thread and their results are delivered back
+    to it through the Tk dispatcher."""
+
+    def __init__(self, widget) -> None:
+        self.widget = widget  # Any Tk widget, used to start the dispatcher
+        self.dispatcher = get_dispatcher(widget)
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever,
+                                        daemon=True)
+        self._thread.start()
+
+    def blocking_runner(self, runner=None) -> BlockingRunner:
+        """Get a synchronous runner that runs the commands in this loop.
+
+        Args:
+            runner (optional): Asynchronous runner. Defaults to None
+                (new PoolRunner).
+
+        Returns:
+            BlockingRunner: Runner for NetworkAdapters.
+        """
+        return BlockingRunner(runner if runner else PoolRunner(), self.loop)
+
+    def close(self) -> None:
+        """Cancel the pending tasks and stop the event loop."""
+        def stop():
+            for task in asyncio.all_tasks(self.loop):
+                task.cancel()
+            self.loop.stop()
+
+        self.loop.call_soon_threadsafe(stop)
+
+    def submit(self, coro, callback: Callable = None,
+               errback: Callable = None,
+               timeout: float = None) -> futures.Future:
+        """Run a coroutine in the event loop.
+
+        Args:
+            coro: Coroutine to run.
+            callback (Callable, optional): Called in the Tk thread with the
+                result. Defaults to None.
+            errback (Callable, optional): Called in the Tk thread with the
+                exception, if any. Defaults to None.
+            timeout (float, optional): Seconds after which the coroutine
+                is cancelled and errback receives a TimeoutError. Defaults
+                to None (no limit).
+
+        Returns:
+            futures.Future: Future of the coroutine. Call cancel() to
+                cancel it (neither callback nor errback are called).
+        """
+        if timeout is not None:
+            coro = asyncio.wait_for(coro, timeout)
+
+        future = asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+        def done(fut: futures.Future) -> None:
+            if fut.cancelled():
+                return
+
+            err = fut.exception()
+            if err is None and callback:
+                self.dispatcher.post(callback, fut.result())
+            elif err is not None and errback:
+                self.dispatcher.post(errback, err)
+
+        future.add_done_callback(done)
+
+        return future
+
+
+def get_bridge(widget=None) -> TkAsyncBridge:
+    """Get the bridge of the application, creating it the first time.
+
+    Args:
+        widget (optional): Tk widget used to deliver the results. Only
+            needed the first time. Defaults to None.
+
+    Returns:
+        TkAsyncBridge: Shared bridge.
+    """
+    global _BRIDGE  # pylint: disable=global-statement
+    with _BRIDGE_LOCK:
+        if _BRIDGE is None:
+            _BRIDGE = TkAsyncBridge(widget)
+
+    return _BRIDGE
+
+
+# Asynchronous backend used by the application, selected like
+# NetworkBackend
+AsyncNetworkBackend = (
+    AsyncNetworkAdapters if NetworkBackend is NetworkAdapters
+    else ThreadedAdapters)
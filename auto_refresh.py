@@ -0,0 +1,145 @@
+"""Refresh the network adapters periodically, adapting the interval
+
+The snapshot is collected in a background thread and only its differences
+are applied to the cards (in the Tk thread). While nothing changes, the
+interval grows from the base one set in the preferences up to MAX_FACTOR
+times it; after a change, it drops to half the base one and grows again.
+Nothing is collected while the main window is minimized or does not have
+the focus, and a cycle is skipped if the previous collection is still
+running, so there is at most one query in flight and one every
+MIN_INTERVAL seconds.
+"""
+
+import tkinter as tk
+import traceback
+from typing import Callable
+
+from convergence import backoff_delays
+import execution
+from tk_dispatch import get_dispatcher
+
+DEFAULT_INTERVAL = 30  # Base seconds between refreshes (preferences)
+MIN_INTERVAL = 5  # Shortest seconds between refreshes
+MAX_FACTOR = 8  # Longest interval, as a multiple of the base one
+BACKOFF = 2  # Factor applied to the interval after a refresh without changes
+TIGHTEN = 0.5  # Interval after a change, as a fraction of the base one
+
+
+class AutoRefresh:
+    """Periodic refresh of the network adapters of the main window. Must
+    be started and stopped from the Tk thread."""
+
+    def __init__(self, window, collect: Callable, apply: Callable,
+                 interval: float = DEFAULT_INTERVAL) -> None:
+        self.window = window  # Main window (paused if not active)
+        # Gets a snapshot of the network adapters (background thread)
+        self.collect = collect
+        # Shows a snapshot and returns its differences (Tk thread)
+        self.apply = apply
+        self.interval = max(interval, MIN_INTERVAL)  # Base interval
+        self.cycles = 0  # Snapshots collected
+        self.changes = 0  # Snapshots with differences
+        self.skipped = 0  # Cycles skipped (paused or still collecting)
+        self.delay = self.interval  # Seconds until the next cycle
+        self._delays = self._backoff(self.interval)
+        self._after_id = None  # Next cycle (after())
+        self._collecting = False  # A collection is running
+        self._stopped = True
+
+    def _backoff(self, first: float):
+        """Intervals from a first one, growing while nothing changes.
+
+        Args:
+            first (float): First interval (seconds).
+
+        Returns:
+            Iterator[float]: Seconds until each next cycle.
+        """
+        return backoff_delays(first=max(first, MIN_INTERVAL),
+                              factor=BACKOFF,
+                              maximum=self.interval * MAX_FACTOR)
+
+    def _collect(self) -> None:
+        """Collect a snapshot (background thread) and post it to the Tk
+        thread. None is posted if it fails."""
+        try:
+            adapters = self.collect()
+        except Exception:  # pylint: disable=broad-exception-caught
+            traceback.print_exc()
+            adapters = None
+
+        get_dispatcher().post(self._done, adapters)
+
+    def _cycle(self) -> None:
+        """Start a collection unless the window is not active or the
+        previous one is still running, and schedule the next cycle."""
+        self._after_id = None
+        if self._stopped:
+            return
+
+        if self._collecting or not self.is_active():
+            self.skipped += 1
+            self._schedule(self.delay)
+            return
+
+        self._collecting = True
+        self.cycles += 1
+        execution.start_thread(self._collect, name="auto-refresh")
+        self._schedule(next(self._delays))
+
+    def _done(self, adapters: dict) -> None:
+        """Apply a snapshot collected (Tk thread). After a change, the
+        interval is tightened.
+
+        Args:
+            adapters (dict): AdapterInfo by network adapter index, or None
+                if the collection failed.
+        """
+        self._collecting = False
+        if self._stopped or adapters is None:
+            return
+
+        if self.apply(adapters):
+            self.changes += 1
+            self._delays = self._backoff(self.interval * TIGHTEN)
+            self._schedule(next(self._delays))
+
+    def is_active(self) -> bool:
+        """Check if the main window is shown and has the focus.
+
+        Returns:
+            bool: True if the network adapters are being looked at.
+        """
+        try:
+            return (self.window.state() not in ("iconic", "withdrawn")
+                    and self.window.focus_get() is not None)
+        except (KeyError, tk.TclError):  # e.g., focus in a popdown
+            return True
+
+    def _schedule(self, delay: float) -> None:
+        """Run the next cycle after some time, replacing the one pending.
+
+        Args:
+            delay (float): Seconds until the next cycle.
+        """
+        if self._after_id is not None:
+            self.window.after_cancel(self._after_id)
+
+        self.delay = delay
+        self._after_id = self.window.after(int(delay * 1000), self._cycle)
+
+    def start(self) -> None:
+        """Start refreshing, one base interval from now."""
+        self._stopped = False
+        self._delays = self._backoff(self.interval)
+        self._schedule(next(self._delays))
+
+    def stop(self) -> None:
+        """Stop refreshing. A collection in progress is discarded."""
+        self._stopped = True
+        if self._after_id is not None:
+            try:
+                self.window.after_cancel(self._after_id)
+            except tk.TclError:  # The window has been destroyed
+                pass
+            self._after_id = None
@@ -0,0 +1,66 @@
+"""Check that iter_format_list() scales linearly with the number of records
+
+Usage: python benchmarks/bench_format_list.py [max_records]
+"""
+
+import os
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from network_adapters import iter_format_list  # noqa: E402 # pylint: disable=C0413
+
+REPEAT = 3
+
+
+def format_list_output(records: int) -> bytes:
+    """Generate a Get-NetIPAddress like Format-List output.
+
+    Args:
+        records (int): Number of records.
+
+    Returns:
+        bytes: Output as written by PowerShell.
+    """
+    lines = ["", ""]
+    for i in range(records):
+        lines += [f"InterfaceIndex : {i + 1}",
+                  f"IPAddress      : 10.{i // 65536 % 256}.{i // 256 % 256}"
+                  f".{i % 256}",
+                  "PrefixLength   : 24",
+                  "PrefixOrigin   : Manual",
+                  "SuffixOrigin   : Manual",
+                  "Description    : Wrapped value with colons: a:b:c and",
+                  "                 a continuation line",
+                  ""]
+
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("cp850")
+
+
+def bench(max_records: int) -> None:
+    """Time the parser on outputs of increasing size.
+
+    Args:
+        max_records (int): Number of records of the largest output.
+    """
+    base = None
+    records = max_records // 8
+    while records <= max_records:
+        output = format_list_output(records)
+        best = min(timeit.repeat(
+            lambda o=output: sum(1 for _ in iter_format_list(o, "cp850")),
+            repeat=REPEAT, number=1))
+        per_record = best / records * 1e6
+        base = base or per_record
+
+        print(f"records={records:<7} total={best * 1000:9.2f} ms"
+              f" per_record={per_record:6.2f} us"
+              f" ratio={per_record / base:5.2f}")
+
+        records *= 2
+
+
+if __name__ == "__main__":
+    bench(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,86 @@
+"""Compare the JSON snapshot and the Format-List paths of get_info()
+
+Usage: python benchmarks/bench_get_info.py [fixture.json ...]
+
+Commands are served from the fixtures, so the parsing and merging are
+measured without the commands. The duration of each path is then measured
+replaying the commands with the durations stored in the fixtures, so that
+the Format-List queries, which get_info() runs concurrently, cost about as
+much as the slowest of them and not their sum. As in the application,
+at most POOL_SIZE commands run at once (the warm sessions of the pool).
+The "work" column adds up the durations of the commands, i.e., the
+PowerShell time each path takes from the pool. The durations of the
+synthetic fixtures are modeled, not measured (see generate_fixtures.py),
+and are reported as such.
+"""
+
+import glob
+import os
+import sys
+import threading
+from time import monotonic
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from network_adapters import NetworkAdapters  # noqa: E402 # pylint: disable=C0413
+from powershell import POOL_SIZE  # noqa: E402 # pylint: disable=C0413
+from recording import ReplayRunner  # noqa: E402 # pylint: disable=C0413
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+REPEAT = 5
+NUMBER = 50
+
+
+class PooledRunner:
+    """Command runner that runs at most `size` commands of another one at
+    once, like the sessions of the PowerShell pool."""
+
+    def __init__(self, runner, size: int = POOL_SIZE) -> None:
+        self.runner = runner
+        self._slots = threading.BoundedSemaphore(size)
+
+    def run(self, args: list, timeout: float = None):
+        """Run a command once a slot is free."""
+        with self._slots:
+            return self.runner.run(args, timeout=timeout)
+
+
+def bench(path: str) -> None:
+    """Benchmark both paths of get_info() with a fixture.
+
+    Args:
+        path (str): Fixture file.
+    """
+    runner = ReplayRunner(path)
+    ni = NetworkAdapters(runner=runner)
+    name = os.path.splitext(os.path.basename(path))[0]
+    # Replays the commands taking their stored durations
+    replay = ReplayRunner(path, latency="recorded")
+    timed = NetworkAdapters(runner=PooledRunner(replay))
+
+    for snapshot in (False, True):
+        runner.reset()
+        info = ni.get_info(snapshot=snapshot)
+        launches = runner.launches
+
+        replay.reset()
+        start = monotonic()
+        timed.get_info(snapshot=snapshot)
+        duration = monotonic() - start
+
+        best = min(timeit.repeat(lambda s=snapshot: ni.get_info(snapshot=s),
+                                 repeat=REPEAT, number=NUMBER)) / NUMBER
+
+        print(f"{name:<12} {'json' if snapshot else 'text':<5}"
+              f" adapters={len(info):<4} commands={launches}"
+              f" {runner.timing}={duration * 1000:8.1f} ms"
+              f" work={replay.elapsed * 1000:8.1f} ms"
+              f" parse={best * 1000:8.3f} ms")
+
+
+if __name__ == "__main__":
+    for fixture_path in sys.argv[1:] or sorted(
+            glob.glob(os.path.join(FIXTURES, "*.json"))):
+        bench(fixture_path)
@@ -0,0 +1,558 @@
+"""Benchmark the parsers, get_info(), the route table, refresh() and its
+memory
+
+Usage:
+    python benchmarks/bench_suite.py
+        [--layers parsers,assembly,routes,refresh,memory]
+        [--sizes 10,100,1000] [--output results.json]
+        [--baseline baseline.json] [--threshold 0.1]
+    python benchmarks/bench_suite.py --compare old.json new.json
+        [--threshold 0.1]
+
+Layers:
+    parsers: each Format-List query, the JSON snapshot, the ARP table,
+        the Nmap output and the import of a profiles CSV file (10 rows per
+        unit of size), on synthetic inputs that grow with the size.
+    assembly: _merge_dicts() and both paths of get_info().
+    routes: iter_routes() over a route table of ROUTE_FACTOR routes per
+        unit of size (50000 for 1000), with the peak memory it allocates,
+        which must not grow with the number of routes.
+    refresh: sinamawin.refresh() with a fake backend that changes some
+        adapters on every call, and the startup of the list of cards
+        ("startup"), in a hidden Tk window. Skipped if there is no
+        display.
+    memory: CYCLES refresh cycles (refresh() and a scroll to another part
+        of the list, which rebinds cards) after WARMUP ones, with what
+        they leave behind: Python memory ("growth", in bytes), Tcl
+        commands (e.g., functions bound to widgets) and widgets. All
+        three must stay near zero. Skipped if there is no display.
+
+With --baseline (or --compare), a benchmark whose best time is more than
+threshold (e.g., 0.1 = 10%) slower than the baseline is reported as a
+regression and the exit code is 1.
+"""
+
+import argparse
+from datetime import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+from time import perf_counter
+import timeit
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from adapter_backend import AdapterBackend  # noqa: E402 # pylint: disable=C0413
+from adapter_info import AdapterInfo  # noqa: E402 # pylint: disable=C0413
+from generate_fixtures import ENCODING, SyntheticHost  # noqa: E402 # pylint: disable=C0413
+from network_adapters import NetworkAdapters, invalidate_enconding  # noqa: E402 # pylint: disable=C0413
+from network_adapters import parse_snapshot, snapshot_script  # noqa: E402 # pylint: disable=C0413
+from net_adap_profiles import read_profiles_csv  # noqa: E402 # pylint: disable=C0413
+from nmap import nmap  # noqa: E402 # pylint: disable=C0413
+from recording import RecordingRunner, ReplayRunner  # noqa: E402 # pylint: disable=C0413
+
+LAYERS = ("parsers", "assembly", "routes", "refresh", "memory")
+SIZES = (10, 100, 1000)  # Network adapters, ARP entries and Nmap hosts
+ROUTES = 10  # Static routes per network adapter
+ROUTE_FACTOR = 50  # Routes per unit of size in the routes layer
+MAX_REFRESH = 200  # Largest size measured with refresh()
+VIEW = (1000, 700)  # Size of the canvas of the cards (pixels)
+CHANGED = 10  # One in CHANGED adapters changes on every refresh()
+CYCLES = 1000  # Refresh cycles measured by the memory layer
+WARMUP = 100  # Refresh cycles run before measuring the memory layer
+PORTS = "22,80,443"  # Ports of the Nmap scans
+REPEAT = 5
+THRESHOLD = 0.1  # Slowdown reported as a regression (10%)
+SEED = 7
+
+
+def measure(func) -> dict:
+    """Time a function.
+
+    Args:
+        func (Callable): Function without arguments.
+
+    Returns:
+        dict: Best and mean seconds per call, calls per round and rounds.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [elapsed / number for elapsed in timer.repeat(REPEAT, number)]
+
+    return {"best": min(times), "mean": statistics.mean(times),
+            "number": number, "repeat": REPEAT}
+
+
+def profiles_csv(rows: int) -> list:
+    """Write a profiles CSV file like export_profiles() does.
+
+    Args:
+        rows (int): Number of profiles.
+
+    Returns:
+        list: Lines of the file, header included.
+    """
+    lines = ["name;ip;mask;gateway;pref_dns;alt_dns\n"]
+    for i in range(rows):
+        net = f"10.{i // 65536 % 256}.{i // 256 % 256}"
+        lines.append(f"Site {i};{net}.{i % 254 + 1};255.255.255.0;{net}.254;"
+                     f"1.1.1.1;{'8.8.8.8' if i % 2 else ''}\n")
+
+    return lines
+
+
+def record_host(size: int) -> tuple:
+    """Record the queries of a synthetic host and of a network adapter
+    with `size` neighbours.
+
+    Args:
+        size (int): Network adapters (with ROUTES static routes each),
+            ARP entries and Nmap hosts.
+
+    Returns:
+        tuple: (ReplayRunner, IP of the network adapter with neighbours).
+    """
+    invalidate_enconding()  # So that the enconding command is recorded
+    recorder = RecordingRunner(SyntheticHost(size, size * ROUTES, SEED),
+                               encoding=ENCODING)
+    NetworkAdapters(runner=recorder).get_info(snapshot=False)
+    recorder.run(["powershell.exe", snapshot_script()])
+
+    neighbours = SyntheticHost(4, seed=SEED, neighbours=size)
+    ip = next(adap["ip"] for adap in neighbours.adapters if adap["ip"])
+    recorder.runner = neighbours
+    recorder.run(["powershell.exe", "arp -a -N", ip])
+    nmap(f"{ip}/24", PORTS, tcp=True, udp=True, runner=recorder)
+
+    return ReplayRunner({"encoding": ENCODING,
+                         "commands": recorder.commands}), ip
+
+
+def bench_parsers(size: int) -> dict:
+    """Benchmark the parsers.
+
+    Args:
+        size (int): Size of the inputs.
+
+    Returns:
+        dict: Results by benchmark name.
+    """
+    runner, ip = record_host(size)
+    ni = NetworkAdapters(runner=runner)
+    snapshot = runner.run(["powershell.exe", snapshot_script()]).stdout
+    csv_lines = profiles_csv(size * 10)
+
+    # pylint: disable=protected-access
+    return {
+        "net_adapter": measure(ni._get_net_adapter),
+        "net_ip_address": measure(ni._get_net_ip_address),
+        "dns_client_server_address": measure(
+            ni._get_dns_client_server_address),
+        "net_route": measure(ni._get_net_route),
+        "snapshot": measure(lambda: parse_snapshot(snapshot, ni.enconding)),
+        "arp": measure(lambda: ni.get_arp_table(ip)),
+        "nmap": measure(lambda: nmap(f"{ip}/24", PORTS, tcp=True, udp=True,
+                                     runner=runner)),
+        "profiles_csv": measure(lambda: read_profiles_csv(csv_lines, ";",
+                                                          {})),
+    }
+
+
+def bench_assembly(size: int) -> dict:
+    """Benchmark the assembly of get_info().
+
+    Args:
+        size (int): Number of network adapters.
+
+    Returns:
+        dict: Results by benchmark name.
+    """
+    runner, _ = record_host(size)
+    ni = NetworkAdapters(runner=runner)
+
+    # pylint: disable=protected-access
+    adapters = ni._get_net_adapter()
+    ips = ni._get_net_ip_address()
+    dns = ni._get_dns_client_server_address()
+    gateways = ni._get_net_route()
+
+    return {
+        "merge_dicts": measure(lambda: ni._merge_dicts(
+            gateways, ni._merge_dicts(ni._merge_dicts(adapters, ips), dns))),
+        "get_info_text": measure(lambda: ni.get_info(snapshot=False)),
+        "get_info_json": measure(lambda: ni.get_info(snapshot=True)),
+    }
+
+
+def bench_routes(size: int) -> dict:
+    """Benchmark iter_routes() and measure its peak memory.
+
+    Args:
+        size (int): Size of the route table (size * ROUTE_FACTOR routes).
+
+    Returns:
+        dict: Results by benchmark name.
+    """
+    invalidate_enconding()
+    recorder = RecordingRunner(SyntheticHost(8, size * ROUTE_FACTOR, SEED),
+                               encoding=ENCODING)
+    for _ in NetworkAdapters(runner=recorder).iter_routes():
+        pass
+    ni = NetworkAdapters(runner=ReplayRunner(
+        {"encoding": ENCODING, "commands": recorder.commands}))
+
+    def consume():
+        for _ in ni.iter_routes():
+            pass
+
+    result = measure(consume)
+    tracemalloc.start()
+    try:
+        consume()
+        result["peak"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {"iter_routes": result}
+
+
+class FakeBackend(AdapterBackend):
+    """Backend that alternates between two snapshots of a synthetic host.
+    The second one changes the address of one in CHANGED adapters."""
+
+    def __init__(self, size: int) -> None:
+        super().__init__()
+        runner, _ = record_host(size)
+        first = {index: dict(a_info) for index, a_info in NetworkAdapters(
+            runner=runner).get_info(snapshot=True).items()}
+        second = {index: dict(info) for index, info in first.items()}
+        for index in list(second)[::CHANGED]:
+            second[index]["ip"] = "192.168.0." + str(index % 250 + 2)
+            second[index]["addresses"] = None  # Only the new address
+        self._snapshots = [first, second]
+        self._calls = 0
+
+    def get_info(self) -> dict:
+        """Get the next snapshot, as new records.
+
+        Returns:
+            dict: AdapterInfo records by network adapter index, sorted.
+        """
+        snapshot = self._snapshots[self._calls % 2]
+        self._calls += 1
+
+        return {index: AdapterInfo.from_dict(index, info)
+                for index, info in snapshot.items()}
+
+
+class NoToast:
+    """ToastNotification that shows nothing"""
+
+    def __init__(self, *_, **__) -> None:
+        pass
+
+    def show_toast(self) -> None:
+        """Do nothing."""
+
+
+def bench_refresh(sizes: list) -> dict:
+    """Benchmark sinamawin.refresh() and the creation of the list of cards
+    in a hidden window.
+
+    Args:
+        sizes (list): Numbers of network adapters.
+
+    Raises:
+        RuntimeError: There is no display.
+
+    Returns:
+        dict: Results by benchmark name.
+    """
+    import tkinter as tk  # pylint: disable=import-outside-toplevel
+    import ttkbootstrap as ttk  # pylint: disable=import-outside-toplevel
+    import sinamawin  # pylint: disable=import-outside-toplevel
+    from adapter_list import AdapterList  # pylint: disable=C0415
+
+    os.chdir(ROOT)  # The widgets load ./resources
+    results = {}
+    for size in sizes:
+        try:
+            app = ttk.Window()
+        except tk.TclError as err:
+            raise RuntimeError(str(err)) from err
+        app.withdraw()
+
+        try:
+            backend = FakeBackend(size)
+            sinamawin.NetworkBackend = lambda b=backend: b
+            sinamawin.ToastNotification = NoToast
+            sinamawin.MAIN_FRAME = ttk.Frame(app)
+            adapters = backend.get_info()
+
+            def startup(frame=sinamawin.MAIN_FRAME, adapters=adapters):
+                canvas = tk.Canvas(frame, width=VIEW[0], height=VIEW[1])
+                AdapterList(canvas, disabled=True).update(adapters)
+                canvas.update_idletasks()
+                canvas.destroy()
+
+            results[f"startup[{size}]"] = measure(startup)
+
+            canvas = tk.Canvas(sinamawin.MAIN_FRAME, width=VIEW[0],
+                               height=VIEW[1])
+            sinamawin.ADAPTER_LIST = AdapterList(canvas, disabled=True)
+            sinamawin.NETADAPTERS = adapters
+            sinamawin.create_net_wd(sinamawin.NETADAPTERS)
+            app.update_idletasks()
+
+            def refresh(window=app):
+                sinamawin.refresh()
+                window.update_idletasks()
+
+            results[f"refresh[{size}]"] = measure(refresh)
+        finally:
+            app.destroy()
+
+    return results
+
+
+def count_widgets(widget) -> int:
+    """Count a widget and all its descendants.
+
+    Args:
+        widget (tk.Misc): Root of the widget tree.
+
+    Returns:
+        int: Number of widgets.
+    """
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def bench_memory(sizes: list) -> dict:
+    """Measure what CYCLES refresh cycles leave behind in a hidden window.
+
+    Args:
+        sizes (list): Numbers of network adapters.
+
+    Raises:
+        RuntimeError: There is no display.
+
+    Returns:
+        dict: Results by benchmark name (seconds per cycle, measured with
+            tracemalloc running, and the growth of the Python memory, Tcl
+            commands and widgets).
+    """
+    import tkinter as tk  # pylint: disable=import-outside-toplevel
+    import ttkbootstrap as ttk  # pylint: disable=import-outside-toplevel
+    import sinamawin  # pylint: disable=import-outside-toplevel
+    from adapter_list import AdapterList  # pylint: disable=C0415
+
+    os.chdir(ROOT)  # The widgets load ./resources
+    results = {}
+    for size in sizes:
+        try:
+            app = ttk.Window()
+        except tk.TclError as err:
+            raise RuntimeError(str(err)) from err
+        app.withdraw()
+
+        try:
+            backend = FakeBackend(size)
+            sinamawin.NetworkBackend = lambda b=backend: b
+            sinamawin.ToastNotification = NoToast
+            sinamawin.MAIN_FRAME = ttk.Frame(app)
+            canvas = tk.Canvas(sinamawin.MAIN_FRAME, width=VIEW[0],
+                               height=VIEW[1])
+            adapter_list = sinamawin.ADAPTER_LIST = AdapterList(
+                canvas, disabled=True)
+            sinamawin.NETADAPTERS = backend.get_info()
+            sinamawin.create_net_wd(sinamawin.NETADAPTERS)
+            app.update_idletasks()
+
+            def cycle(number, canvas=canvas, adapter_list=adapter_list):
+                sinamawin.refresh()
+                canvas.yview_moveto(number * 3 % 10 / 10)
+                adapter_list.render()
+                canvas.update_idletasks()
+
+            for number in range(WARMUP):
+                cycle(number)
+            commands = len(app.tk.call("info", "commands"))
+            widgets = count_widgets(app)
+
+            times = []
+            tracemalloc.start()
+            try:
+                memory = tracemalloc.get_traced_memory()[0]
+                for number in range(CYCLES):
+                    start = perf_counter()
+                    cycle(number)
+                    times.append(perf_counter() - start)
+                growth = tracemalloc.get_traced_memory()[0] - memory
+            finally:
+                tracemalloc.stop()
+
+            results[f"refresh[{size}]"] = {
+                "best": min(times), "mean": statistics.mean(times),
+                "number": CYCLES, "repeat": 1, "growth": growth,
+                "commands": len(app.tk.call("info", "commands")) - commands,
+                "widgets": count_widgets(app) - widgets,
+                "cards": adapter_list.pool.created}
+        finally:
+            app.destroy()
+
+    return results
+
+
+def run(layers: list, sizes: list) -> dict:
+    """Run the benchmarks.
+
+    Args:
+        layers (list): Layers to run (see LAYERS).
+        sizes (list): Sizes of the inputs.
+
+    Returns:
+        dict: Results ("results" by "layer/benchmark[size]" and "skipped"
+            layers with the reason).
+    """
+    results = {}
+    skipped = {}
+    for layer in layers:
+        if layer in ("refresh", "memory"):
+            bench = {"refresh": bench_refresh, "memory": bench_memory}[layer]
+            try:
+                results.update({
+                    f"{layer}/{name}": result
+                    for name, result in bench(
+                        [size for size in sizes
+                         if size <= MAX_REFRESH]).items()})
+            except (ImportError, RuntimeError) as err:
+                skipped[layer] = str(err)
+            continue
+
+        bench = {"parsers": bench_parsers, "assembly": bench_assembly,
+                 "routes": bench_routes}[layer]
+        for size in sizes:
+            for name, result in bench(size).items():
+                results[f"{layer}/{name}[{size}]"] = result
+
+    return {"created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+            "skipped": skipped}
+
+
+def compare(old: dict, new: dict, threshold: float = THRESHOLD) -> list:
+    """Compare two runs and print the differences.
+
+    Args:
+        old (dict): Baseline run.
+        new (dict): New run.
+        threshold (float, optional): Slowdown reported as a regression.
+            Defaults to THRESHOLD.
+
+    Returns:
+        list: Names of the benchmarks that regressed.
+    """
+    regressions = []
+    for name, result in new["results"].items():
+        base = old["results"].get(name)
+        if base is None:
+            print(f"{name:<48} {'':>10} {result['best'] * 1000:10.3f} ms"
+                  "  new")
+            continue
+
+        change = result["best"] / base["best"] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold:
+            flag = "  improved"
+
+        print(f"{name:<48} {base['best'] * 1000:10.3f}"
+              f" {result['best'] * 1000:10.3f} ms {change:+8.1%}{flag}")
+
+    for name in old["results"].keys() - new["results"].keys():
+        print(f"{name:<48} missing")
+
+    return regressions
+
+
+def print_results(run_results: dict) -> None:
+    """Print the results of a run.
+
+    Args:
+        run_results (dict): Result of run().
+    """
+    for name, result in run_results["results"].items():
+        peak = (f" peak={result['peak'] / 1024:8.1f} KiB" if "peak" in result
+                else "")
+        if "growth" in result:
+            peak += (f" growth={result['growth'] / 1024:8.1f} KiB"
+                     f" commands={result['commands']:+d}"
+                     f" widgets={result['widgets']:+d}")
+        print(f"{name:<48} best={result['best'] * 1000:10.3f} ms"
+              f" mean={result['mean'] * 1000:10.3f} ms{peak}")
+
+    for layer, reason in run_results["skipped"].items():
+        print(f"{layer} skipped: {reason}")
+
+
+def main() -> int:
+    """Parse the arguments and run or compare the benchmarks.
+
+    Returns:
+        int: Exit code (1 if there are regressions).
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the parsers, get_info(), the route table,"
+        " refresh() and its memory.")
+    parser.add_argument("--layers", default=",".join(LAYERS),
+                        help="comma-separated layers to run")
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma-separated input sizes")
+    parser.add_argument("--output", help="save the results to this file")
+    parser.add_argument("--baseline",
+                        help="compare the results with this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"),
+                        help="only compare two result files")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="slowdown reported as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        runs = []
+        for path in args.compare:
+            with open(path, "r", encoding="utf-8") as file:
+                runs.append(json.load(file))
+        return 1 if compare(*runs, threshold=args.threshold) else 0
+
+    layers = [layer for layer in args.layers.split(",") if layer]
+    unknown = set(layers) - set(LAYERS)
+    if unknown:
+        parser.error(f"unknown layers: {', '.join(sorted(unknown))}")
+
+    results = run(layers, [int(size) for size in args.sizes.split(",")])
+    print_results(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=4)
+            file.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        print()
+        return 1 if compare(baseline, results, args.threshold) else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,389 @@
+"""Generate the fixture corpus from synthetic hosts
+
+Usage: python benchmarks/generate_fixtures.py [name ...]
+
+Each host answers the commands of the application with outputs written
+like PowerShell, arp and Nmap write them, and is recorded by running the
+real code paths (see record_fixture.record()). The durations are not
+measured, since the synthetic ones take microseconds: they are modeled
+costs of a Windows host (see SyntheticHost.cost()) and the fixtures are
+marked as "modeled". A command costs the launch of powershell.exe plus the
+size of its output, so the single-line JSON snapshot is not priced as a
+one-line one.
+
+The hosts of LARGE_HOSTS (e.g., "router", with 50000 routes) are only
+generated when named, and are not committed because of their size.
+"""
+
+import json
+import os
+import random
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from network_adapters import ENCONDING_COMMAND  # noqa: E402 # pylint: disable=C0413
+from powershell import CommandResult  # noqa: E402 # pylint: disable=C0413
+from recording import RecordingRunner, save_fixture  # noqa: E402 # pylint: disable=C0413
+from record_fixture import FIXTURES, record  # noqa: E402 # pylint: disable=C0413
+
+ENCODING = "cp850"  # Enconding of the synthetic outputs
+LAUNCH_COST = 0.35  # Seconds to start powershell.exe and run a command
+KIB_COST = 0.005  # Seconds per KiB of output
+SCAN_COST = 0.05  # Seconds per host and port scanned by Nmap
+
+# name: (adapters, routes, seed)
+HOSTS = {
+    "laptop": (4, 0, 7),
+    "hyperv": (48, 0, 2),
+    "workstation": (120, 1500, 11),
+    "datacenter": (300, 5000, 5),
+}
+LARGE_HOSTS = {
+    "router": (8, 50000, 3),
+}
+INTERFACE_METRICS = (5, 15, 25, 35, 55)  # Automatic metrics by link speed
+BACKUP_METRIC = 256  # Route metric of the backup default routes
+
+NAMES = [("Ethernet", "Intel(R) Ethernet Connection (4) I219-LM"),
+         ("Wi-Fi", "Intel(R) Wi-Fi 6 AX201 160MHz"),
+         ("Bluetooth Network Connection",
+          "Bluetooth Device (Personal Area Network)"),
+         ("VPN", "TAP-Windows Adapter V9")]
+SERVICES = [("22", "ssh"), ("53", "domain"), ("80", "http"),
+            ("443", "https"), ("3389", "ms-wbt-server")]
+VENDORS = ["Intel Corporate", "Cisco Systems", "Microsoft", "Unknown"]
+
+
+def format_list(records: list) -> str:
+    """Write records like Format-List does.
+
+    Args:
+        records (list): Dictionaries with the properties of each record.
+
+    Returns:
+        str: Output.
+    """
+    out = "\r\n\r\n"
+    for rec in records:
+        width = max(len(key) for key in rec)
+        for key, value in rec.items():
+            out += f"{key.ljust(width)} : {value}\r\n"
+        out += "\r\n"
+
+    return out + "\r\n"
+
+
+def random_mac(rnd: random.Random, sep: str = "-") -> str:
+    """Get a random MAC address.
+
+    Args:
+        rnd (random.Random): Random generator.
+        sep (str, optional): Separator. Defaults to "-".
+
+    Returns:
+        str: MAC address.
+    """
+    return sep.join(f"{rnd.randint(0, 255):02X}" for _ in range(6))
+
+
+class SyntheticHost:
+    """Command runner that answers like a Windows host with the given
+    number of network adapters, additional static routes and neighbours
+    per network adapter (ARP entries and Nmap hosts; random if None)"""
+
+    def __init__(self, adapters: int, routes: int = 0, seed: int = 0,
+                 neighbours: int = None) -> None:
+        rnd = random.Random(seed)
+
+        self.adapters = []
+        for i in range(adapters):
+            if i < len(NAMES):
+                name, desc = NAMES[i]
+            else:
+                name = f"vEthernet (Switch {i})"
+                desc = f"Hyper-V Virtual Ethernet Adapter #{i}"
+            status = rnd.choice(["Up", "Up", "Up", "Disconnected",
+                                 "Disabled"])
+            mac = random_mac(rnd)
+            net = f"10.{rnd.randint(0, 255)}.{rnd.randint(0, 255)}"
+            dhcp = rnd.random() < 0.6
+            ip = f"{net}.{rnd.randint(2, 250)}" if status == "Up" else None
+            gateway = f"{net}.1" if ip and rnd.random() < 0.7 else ""
+            # Backup default route through another router of the network,
+            # listed after the preferred one
+            backup = f"{net}.254" if gateway and rnd.random() < 0.3 else ""
+            # Secondary addresses of the servers with a manual address
+            secondary = sorted({
+                f"{net}.{rnd.randint(2, 250)}"
+                for _ in range(rnd.randint(1, 24))} - {ip}) if (
+                    ip and not dhcp and rnd.random() < 0.25) else []
+            dns = ["1.1.1.1", "8.8.8.8"][:rnd.randint(0, 2)] if ip else []
+            self.adapters.append({
+                "index": 3 + i * 2 + rnd.randint(0, 1), "name": name,
+                "desc": desc, "status": status, "mac": mac, "ip": ip,
+                "net": net, "dhcp": dhcp, "gateway": gateway,
+                "backup": backup, "secondary": secondary, "dns": dns,
+                "metric": rnd.choice(INTERFACE_METRICS),
+                "neighbours": [(f"{net}.{rnd.randint(2, 254)}",
+                                random_mac(rnd))
+                               for _ in range(rnd.randint(1, 12)
+                                              if neighbours is None
+                                              else neighbours)] if ip
+                else []})
+
+        # Static routes to other networks, spread over the adapters that
+        # have an address
+        connected = [adap for adap in self.adapters if adap["ip"]]
+        self.static = {}
+        for i in range(routes if connected else 0):
+            adap = rnd.choice(connected)
+            self.static.setdefault(adap["index"], []).append(
+                (f"172.{16 + i // 65536 % 16}.{i // 256 % 256}.{i % 256}/32",
+                 f"{adap['net']}.{rnd.randint(2, 254)}"))
+
+    def _arp(self, ip: str) -> str:
+        """Output of "arp -a -N ip"."""
+        adap = next((adap for adap in self.adapters
+                     if ip in [adap["ip"]] + adap["secondary"]), None)
+        if adap is None:
+            return "No ARP Entries Found.\r\n"
+
+        out = (f"\r\nInterface: {ip} --- {hex(adap['index'])}\r\n"
+               "  Internet Address      Physical Address      Type\r\n")
+        for n_ip, n_mac in adap["neighbours"]:
+            out += f"  {n_ip:<22}{n_mac.lower():<22}dynamic   \r\n"
+        broadcast = f"{adap['net']}.255"
+        out += f"  {broadcast:<22}ff-ff-ff-ff-ff-ff     static    \r\n"
+
+        return out
+
+    def cost(self, args: list, stdout: str) -> float:
+        """Seconds the command would take in a Windows host. The time
+        depends on the size of the output, not on its lines.
+
+        Args:
+            args (list): Program and arguments.
+            stdout (str): Output of the command.
+
+        Returns:
+            float: Modeled duration.
+        """
+        if args[1] == "nmap" and "--version" not in args:
+            hosts = stdout.count("Nmap scan report for") + 1
+            return round(LAUNCH_COST + hosts * SCAN_COST
+                         * len(args[3].split(",")), 6)
+
+        return round(LAUNCH_COST
+                     + len(stdout.encode(ENCODING)) / 1024 * KIB_COST, 6)
+
+    def _nmap(self, args: list) -> CommandResult:
+        """Output of "nmap --version" and "nmap -p ports [-sS] [-sU] ip"."""
+        if "--version" in args:
+            return CommandResult(
+                b"Nmap version 7.94 ( https://nmap.org )\r\n"
+                b"Platform: i686-pc-windows-windows\r\n", b"", 0)
+
+        ports = args[3].split(",")
+        if not all(port.isdigit() and 0 < int(port) < 65536
+                   for port in ports):
+            return CommandResult(
+                b"", b"Ports specified must be between 0 and 65535"
+                b" inclusive\r\nQUITTING!\r\n", 1)
+
+        protocols = [prot for flag, prot in (("-sS", "tcp"), ("-sU", "udp"))
+                     if flag in args]
+        net = args[-1].split("/")[0].rsplit(".", 1)[0]
+        hosts = [(ip, mac) for adap in self.adapters if adap["net"] == net
+                 for ip, mac in adap["neighbours"]]
+        rnd = random.Random(args[-1])
+
+        out = "Starting Nmap 7.94 ( https://nmap.org )\r\n"
+        for ip, mac in hosts:
+            name = f"host-{ip.rsplit('.', 1)[1]}.lan"
+            out += (f"Nmap scan report for {name} ({ip})\r\n"
+                    "Host is up (0.0020s latency).\r\n\r\n"
+                    "PORT     STATE    SERVICE\r\n")
+            for prot in protocols:
+                for port in ports:
+                    service = dict(SERVICES).get(port, "unknown")
+                    state = rnd.choice(["open", "closed", "filtered"])
+                    out += f"{port + '/' + prot:<9}{state:<9}{service}\r\n"
+            out += (f"MAC Address: {mac.replace('-', ':')}"
+                    f" ({rnd.choice(VENDORS)})\r\n\r\n")
+
+        out += (f"Nmap done: 256 IP addresses ({len(hosts)} hosts up)"
+                " scanned in 4.21 seconds\r\n")
+
+        return CommandResult(out.encode(ENCODING), b"", 0)
+
+    def _net_route(self, args: list) -> str:
+        """Output of "Get-NetRoute [-InterfaceIndex N] [-DestinationPrefix
+        P] | Format-List -Property ..." with the requested properties."""
+        index = re.search(r"-InterfaceIndex (\d+)", " ".join(args))
+        prefix = re.search(r"-DestinationPrefix (\S+)", " ".join(args))
+        properties = "".join(
+            args[args.index("| Format-List -Property") + 1:]).split(",")
+
+        records = []
+        for route in self._routes(int(index.group(1)) if index else None):
+            if prefix and route[1] != prefix.group(1):
+                continue
+            values = dict(zip(("ifIndex", "DestinationPrefix", "NextHop",
+                               "RouteMetric", "InterfaceMetric"), route))
+            records.append({prop: values[prop] for prop in properties})
+
+        return format_list(records)
+
+    def _queries(self, index: int = None) -> dict:
+        """Outputs of the Format-List queries and the JSON snapshot.
+
+        Args:
+            index (int, optional): Only this network adapter. Defaults to
+                None (all).
+
+        Returns:
+            dict: Output by cmdlet ("snapshot" for the JSON snapshot).
+        """
+        adapters = [adap for adap in self.adapters
+                    if index is None or adap["index"] == index]
+
+        ips = [{"InterfaceIndex": adap["index"], "IPAddress": ip,
+                "PrefixLength": 24,
+                "PrefixOrigin": "Dhcp" if adap["dhcp"] else "Manual",
+                "SuffixOrigin": "Dhcp" if adap["dhcp"] else "Manual"}
+               for adap in adapters if adap["ip"]
+               for ip in [adap["ip"]] + adap["secondary"]]
+        dns = [{"InterfaceIndex": adap["index"],
+                "ServerAddresses": adap["dns"]} for adap in adapters]
+        if index is None:
+            ips.append({"InterfaceIndex": 1, "IPAddress": "127.0.0.1",
+                        "PrefixLength": 8, "PrefixOrigin": "WellKnown",
+                        "SuffixOrigin": "WellKnown"})
+            dns.append({"InterfaceIndex": 1, "ServerAddresses": []})
+
+        return {
+            "Get-NetAdapter": format_list([
+                {"ifIndex": adap["index"], "Name": adap["name"],
+                 "InterfaceDescription": adap["desc"],
+                 "Status": adap["status"], "MacAddress": adap["mac"]}
+                for adap in adapters]),
+            "Get-NetIPAddress": format_list(ips),
+            "Get-DnsClientServerAddress": format_list([
+                {"InterfaceIndex": rec["InterfaceIndex"],
+                 "ServerAddresses": "{"
+                 + ", ".join(rec["ServerAddresses"]) + "}"}
+                for rec in dns]),
+            "snapshot": json.dumps({
+                "adapters": [
+                    {"ifIndex": adap["index"], "Name": adap["name"],
+                     "InterfaceDescription": adap["desc"],
+                     "Status": adap["status"], "MacAddress": adap["mac"]}
+                    for adap in adapters],
+                "ips": ips,
+                "dns": dns,
+                "routes": [{"ifIndex": route[0], "NextHop": route[2],
+                            "RouteMetric": route[3],
+                            "InterfaceMetric": route[4]}
+                           for route in self._routes(index)
+                           if route[1] == "0.0.0.0/0"]
+            }, separators=(",", ":")) + "\r\n"
+        }
+
+    def _routes(self, index: int = None) -> list:
+        """Route table, in the order of Get-NetRoute.
+
+        Args:
+            index (int, optional): Only this network adapter. Defaults to
+                None (all).
+
+        Returns:
+            list: (index, destination, next hop, route metric, interface
+                metric) of each route.
+        """
+        routes = []
+        for adap in sorted(self.adapters, key=lambda adap: -adap["index"]):
+            if not adap["ip"] or index not in (None, adap["index"]):
+                continue
+            net = adap["net"]
+            routes += [(adap["index"], dest, "0.0.0.0", 256, adap["metric"])
+                       for dest in ("255.255.255.255/32", "224.0.0.0/4",
+                                    f"{net}.255/32", f"{adap['ip']}/32",
+                                    f"{net}.0/24")]
+            routes += [(adap["index"], dest, hop, 1, adap["metric"])
+                       for dest, hop in self.static.get(adap["index"], [])]
+            if adap["gateway"]:
+                routes.append((adap["index"], "0.0.0.0/0", adap["gateway"],
+                               0, adap["metric"]))
+            if adap["backup"]:
+                routes.append((adap["index"], "0.0.0.0/0", adap["backup"],
+                               BACKUP_METRIC, adap["metric"]))
+
+        return routes
+
+    def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Answer a command.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Ignored. Defaults to None.
+
+        Returns:
+            CommandResult: Output, error and exit code of the command.
+        """
+        if list(args) == ENCONDING_COMMAND:
+            return CommandResult(b"850\r\n", b"", 0)
+
+        if args[1] == "nmap":
+            return self._nmap(args)
+
+        if args[1] == "arp -a -N":
+            return CommandResult(self._arp(args[2]).encode(ENCODING), b"", 0)
+
+        if args[1] == "Get-NetRoute":
+            output = self._net_route(args)
+        elif args[1].startswith("$ErrorActionPreference"):
+            match = re.search(r"-InterfaceIndex (\d+)", args[1])
+            output = self._queries(
+                int(match.group(1)) if match else None)["snapshot"]
+        else:
+            output = self._queries().get(args[1])
+
+        if output is None:
+            return CommandResult(
+                b"", f"{args[1]} : The term '{args[1]}' is not recognized"
+                "\r\n".encode(ENCODING), 1)
+
+        return CommandResult(output.encode(ENCODING), b"", 0)
+
+
+def generate(name: str) -> str:
+    """Record a synthetic host into benchmarks/fixtures/<name>.json.
+
+    Args:
+        name (str): Key of HOSTS.
+
+    Returns:
+        str: Fixture file.
+    """
+    adapters, routes, seed = {**HOSTS, **LARGE_HOSTS}[name]
+    host = SyntheticHost(adapters, routes, seed)
+    recorder = RecordingRunner(host, encoding=ENCODING)
+
+    scan = next((f"{adap['ip']}/24" for adap in host.adapters
+                 if adap["neighbours"]), None)
+    commands = record(recorder, scan=(scan, "22,80,443") if scan else None)
+    for cmd in commands:
+        cmd["elapsed"] = host.cost(cmd["args"], cmd["stdout"])
+
+    path = os.path.join(FIXTURES, f"{name}.json")
+    save_fixture(path, ENCODING, commands, timing="modeled")
+
+    return path
+
+
+if __name__ == "__main__":
+    for host_name in sys.argv[1:] or HOSTS:
+        print(generate(host_name))
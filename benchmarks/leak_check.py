@@ -0,0 +1,182 @@
+"""Check that refreshing a network adapter card does not leak
+
+Usage: python benchmarks/leak_check.py [--updates 5000]
+
+NetAdapWidget.update_widgets() is called many times on one card in a
+hidden window, alternating between two network adapters that differ in
+everything the card shows (status, prefix and suffix origins, IP
+addresses...). After WARMUP updates, the updates must not add Tcl
+commands (functions bound to widgets or to menu entries), widgets,
+bindings, Python objects or memory beyond the limits. The exit code is 1
+if they do, and 0 if they do not or if there is no display.
+"""
+
+import argparse
+from collections import Counter
+import gc
+import os
+import sys
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from adapter_info import AdapterInfo, IPAddress  # noqa: E402 # pylint: disable=C0413
+import ipv4  # noqa: E402 # pylint: disable=C0413
+
+UPDATES = 5000  # Updates checked
+WARMUP = 100  # Updates run before counting
+OBJECTS_LIMIT = 50  # Python objects that may be added (caches, etc.)
+MEMORY_LIMIT = 64 * 1024  # Bytes that may be allocated and kept
+# Alternating network adapters shown by the card
+ADAPTERS = (
+    {"name": "Ethernet", "desc": "Intel(R) Ethernet Connection",
+     "status": "Up", "mac": "00-15-5D-01-02-03", "ip": "192.168.1.10",
+     "prefix_length": "24", "prefix_origin": "Manual",
+     "suffix_origin": "Manual", "gateway": "192.168.1.1",
+     "pref_dns": "1.1.1.1", "alt_dns": "8.8.8.8",
+     "addresses": [IPAddress(ipv4.pack("192.168.1.10"), 24, "Manual",
+                             "Manual"),
+                   IPAddress(ipv4.pack("192.168.1.11"), 24, "Manual",
+                             "Manual")]},
+    {"name": "vEthernet (Default Switch)",
+     "desc": "Hyper-V Virtual Ethernet Adapter",
+     "status": "Disabled", "mac": "", "ip": "172.20.0.5",
+     "prefix_length": "20", "prefix_origin": "Dhcp",
+     "suffix_origin": "", "gateway": "", "pref_dns": "", "alt_dns": ""},
+)
+
+
+def count_bindings(widget) -> int:
+    """Count the functions bound to the events of a widget.
+
+    Args:
+        widget (tk.Misc): Widget.
+
+    Returns:
+        int: Bound functions (lines of the binding scripts).
+    """
+    return sum(len([line for line in widget.bind(sequence).splitlines()
+                    if line.strip()])
+               for sequence in widget.bind())
+
+
+def count_widgets(widget) -> int:
+    """Count a widget and all its descendants.
+
+    Args:
+        widget (tk.Misc): Root of the widget tree.
+
+    Returns:
+        int: Number of widgets.
+    """
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def counts(app, card) -> dict:
+    """Count the Tk and Python objects that a leak would increase.
+
+    Args:
+        app (tk.Tk): Application window.
+        card (NetAdapWidget): Card updated.
+
+    Returns:
+        dict: Counters by name.
+    """
+    gc.collect()
+    # pylint: disable=protected-access
+    return {"commands": len(app.tk.call("info", "commands")),
+            "widgets": count_widgets(app),
+            "bindings": sum(count_bindings(widget) for widget in (
+                card._d_prefix_origin, card._d_suffix_origin)),
+            "menu entries": card._m_action.menu.index("end") + 1,
+            "objects": len(gc.get_objects())}
+
+
+def check(updates: int) -> int:
+    """Update a card many times and compare the counters.
+
+    Args:
+        updates (int): Updates checked (after WARMUP).
+
+    Returns:
+        int: Exit code (1 if there are leaks).
+    """
+    import tkinter as tk  # pylint: disable=import-outside-toplevel
+    import ttkbootstrap as ttk  # pylint: disable=import-outside-toplevel
+    from net_adap_widget import NetAdapWidget  # pylint: disable=C0415
+
+    os.chdir(ROOT)  # The widgets load ./resources
+    try:
+        app = ttk.Window()
+    except tk.TclError as err:
+        print(f"skipped: {err}")
+        return 0
+    app.withdraw()
+
+    try:
+        infos = [AdapterInfo.from_dict(7, adapter) for adapter in ADAPTERS]
+        card = NetAdapWidget.from_info(infos[0], disabled=False)
+        card.create(frame=app, row=0)
+
+        for number in range(WARMUP):
+            card.update_widgets(infos[number % 2])
+        app.update_idletasks()
+
+        before = counts(app, card)
+        types = Counter(type(obj).__name__ for obj in gc.get_objects())
+        tracemalloc.start()
+        try:
+            memory = tracemalloc.get_traced_memory()[0]
+            for number in range(updates):
+                card.update_widgets(infos[number % 2])
+            app.update_idletasks()
+            gc.collect()
+            growth = tracemalloc.get_traced_memory()[0] - memory
+        finally:
+            tracemalloc.stop()
+        after = counts(app, card)
+        added = Counter(type(obj).__name__
+                        for obj in gc.get_objects()) - types
+    finally:
+        app.destroy()
+
+    leaks = []
+    for name, value in before.items():
+        increase = after[name] - value
+        limit = OBJECTS_LIMIT if name == "objects" else 0
+        print(f"{name:<14} {value:8d} -> {after[name]:8d} ({increase:+d})")
+        if increase > limit:
+            leaks.append(name)
+    print(f"{'memory':<14} {growth / 1024:8.1f} KiB kept after {updates}"
+          " updates")
+    if growth > MEMORY_LIMIT:
+        leaks.append("memory")
+
+    if leaks:
+        print("Objects added:", ", ".join(
+            f"{name} {count:+d}" for name, count in added.most_common(10)))
+        print(f"LEAK: {', '.join(leaks)}")
+        return 1
+
+    return 0
+
+
+def main() -> int:
+    """Parse the arguments and run the check.
+
+    Returns:
+        int: Exit code (1 if there are leaks).
+    """
+    parser = argparse.ArgumentParser(
+        description="Check that NetAdapWidget.update_widgets() does not"
+        " leak Tk or Python objects.")
+    parser.add_argument("--updates", type=int, default=UPDATES,
+                        help="updates checked")
+    args = parser.parse_args()
+
+    return check(args.updates)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
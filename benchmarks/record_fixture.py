@@ -0,0 +1,84 @@
+"""Record the commands of this host into a fixture (Windows only)
+
+Usage: python benchmarks/record_fixture.py name [nmap_target ports]
+
+The fixture is written to benchmarks/fixtures/<name>.json. Review it
+before committing: it contains the addresses of the host and, if a target
+is given, the result of the Nmap scan.
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from network_adapters import NetworkAdapters, invalidate_enconding  # noqa: E402 # pylint: disable=C0413
+from nmap import get_nmap_version, nmap  # noqa: E402 # pylint: disable=C0413
+from powershell import ProcessRunner, get_pool  # noqa: E402 # pylint: disable=C0413
+from recording import RecordingRunner, save_fixture  # noqa: E402 # pylint: disable=C0413
+
+FIXTURES = os.path.join(ROOT, "benchmarks", "fixtures")
+
+
+def record(runner: RecordingRunner, scan_runner: RecordingRunner = None,
+           scan: tuple = None) -> list:
+    """Run every command the application runs and return them recorded:
+    both paths of get_info(), get_adapter() and the ARP table of each
+    network adapter, the routes of the first one with an address (the
+    whole table may be large) and, optionally, an Nmap scan.
+
+    Args:
+        runner (RecordingRunner): Runner for the PowerShell queries.
+        scan_runner (RecordingRunner, optional): Runner for Nmap. Defaults
+            to None (runner).
+        scan (tuple, optional): (ip, ports) to scan with TCP and UDP.
+            Defaults to None (no scan).
+
+    Returns:
+        list: Recorded commands, in order.
+    """
+    scan_runner = scan_runner if scan_runner else runner
+
+    invalidate_enconding()  # So that the enconding command is recorded
+    ni = NetworkAdapters(runner=runner)
+    ni.get_info(snapshot=False)
+    adapters = ni.get_info(snapshot=True)
+
+    for index, a_info in adapters.items():
+        ni.get_adapter(index)
+        if a_info.ip:
+            ni.get_arp_table(a_info.ip)
+
+    index = next((index for index, a_info in adapters.items() if a_info.ip),
+                 None)
+    if index is not None:
+        for _ in ni.iter_routes(index):
+            pass
+
+    if scan and get_nmap_version(runner=scan_runner):
+        for tcp, udp in ((True, False), (False, True), (True, True)):
+            try:
+                nmap(scan[0], scan[1], tcp=tcp, udp=udp, runner=scan_runner)
+            except (KeyError, ValueError, NotImplementedError):
+                pass  # The error output is recorded as well
+
+    if scan_runner is runner:
+        return list(runner.commands)
+
+    return list(runner.commands) + list(scan_runner.commands)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 4):
+        sys.exit(__doc__.split("\n\n", maxsplit=2)[1])
+
+    encoding = NetworkAdapters().enconding
+    recorder = RecordingRunner(get_pool(), encoding=encoding)
+    scan_recorder = RecordingRunner(ProcessRunner(), encoding=encoding)
+    commands = record(recorder, scan_recorder,
+                      tuple(sys.argv[2:]) if len(sys.argv) == 4 else None)
+
+    path = os.path.join(FIXTURES, f"{sys.argv[1]}.json")
+    save_fixture(path, encoding, commands)
+    print(f"{len(commands)} commands recorded in {path}")
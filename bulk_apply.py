@@ -0,0 +1,287 @@
+"""Apply profiles to several network adapters at once"""
+
+from concurrent import futures
+from typing import Callable, NamedTuple
+import ttkbootstrap as ttk
+from ttkbootstrap.dialogs.dialogs import MessageDialog, Messagebox
+
+import execution
+from net_adap_profiles import NetAdapProfiles
+from net_config import ConfigTransaction, TransactionResult
+from tk_dispatch import get_dispatcher
+
+APPNAME = "Sinamawin"
+MAX_WORKERS = 4  # Network adapters configured at the same time
+MAX_LISTED = 15  # Network adapters listed in the dialogs
+
+
+class BulkResult(NamedTuple):
+    """Result of applying a profile to a network adapter"""
+    index: int  # Network adapter index
+    profile: str  # Profile name
+    result: TransactionResult  # None if the transaction was not run
+    error: str  # Error message ("" if the profile was applied)
+
+    def __bool__(self) -> bool:
+        return not self.error
+
+
+def apply_profiles(assignments: dict, profiles: dict = None, runner=None,
+                   max_workers: int = MAX_WORKERS,
+                   progress: Callable = None) -> dict:
+    """Apply profiles to several network adapters concurrently. Each network
+    adapter is configured with a single transaction, so a failure only
+    restores the configuration of that adapter.
+
+    Args:
+        assignments (dict): Profile name for each network adapter index.
+        profiles (dict, optional): Profiles by name (as returned by
+            NetAdapProfiles.get_profiles()). Defaults to None (saved
+            profiles).
+        runner (optional): Command runner for the transactions. Defaults
+            to None (shared PowerShell pool).
+        max_workers (int, optional): Maximum number of network adapters
+            configured at the same time. Defaults to MAX_WORKERS.
+        progress (Callable, optional): Called from a worker thread with the
+            BulkResult of each network adapter when it finishes. Defaults to
+            None.
+
+    Returns:
+        dict: BulkResult for each network adapter index.
+    """
+    if profiles is None:
+        profiles = NetAdapProfiles().get_profiles()
+
+    def apply(index: int, name: str) -> BulkResult:
+        try:
+            result = profile_transaction(index, profiles[name],
+                                         runner).commit()
+            res = BulkResult(index, name, result, result.error)
+        except KeyError:
+            res = BulkResult(index, name, None, f"Unknown profile '{name}'")
+        except Exception as e:  # pylint: disable=broad-exception-caught # noqa
+            res = BulkResult(index, name, None,
+                             str(e) or "The profile could not be applied")
+
+        if progress:
+            progress(res)
+
+        return res
+
+    results = {}
+    with futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = [executor.submit(apply, index, name)
+                   for index, name in assignments.items()]
+        for future in futures.as_completed(pending):
+            res = future.result()
+            results[res.index] = res
+
+    return dict(sorted(results.items()))
+
+
+def bulk_apply_widget(adapters: dict, on_done: Callable = None) -> None:
+    """Window to assign profiles to network adapters and apply them.
+
+    Args:
+        adapters (dict): Information of the network adapters by index
+            (AdapterInfo).
+        on_done (Callable, optional): Called in the event loop once the
+            profiles have been applied. Defaults to None.
+    """
+    profiles = NetAdapProfiles().get_profiles()
+
+    if not profiles:
+        Messagebox.show_error(
+            message="There are no saved profiles.",
+            title=f"{APPNAME} - Error",
+            padding=(30, 30),
+            width=100)
+        return
+
+    popup = ttk.Toplevel(title=f"{APPNAME} - Apply profiles",
+                         resizable=(False, False))
+
+    adap_table = ttk.Treeview(popup, selectmode="extended", height=12)
+    adap_table["columns"] = ("INDEX", "NAME", "IP", "PROFILE", "RESULT")
+    adap_table.column("#0", anchor="center", width=0, stretch=False)
+
+    widths = {"INDEX": 60, "NAME": 180, "IP": 120, "PROFILE": 150,
+              "RESULT": 220}
+    for column in adap_table["columns"]:
+        adap_table.column(column, stretch=False, anchor="center",
+                          width=widths[column])
+        adap_table.heading(column, text=column, anchor="center")
+
+    for index, a_info in adapters.items():
+        adap_table.insert(parent="", index="end", iid=str(index), text="",
+                          values=(index, a_info["name"], a_info["ip"],
+                                  "", ""))
+
+    scrollbar = ttk.Scrollbar(
+        popup, bootstyle="primary-round", orient="vertical",
+        command=adap_table.yview)
+    adap_table.configure(yscrollcommand=scrollbar.set)
+
+    adap_table.grid(row=0, column=0, columnspan=5, sticky="nsew",
+                    padx=(10, 0), pady=(10, 5))
+    scrollbar.grid(row=0, column=5, sticky="ns", padx=(5, 10), pady=(10, 5))
+
+    # Profile to assign
+    l_profile = ttk.Label(popup, text="Profile:")
+    c_profile = ttk.Combobox(popup, values=list(profiles.keys()),
+                             state="readonly", width=25)
+    c_profile.current(0)
+
+    def set_profile(name: str) -> None:
+        for iid in adap_table.selection():
+            adap_table.set(iid, "PROFILE", name)
+            adap_table.set(iid, "RESULT", "")
+
+    b_assign = ttk.Button(popup, text="Assign",
+                          command=lambda: set_profile(c_profile.get()))
+    b_clear = ttk.Button(popup, text="Clear", bootstyle="secondary",
+                         command=lambda: set_profile(""))
+    b_apply = ttk.Button(popup, text="Apply", bootstyle="success")
+
+    l_profile.grid(row=1, column=0, padx=(10, 5), pady=5, sticky="e")
+    c_profile.grid(row=1, column=1, padx=5, pady=5, sticky="w")
+    b_assign.grid(row=1, column=2, padx=5, pady=5)
+    b_clear.grid(row=1, column=3, padx=5, pady=5)
+    b_apply.grid(row=1, column=4, padx=5, pady=5, sticky="e")
+
+    pbar = ttk.Progressbar(popup, bootstyle="success-striped",
+                           mode="determinate")
+    pbar.grid(row=2, column=0, columnspan=6, sticky="ew", padx=10,
+              pady=(5, 10))
+
+    def show_progress(res: BulkResult) -> None:
+        """Show the result of a network adapter (in the event loop)."""
+        adap_table.set(str(res.index), "RESULT",
+                       "Applied" if res else res.error)
+        pbar.step(1)
+
+    def show_summary(results: dict) -> None:
+        """Show the summary of the operation (in the event loop)."""
+        failed = [res for res in results.values() if not res]
+        msg = (f"Profiles applied to {len(results) - len(failed)}"
+               f" of {len(results)} network adapters.")
+        if failed:
+            msg += "\n\nNot applied:\n" + "\n".join(
+                f"\t{adapters[res.index]['name']}: {res.error}"
+                for res in failed[:MAX_LISTED])
+            if len(failed) > MAX_LISTED:
+                msg += f"\n\t... and {len(failed) - MAX_LISTED} more"
+
+        for widget in (b_assign, b_clear, b_apply):
+            widget.configure(state="normal")
+
+        Messagebox.show_info(
+            message=msg,
+            title=f"{APPNAME} - Apply profiles",
+            padding=(30, 30),
+            width=100,
+            parent=popup)
+
+        if on_done:
+            on_done()
+
+    def apply_btn() -> None:
+        assignments = {}
+        for iid in adap_table.get_children():
+            name = adap_table.set(iid, "PROFILE")
+            if name:
+                assignments[int(iid)] = name
+
+        if not assignments:
+            Messagebox.show_error(
+                message="No profile has been assigned to any adapter.",
+                title=f"{APPNAME} - Error",
+                padding=(30, 30),
+                width=100,
+                parent=popup)
+            return
+
+        msg = ("Do you want to apply these profiles to"
+               f" {len(assignments)} network adapters?\n" + "\n".join(
+                   f"\t{adapters[index]['name']}: {name}"
+                   for index, name in list(assignments.items())[:MAX_LISTED]))
+        if len(assignments) > MAX_LISTED:
+            msg += f"\n\t... and {len(assignments) - MAX_LISTED} more"
+
+        dialog = MessageDialog(message=msg,
+                               title="Apply profiles",
+                               buttons=["Apply", "Cancel"],
+                               padding=(30, 30),
+                               width=100,
+                               parent=popup)
+        dialog.show()
+
+        if dialog.result != "Apply":
+            return
+
+        for widget in (b_assign, b_clear, b_apply):
+            widget.configure(state="disabled")
+        for index in assignments:
+            adap_table.set(str(index), "RESULT", "Applying...")
+        pbar.configure(maximum=len(assignments), value=0)
+
+        dispatcher = get_dispatcher(popup)
+
+        def run() -> None:
+            results = apply_profiles(
+                assignments, profiles,
+                progress=lambda res: dispatcher.post(show_progress, res))
+            dispatcher.post(show_summary, results)
+
+        execution.start_thread(run, name="bulk-apply")
+
+    b_apply.configure(command=apply_btn)
+
+    # Mouse wheel behavior
+    def popup_window_scroll(_):
+        """To avoid propagating the event to the main window."""
+        scrollbar.set(*adap_table.yview())
+        return "break"
+
+    popup.bind("<MouseWheel>", popup_window_scroll)
+
+    return
+
+
+def profile_transaction(index: int, profile: dict,
+                        runner=None) -> ConfigTransaction:
+    """Create the transaction that applies a profile to a network adapter,
+    with the same changes as NetAdapWidget.apply_changes().
+
+    Args:
+        index (int): Network adapter index.
+        profile (dict): Profile ("ip", "mask", "gateway", "pref_dns" and
+            "alt_dns").
+        runner (optional): Command runner. Defaults to None (shared
+            PowerShell pool).
+
+    Raises:
+        ValueError: Invalid profile.
+
+    Returns:
+        ConfigTransaction: Transaction ready to be committed.
+    """
+    pref_dns = profile.get("pref_dns", "")
+    alt_dns = profile.get("alt_dns", "")
+    gateway = profile.get("gateway", "")
+
+    if not pref_dns and alt_dns:
+        pref_dns, alt_dns = alt_dns, ""
+
+    tr = ConfigTransaction(index, runner=runner)
+    tr.set_ip_mask(profile.get("ip", ""), profile.get("mask", ""))
+
+    if gateway and gateway != "0.0.0.0":
+        tr.set_def_gateway(gateway)
+
+    if pref_dns:
+        tr.set_dns_servers(pref_dns, alt_dns)
+    else:
+        tr.reset_dns_servers()
+
+    return tr
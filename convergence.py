@@ -0,0 +1,129 @@
+"""Wait until a configuration change is visible in a network adapter"""
+
+import asyncio
+from time import monotonic
+from typing import Callable, NamedTuple
+
+from adapter_info import AdapterInfo
+import ipv4
+
+FIRST_DELAY = 0.25  # Seconds before the first query
+BACKOFF = 2  # Factor applied to the delay after each query
+MAX_DELAY = 2.0  # Maximum seconds between queries
+DEADLINE = 30.0  # Seconds to wait (a DHCP lease may take a while)
+# Fields compared as IPv4 addresses ("192.168.001.010" is "192.168.1.10")
+ADDRESS_FIELDS = ("ip", "mask", "gateway", "pref_dns", "alt_dns")
+
+
+class Convergence(NamedTuple):
+    """Result of wait_for_state()"""
+    info: AdapterInfo  # Last information obtained (None if none)
+    converged: bool  # The expected state was reached before the deadline
+    polls: int  # Number of queries
+    elapsed: float  # Seconds waited
+
+    def __bool__(self) -> bool:
+        return self.converged
+
+
+def backoff_delays(first: float = FIRST_DELAY, factor: float = BACKOFF,
+                   maximum: float = MAX_DELAY):
+    """Delays between queries, growing exponentially up to a maximum.
+
+    Args:
+        first (float, optional): First delay. Defaults to FIRST_DELAY.
+        factor (float, optional): Growth factor. Defaults to BACKOFF.
+        maximum (float, optional): Maximum delay. Defaults to MAX_DELAY.
+
+    Yields:
+        float: Seconds to wait before the next query.
+    """
+    delay = first
+    while True:
+        yield min(delay, maximum)
+        delay *= factor
+
+
+def matches(info: AdapterInfo, expected) -> bool:
+    """Check whether a network adapter is in the expected state.
+
+    Args:
+        info (AdapterInfo): Network adapter information.
+        expected (dict | Callable): Expected values by field (e.g.,
+            {"ip": "192.168.1.10"}) or function that receives the
+            information and returns True if it is the expected one.
+
+    Returns:
+        bool: True if the state is the expected one.
+    """
+    if info is None:
+        return False
+
+    if callable(expected):
+        return bool(expected(info))
+
+    return all(_normalize(field, info[field]) == _normalize(field, value)
+               for field, value in expected.items())
+
+
+def _normalize(field: str, value):
+    """Write an address as the network adapter reports it, so that the
+    values entered by the user (e.g., with leading zeros) are compared
+    correctly.
+
+    Args:
+        field (str): Field name.
+        value (Any): Value of the field.
+
+    Returns:
+        Any: Canonical address for the fields in ADDRESS_FIELDS, or the
+            value itself.
+    """
+    if field in ADDRESS_FIELDS and isinstance(value, str):
+        packed = ipv4.pack(value.strip())
+        if packed is not None:
+            return ipv4.unpack(packed)
+
+    return value
+
+
+async def wait_for_state(query: Callable, expected,
+                         deadline: float = DEADLINE,
+                         delays=None) -> Convergence:
+    """Query a network adapter until it is in the expected state or the
+    deadline passes. Failed queries (e.g., the adapter is restarting) are
+    retried.
+
+    Args:
+        query (Callable): Coroutine function without arguments that returns
+            the AdapterInfo (e.g., AsyncNetworkAdapters().get_adapter).
+        expected (dict | Callable): Expected state (see matches()).
+        deadline (float, optional): Seconds to wait. Defaults to DEADLINE.
+        delays (optional): Iterable with the seconds to wait before each
+            query. Defaults to None (backoff_delays()).
+
+    Returns:
+        Convergence: Last information and whether it is the expected one.
+    """
+    start = monotonic()
+    info = None
+    polls = 0
+
+    for delay in delays if delays is not None else backoff_delays():
+        remaining = deadline - (monotonic() - start)
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(delay, remaining))
+
+        polls += 1
+        try:
+            info = await asyncio.wait_for(
+                query(), max(deadline - (monotonic() - start), 0.001))
+        except (KeyError, ValueError, OSError, NotImplementedError,
+                asyncio.TimeoutError):
+            continue
+
+        if matches(info, expected):
+            return Convergence(info, True, polls, monotonic() - start)
+
+    return Convergence(info, False, polls, monotonic() - start)
@@ -0,0 +1,477 @@
+"""Run processes with timeouts and cancellation, killing their whole tree
+
+Every command that starts a process (queries, ping, Nmap...) goes through
+run() or stream(). A process that does not finish in time, or whose
+CancelToken is cancelled (e.g., the Cancel button of the Nmap window), is
+killed together with the processes it started: a program launched through
+powershell.exe would otherwise keep running, and holding the output pipe,
+after its parent is gone. Processes that survive being killed and threads
+that do not end when joined are counted by diagnostics().
+"""
+
+import atexit
+from concurrent.futures import CancelledError
+import os
+import signal
+import subprocess
+import sys
+import threading
+import traceback
+from typing import Callable, NamedTuple
+
+try:
+    import psutil
+except ImportError:  # Optional, taskkill or process groups are used instead
+    psutil = None
+
+# Only defined on Windows
+CREATE_NO_WINDOW = getattr(subprocess, "CREATE_NO_WINDOW", 0)
+KILL_WAIT = 5  # Seconds to wait for a killed process tree to exit
+JOIN_TIMEOUT = 5  # Seconds to wait for each tracked thread at exit
+
+
+class CommandResult(NamedTuple):
+    """Result of a command, equivalent to Popen.communicate()"""
+    stdout: bytes
+    stderr: bytes
+    returncode: int
+
+
+class Diagnostics(NamedTuple):
+    """Counters of the processes and threads (result of diagnostics())"""
+    started: int  # Processes started
+    running: int  # Processes running now
+    timed_out: int  # Processes killed because they did not finish in time
+    cancelled: int  # Processes killed because their operation was cancelled
+    leaked_processes: int  # Processes still alive after being killed
+    threads: int  # Tracked threads running now
+    leaked_threads: int  # Tracked threads still alive after being joined
+
+    @property
+    def leaked(self) -> int:
+        """Processes and threads leaked."""
+        return self.leaked_processes + self.leaked_threads
+
+
+_LOCK = threading.Lock()
+_PROCESSES = set()  # Processes started by run() and stream() still running
+_THREADS = set()  # Threads started by start_thread() still running
+_COUNTS = {"started": 0, "timed_out": 0, "cancelled": 0,
+           "leaked_processes": 0, "leaked_threads": 0}
+
+
+class CancelToken:
+    """Cancellation shared by the code that starts an operation (e.g., a
+    window) and the processes and threads that carry it out. Cancelling
+    kills the running processes of the operation in the background, while
+    threads check the token between steps."""
+
+    def __init__(self) -> None:
+        self._event = threading.Event()
+        self._callbacks = []  # Functions to call when cancelled
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _call(callbacks: list) -> None:
+        """Call the subscribed functions, logging their errors.
+
+        Args:
+            callbacks (list): Functions without arguments.
+        """
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:  # pylint: disable=broad-exception-caught
+                traceback.print_exc()
+
+    @property
+    def cancelled(self) -> bool:
+        """The operation has been cancelled."""
+        return self._event.is_set()
+
+    def cancel(self) -> None:
+        """Cancel the operation. Only the first call has effect. The
+        subscribed functions run in a tracked thread, so the caller (e.g.,
+        a Cancel button in the Tk thread) does not wait for the process
+        trees to be killed (up to KILL_WAIT seconds each)."""
+        with self._lock:
+            if self._event.is_set():
+                return
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+
+        if callbacks:
+            start_thread(self._call, callbacks, name="cancel")
+
+    def check(self) -> None:
+        """Stop the operation if it has been cancelled.
+
+        Raises:
+            CancelledError: The operation has been cancelled.
+        """
+        if self._event.is_set():
+            raise CancelledError("The operation has been cancelled")
+
+    def subscribe(self, callback: Callable) -> Callable:
+        """Call a function when the operation is cancelled (at once if it
+        already is).
+
+        Args:
+            callback (Callable): Function without arguments.
+
+        Returns:
+            Callable: Function that removes the subscription.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unsubscribe(callback)
+
+        callback()
+
+        return lambda: None
+
+    def _unsubscribe(self, callback: Callable) -> None:
+        """Remove a function added with subscribe().
+
+        Args:
+            callback (Callable): Function to remove.
+        """
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def wait(self, timeout: float = None) -> bool:
+        """Wait until the operation is cancelled or the time passes.
+
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to None
+                (no limit).
+
+        Returns:
+            bool: True if the operation has been cancelled.
+        """
+        return self._event.wait(timeout)
+
+
+def _count(counter: str, amount: int = 1) -> None:
+    """Increase a diagnostics counter.
+
+    Args:
+        counter (str): Counter name (key of _COUNTS).
+        amount (int, optional): Amount to add. Defaults to 1.
+    """
+    with _LOCK:
+        _COUNTS[counter] += amount
+
+
+def _end(proc: subprocess.Popen) -> None:
+    """Kill the tree of a process (if it is running), wait for it and
+    close its pipes.
+
+    Args:
+        proc (subprocess.Popen): Process started by _start().
+    """
+    leaked = 0
+    if proc.poll() is None:
+        leaked = kill_tree(proc.pid)
+        try:
+            proc.kill()
+        except OSError:
+            pass
+
+    try:
+        proc.wait(timeout=KILL_WAIT)
+    except subprocess.TimeoutExpired:
+        leaked += 1
+
+    for pipe in (proc.stdout, proc.stderr):
+        if pipe is not None:
+            pipe.close()
+
+    if leaked:
+        _count("leaked_processes", leaked)
+
+
+def _finish(proc: subprocess.Popen) -> None:
+    """Stop tracking a process.
+
+    Args:
+        proc (subprocess.Popen): Process started by _start().
+    """
+    with _LOCK:
+        _PROCESSES.discard(proc)
+
+
+def _start(args: list, stderr) -> subprocess.Popen:
+    """Start and track a hidden process. Outside Windows it leads a new
+    process group, so that its tree can be killed without psutil.
+
+    Args:
+        args (list): Program and arguments.
+        stderr: Destination of the error output (e.g., subprocess.PIPE).
+
+    Returns:
+        subprocess.Popen: Process with its output in a pipe.
+    """
+    proc = subprocess.Popen(args,
+                            stdout=subprocess.PIPE,
+                            stderr=stderr,
+                            stdin=subprocess.DEVNULL,
+                            creationflags=CREATE_NO_WINDOW,
+                            start_new_session=os.name != "nt")
+    with _LOCK:
+        _PROCESSES.add(proc)
+        _COUNTS["started"] += 1
+
+    return proc
+
+
+def diagnostics() -> Diagnostics:
+    """Get the counters of the processes and threads.
+
+    Returns:
+        Diagnostics: Current counters.
+    """
+    with _LOCK:
+        return Diagnostics(running=len(_PROCESSES),
+                           threads=sum(thread.is_alive()
+                                       for thread in _THREADS),
+                           **_COUNTS)
+
+
+def join(thread: threading.Thread, timeout: float = JOIN_TIMEOUT) -> bool:
+    """Wait for a thread, counting it as leaked if it does not end in time.
+
+    Args:
+        thread (threading.Thread): Thread to wait for.
+        timeout (float, optional): Seconds to wait. Defaults to
+            JOIN_TIMEOUT.
+
+    Returns:
+        bool: True if the thread has ended.
+    """
+    thread.join(timeout)
+    if thread.is_alive():
+        _count("leaked_threads")
+        return False
+
+    return True
+
+
+def kill_tree(pid: int, wait: float = KILL_WAIT) -> int:
+    """Kill a process and all its descendants. Without psutil, taskkill is
+    used on Windows and the process group elsewhere.
+
+    Args:
+        pid (int): Process identifier.
+        wait (float, optional): Seconds to wait for the descendants to
+            exit. Defaults to KILL_WAIT.
+
+    Returns:
+        int: Number of descendants still alive (the process itself must
+            be waited for by its owner).
+    """
+    if psutil is not None:
+        try:
+            parent = psutil.Process(pid)
+            children = parent.children(recursive=True)
+        except psutil.Error:
+            return 0
+
+        for proc in [parent] + children:
+            try:
+                proc.kill()
+            except psutil.Error:
+                pass
+
+        _, alive = psutil.wait_procs(children, timeout=wait)
+        return len(alive)
+
+    if os.name == "nt":
+        try:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(pid)],
+                           stdout=subprocess.DEVNULL,
+                           stderr=subprocess.DEVNULL,
+                           stdin=subprocess.DEVNULL,
+                           creationflags=CREATE_NO_WINDOW,
+                           timeout=wait, check=False)
+        except (OSError, subprocess.TimeoutExpired):
+            pass
+    else:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except OSError:
+            pass
+
+    return 0
+
+
+def run(args: list, timeout: float = None,
+        cancel: CancelToken = None) -> CommandResult:
+    """Run a command in a new process.
+
+    Args:
+        args (list): Program and arguments.
+        timeout (float, optional): Seconds to wait for the process.
+            Defaults to None (no limit).
+        cancel (CancelToken, optional): Cancellation of the operation.
+            Defaults to None (not cancellable).
+
+    Raises:
+        CancelledError: The operation was cancelled. The process tree has
+            been killed.
+        TimeoutError: The process did not finish in time. The process tree
+            has been killed.
+
+    Returns:
+        CommandResult: Output, error and exit code of the process.
+    """
+    if cancel is not None:
+        cancel.check()
+
+    proc = _start(args, stderr=subprocess.PIPE)
+    killed = threading.Event()
+
+    def on_cancel() -> None:
+        if proc.poll() is None:
+            killed.set()
+            kill_tree(proc.pid)
+
+    unsubscribe = cancel.subscribe(on_cancel) if cancel else None
+    try:
+        output, error = proc.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired as err:
+        _count("timed_out")
+        raise TimeoutError(f"'{args[0]}' did not finish in time") from err
+    finally:
+        if unsubscribe is not None:
+            unsubscribe()
+        _end(proc)
+        _finish(proc)
+
+    if killed.is_set():
+        _count("cancelled")
+        raise CancelledError(f"'{args[0]}' has been cancelled")
+
+    return CommandResult(output, error, proc.returncode)
+
+
+def shutdown(timeout: float = JOIN_TIMEOUT) -> Diagnostics:
+    """Kill the process trees still running and wait for the tracked
+    threads. Called at exit, where leaks are reported in stderr.
+
+    Args:
+        timeout (float, optional): Seconds to wait for each thread.
+            Defaults to JOIN_TIMEOUT.
+
+    Returns:
+        Diagnostics: Counters after the cleanup.
+    """
+    with _LOCK:
+        processes = list(_PROCESSES)
+        threads = list(_THREADS)
+
+    for proc in processes:
+        _end(proc)
+        _finish(proc)
+
+    for thread in threads:
+        if thread is not threading.current_thread():
+            join(thread, timeout)
+
+    diag = diagnostics()
+    if diag.leaked:
+        print(f"{diag.leaked_processes} processes and {diag.leaked_threads}"
+              " threads leaked", file=sys.stderr)
+
+    return diag
+
+
+def start_thread(target: Callable, *args, name: str = None,
+                 daemon: bool = True) -> threading.Thread:
+    """Start a thread tracked by diagnostics() and waited for at exit.
+
+    Args:
+        target (Callable): Function run by the thread.
+        *args: Arguments of the function.
+        name (str, optional): Thread name. Defaults to None.
+        daemon (bool, optional): Do not keep the application alive.
+            Defaults to True.
+
+    Returns:
+        threading.Thread: Started thread.
+    """
+    def tracked() -> None:
+        try:
+            target(*args)
+        finally:
+            with _LOCK:
+                _THREADS.discard(thread)
+
+    thread = threading.Thread(target=tracked, name=name, daemon=daemon)
+    with _LOCK:
+        _THREADS.add(thread)
+    thread.start()
+
+    return thread
+
+
+def stream(args: list, timeout: float = None, cancel: CancelToken = None):
+    """Run a command in a new process and yield its output line by line,
+    as it is written. The process tree is killed if the caller stops
+    reading.
+
+    Args:
+        args (list): Program and arguments.
+        timeout (float, optional): Seconds to wait for the process.
+            Defaults to None (no limit).
+        cancel (CancelToken, optional): Cancellation of the operation.
+            Defaults to None (not cancellable).
+
+    Raises:
+        CancelledError: The operation was cancelled.
+        TimeoutError: The process did not finish in time.
+
+    Yields:
+        bytes: Each line of the output, with its line break.
+    """
+    if cancel is not None:
+        cancel.check()
+
+    proc = _start(args, stderr=subprocess.DEVNULL)
+    expired = threading.Event()
+    killed = threading.Event()
+
+    def kill(reason: threading.Event) -> None:
+        if proc.poll() is None:
+            reason.set()
+            kill_tree(proc.pid)
+
+    timer = None
+    if timeout is not None:
+        timer = threading.Timer(timeout, kill, args=(expired,))
+        timer.daemon = True
+        timer.start()
+    unsubscribe = (cancel.subscribe(lambda: kill(killed)) if cancel
+                   else None)
+
+    try:
+        yield from proc.stdout
+    finally:
+        if timer is not None:
+            timer.cancel()
+        if unsubscribe is not None:
+            unsubscribe()
+        _end(proc)
+        _finish(proc)
+
+    if expired.is_set():
+        _count("timed_out")
+        raise TimeoutError(f"'{args[0]}' did not finish in time")
+    if killed.is_set():
+        _count("cancelled")
+        raise CancelledError(f"'{args[0]}' has been cancelled")
+
+
+atexit.register(shutdown)
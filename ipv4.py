@@ -0,0 +1,152 @@
+"""IPv4 addresses and subnet masks packed as integers
+
+Addresses are parsed with a table of the valid octets instead of regular
+expressions, and the subnet masks of the 33 prefix lengths are computed
+once. The batch validators check whole columns (e.g., of a CSV file),
+validating each distinct value only once.
+"""
+
+import socket
+
+# Valid octets ("0" to "255", also with leading zeros up to 3 digits)
+_OCTETS = {text: value for value in range(256)
+           for text in {str(value), f"{value:02d}", f"{value:03d}"}}
+
+MASKS = tuple((0xFFFFFFFF << (32 - bits)) & 0xFFFFFFFF
+              for bits in range(33))  # Subnet mask by prefix length
+PREFIX_LENGTHS = {mask: bits
+                  for bits, mask in enumerate(MASKS)}  # Inverse of MASKS
+_MASK_TEXTS = tuple(socket.inet_ntoa(mask.to_bytes(4, "big"))
+                    for mask in MASKS)
+
+
+def is_valid(ip: str) -> bool:
+    """Check if a text is an IPv4 address (e.g., "192.168.1.10").
+
+    Args:
+        ip (str): Text to check.
+
+    Returns:
+        bool: True if it is a valid address.
+    """
+    return pack(ip) is not None
+
+
+def is_valid_mask(mask: str) -> bool:
+    """Check if a text is a subnet mask (e.g., "255.255.255.0").
+
+    Args:
+        mask (str): Text to check.
+
+    Returns:
+        bool: True if it is a valid subnet mask.
+    """
+    return pack(mask) in PREFIX_LENGTHS
+
+
+def invalid(values, masks: bool = False, allow_empty: bool = False) -> list:
+    """Find the invalid values of a column. Each distinct value is only
+    validated once.
+
+    Args:
+        values (Iterable[str]): Addresses or subnet masks.
+        masks (bool, optional): The values are subnet masks. Defaults to
+            False (addresses).
+        allow_empty (bool, optional): Empty values are valid. Defaults to
+            False.
+
+    Returns:
+        list: Positions of the invalid values.
+    """
+    values = list(values)
+    check = is_valid_mask if masks else is_valid
+    wrong = {value for value in set(values)
+             if not (check(value) or allow_empty and not value)}
+
+    return [pos for pos, value in enumerate(values) if value in wrong]
+
+
+def network(ip: int, prefix_length: int) -> tuple:
+    """Get the first and last address of the subnet of an address.
+
+    Args:
+        ip (int): Packed address.
+        prefix_length (int | None): Prefix length (None for the address
+            alone).
+
+    Returns:
+        tuple: First and last address, packed.
+    """
+    if prefix_length is None:
+        return (ip, ip)
+
+    mask = MASKS[prefix_length]
+
+    return (ip & mask, ip | ~mask & 0xFFFFFFFF)
+
+
+def pack(ip: str):
+    """Convert an IPv4 address to an integer.
+
+    Args:
+        ip (str): IPv4 address (e.g., "192.168.1.10") or "".
+
+    Returns:
+        int | None: Packed address or None if empty or invalid.
+    """
+    octets = ip.split(".") if ip else ()
+    if len(octets) != 4:
+        return None
+
+    try:
+        return (_OCTETS[octets[0]] << 24 | _OCTETS[octets[1]] << 16
+                | _OCTETS[octets[2]] << 8 | _OCTETS[octets[3]])
+    except KeyError:
+        return None
+
+
+def prefix_length(mask: str):
+    """Convert a subnet mask into its prefix length.
+
+    Args:
+        mask (str): Subnet mask (e.g., "255.255.255.0").
+
+    Returns:
+        int | None: Prefix length or None if it is not a subnet mask.
+    """
+    return PREFIX_LENGTHS.get(pack(mask))
+
+
+def subnet_mask(bits: int) -> str:
+    """Convert a prefix length into a subnet mask.
+
+    Args:
+        bits (int | None): Prefix length (0-32).
+
+    Raises:
+        ValueError: Invalid prefix length. Must be between 0 and 32.
+
+    Returns:
+        str: Subnet mask (e.g., "255.255.255.0") or "" if None.
+    """
+    if bits is None:
+        return ""
+    if not 0 <= bits <= 32:
+        raise ValueError("Invalid number of bits. Must be between 0 and 32.")
+
+    return _MASK_TEXTS[bits]
+
+
+def unpack(ip) -> str:
+    """Convert an integer to an IPv4 address.
+
+    Args:
+        ip (int | None): Packed address.
+
+    Returns:
+        str: IPv4 address or "" if None.
+    """
+    if ip is None:
+        return ""
+
+    return socket.inet_ntoa(ip.to_bytes(4, "big"))
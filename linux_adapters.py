@@ -0,0 +1,342 @@
+"""Get information about network adapters in Linux without running commands
+
+The interfaces are read from /sys/class/net, the IPv4 addresses from a
+netlink dump, the default routes from /proc/net/route, the ARP table from
+/proc/net/arp and the DNS servers from resolv.conf.
+"""
+
+import os
+import socket
+import struct
+
+from adapter_backend import AdapterBackend, Route
+from adapter_info import AdapterInfo, IPAddress
+import ipv4
+
+# Netlink (linux/netlink.h, linux/rtnetlink.h, linux/if_addr.h)
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP = 0x300
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+IFA_FLAGS = 8
+IFA_F_PERMANENT = 0x80
+
+IFF_UP = 0x1  # Administratively up (linux/if.h)
+IFF_LOOPBACK = 0x8
+ATF_PERM = 0x4  # Static ARP entry (linux/if_arp.h)
+
+# systemd-resolved writes the real servers here when resolv.conf points
+# to its local stub
+RESOLV_CONF = ("run/systemd/resolve/resolv.conf", "etc/resolv.conf")
+
+
+def format_mac(mac: str) -> str:
+    """Format a MAC address like Windows does.
+
+    Args:
+        mac (str): MAC address (e.g., "aa:bb:cc:dd:ee:ff").
+
+    Returns:
+        str: MAC address (e.g., "AA-BB-CC-DD-EE-FF").
+    """
+    return mac.strip().upper().replace(":", "-")
+
+
+def iter_netlink_ipv4():
+    """Dump the IPv4 addresses of all the interfaces with netlink.
+
+    Raises:
+        OSError: Netlink is not available.
+
+    Yields:
+        tuple: (index, ip, prefix_length, permanent) of each address.
+    """
+    with socket.socket(socket.AF_NETLINK, socket.SOCK_RAW,
+                       socket.NETLINK_ROUTE) as sock:
+        sock.bind((0, 0))
+        # nlmsghdr + ifaddrmsg
+        sock.send(struct.pack("=IHHII", 24, RTM_GETADDR,
+                              NLM_F_REQUEST | NLM_F_DUMP, 1, 0)
+                  + struct.pack("=BBBBI", socket.AF_INET, 0, 0, 0, 0))
+
+        while True:
+            data = sock.recv(65536)
+            offset = 0
+            while offset + 16 <= len(data):
+                length, msg_type = struct.unpack_from("=IH", data, offset)
+                if msg_type in (NLMSG_DONE, NLMSG_ERROR) or length < 16:
+                    return
+
+                if msg_type == RTM_NEWADDR:
+                    _, prefix_length, flags, _, index = struct.unpack_from(
+                        "=BBBBI", data, offset + 16)
+                    address = local = None
+                    attr = offset + 24
+                    while attr + 4 <= offset + length:
+                        attr_len, attr_type = struct.unpack_from(
+                            "=HH", data, attr)
+                        if attr_len < 4:
+                            break
+                        value = data[attr + 4:attr + attr_len]
+                        if attr_type == IFA_LOCAL:
+                            local = socket.inet_ntoa(value)
+                        elif attr_type == IFA_ADDRESS:
+                            address = socket.inet_ntoa(value)
+                        elif attr_type == IFA_FLAGS:
+                            flags = struct.unpack("=I", value)[0]
+                        attr += (attr_len + 3) & ~3
+
+                    ip = local or address
+                    if ip:
+                        yield (index, ip, prefix_length,
+                               bool(flags & IFA_F_PERMANENT))
+
+                offset += (length + 3) & ~3
+
+
+class LinuxNetworkAdapters(AdapterBackend):
+    """Network adapters of a Linux system (read only)"""
+
+    def __init__(self, root: str = "/") -> None:
+        super().__init__()
+        self.root = root  # Directory containing sys, proc, etc and run
+
+    def _get_dns_servers(self) -> list:
+        """Get the IPv4 DNS servers of the system.
+
+        Returns:
+            list: Addresses in order of preference.
+        """
+        for path in RESOLV_CONF:
+            try:
+                with open(self._path(path), "r", encoding="utf-8") as file:
+                    servers = []
+                    for line in file:
+                        fields = line.split()
+                        if (len(fields) > 1 and fields[0] == "nameserver"
+                                and ipv4.pack(fields[1]) is not None):
+                            servers.append(fields[1])
+                    return servers
+            except OSError:
+                continue
+
+        return []
+
+    def _get_gateways(self) -> dict:
+        """Get the default gateway of each interface from /proc/net/route.
+        If an interface has several, the one with the lowest metric is used.
+
+        Returns:
+            dict: (gateway, metric) by interface name.
+        """
+        gateways = {}
+        with open(self._path("proc/net/route"), "r",
+                  encoding="utf-8") as file:
+            next(file, None)  # Header
+            for line in file:
+                fields = line.split()
+                if (len(fields) < 8 or fields[1] != "00000000"
+                        or fields[7] != "00000000"):
+                    continue
+
+                gateway = socket.inet_ntoa(
+                    struct.pack("<I", int(fields[2], 16)))
+                metric = int(fields[6])
+                if (fields[0] not in gateways
+                        or metric < gateways[fields[0]][1]):
+                    gateways[fields[0]] = (gateway, metric)
+
+        return gateways
+
+    def get_arp_table(self, ip_netap: str) -> list:
+        """Get the ARP table of a network adapter from /proc/net/arp.
+
+        Args:
+            ip_netap (str): Network adapter IP.
+
+        Returns:
+            list: Entries ({"iaddr": ..., "phyaddr": ..., "itype": ...}).
+        """
+        ip_int = ipv4.pack(ip_netap)
+        names = {a_info.name for a_info in self.get_info().values()
+                 if any(addr.ip_int == ip_int for addr in a_info.addresses)}
+
+        data_arp = []
+        with open(self._path("proc/net/arp"), "r", encoding="utf-8") as file:
+            next(file, None)  # Header
+            for line in file:
+                fields = line.split()
+                if len(fields) < 6 or fields[5] not in names:
+                    continue
+
+                data_arp.append({
+                    "iaddr": fields[0],
+                    "phyaddr": format_mac(fields[3]),
+                    "itype": ("static" if int(fields[2], 16) & ATF_PERM
+                              else "dynamic")
+                })
+
+        return data_arp
+
+    def get_info(self) -> dict:
+        """Get the information about the network adapters. If a source
+        can not be read, the rest of the information is returned and the
+        error is saved in failed_queries.
+
+        Returns:
+            dict: AdapterInfo records by network adapter index, sorted.
+        """
+        self.failed_queries = {}
+        net_dir = self._path("sys/class/net")
+
+        adapters = {}
+        names = {}
+        for name in os.listdir(net_dir):
+            try:
+                a_info = self._read_interface(os.path.join(net_dir, name))
+            except (OSError, ValueError):
+                continue  # Removed while reading
+            if a_info is None:
+                continue
+            adapters[a_info.index] = a_info
+            names[name] = a_info
+
+        try:
+            addresses = {}  # Index -> [IPAddress, ...]
+            for index, ip, prefix_length, permanent in iter_netlink_ipv4():
+                if index not in adapters:
+                    continue
+
+                origin = "Manual" if permanent else "Dhcp"
+                addresses.setdefault(index, []).append(IPAddress(
+                    ipv4.pack(ip), prefix_length, origin, origin))
+
+            # As in Windows, the manual address is the primary
+            for index, addrs in addresses.items():
+                adapters[index].set_addresses(addrs)
+        except OSError as err:
+            self.failed_queries["ip"] = err
+
+        try:
+            for name, (gateway, _) in self._get_gateways().items():
+                if name in names:
+                    names[name].gateway_int = ipv4.pack(gateway)
+        except OSError as err:
+            self.failed_queries["gateway"] = err
+
+        # The DNS servers are global, so they are shown in the network
+        # adapters used for the default route
+        dns = self._get_dns_servers()
+        for a_info in adapters.values():
+            if dns and a_info.gateway_int is not None:
+                a_info.pref_dns_int = ipv4.pack(dns[0])
+                a_info.alt_dns_int = ipv4.pack(dns[1] if len(dns) > 1
+                                               else "")
+
+        return dict(sorted(adapters.items()))
+
+    def iter_routes(self, index: int = None):
+        """Get the IPv4 route table from /proc/net/route, one route at a
+        time. Linux has no interface metric, so it is always 0.
+
+        Args:
+            index (int, optional): Only the routes of this network adapter.
+                Defaults to None (all).
+
+        Yields:
+            Route: Each route.
+        """
+        indexes = {}  # Interface name -> index
+        with open(self._path("proc/net/route"), "r",
+                  encoding="utf-8") as file:
+            next(file, None)  # Header
+            for line in file:
+                fields = line.split()
+                if len(fields) < 8:
+                    continue
+
+                if fields[0] not in indexes:
+                    try:
+                        with open(self._path(
+                                f"sys/class/net/{fields[0]}/ifindex"),
+                                "r", encoding="utf-8") as ifindex:
+                            indexes[fields[0]] = int(ifindex.read())
+                    except (OSError, ValueError):
+                        indexes[fields[0]] = None  # Removed while reading
+                if indexes[fields[0]] is None or (
+                        index is not None and indexes[fields[0]] != index):
+                    continue
+
+                dest, gateway = (
+                    socket.inet_ntoa(struct.pack("<I", int(field, 16)))
+                    for field in (fields[1], fields[2]))
+                prefix_length = bin(int(fields[7], 16)).count("1")
+                yield Route(index=indexes[fields[0]],
+                            destination=f"{dest}/{prefix_length}",
+                            next_hop=gateway,
+                            route_metric=int(fields[6]),
+                            interface_metric=0)
+
+    def _path(self, path: str) -> str:
+        """Get a path relative to the root directory.
+
+        Args:
+            path (str): Path without leading "/" (e.g., "proc/net/route").
+
+        Returns:
+            str: Full path.
+        """
+        return os.path.join(self.root, path)
+
+    @staticmethod
+    def _read_interface(path: str) -> AdapterInfo:
+        """Read an interface from its sysfs directory.
+
+        Args:
+            path (str): Directory of the interface (/sys/class/net/<name>).
+
+        Raises:
+            ValueError: The interface could not be read.
+
+        Returns:
+            AdapterInfo: Interface without addresses or None if it is the
+                loopback interface (not listed by Windows either).
+        """
+        def read(name: str, default: str = "") -> str:
+            try:
+                with open(os.path.join(path, name), "r",
+                          encoding="utf-8") as file:
+                    return file.read().strip()
+            except OSError:
+                return default
+
+        flags = int(read("flags", "0x0"), 16)
+        if flags & IFF_LOOPBACK:
+            return None
+
+        operstate = read("operstate")
+        if not flags & IFF_UP:
+            status = "Disabled"
+        elif operstate in ("up", "unknown"):
+            status = "Up"
+        elif operstate == "notpresent":
+            status = "Not Present"
+        else:
+            status = "Disconnected"
+
+        # Driver of the device or type of virtual interface (e.g., "bridge")
+        driver = os.path.join(path, "device", "driver")
+        if os.path.exists(driver):
+            desc = os.path.basename(os.path.realpath(driver))
+        else:
+            desc = read("uevent").partition("DEVTYPE=")[2].split("\n")[0]
+
+        return AdapterInfo(index=int(read("ifindex")),
+                           name=os.path.basename(path),
+                           desc=desc,
+                           status=status,
+                           mac=format_mac(read("address")))
@@ -0,0 +1,199 @@
+"""Tooltips and menus that are updated in place
+
+Widgets that are refreshed many times (e.g., the network adapter cards)
+must not create new Tk objects on every refresh: each ToolTip of
+ttkbootstrap binds new functions to its widget, replacing the previous
+bindings but leaving their Tcl commands registered, and each menu entry
+added registers its command again. ManagedToolTip binds its functions once
+and changes its text, and ActionMenu creates its entries once and only
+reconfigures the options that change.
+"""
+
+import ttkbootstrap as ttk
+from ttkbootstrap import utility
+
+DELAY = 500  # Milliseconds the pointer rests on the widget before showing
+ALPHA = 0.95  # Opacity of the tooltip window
+OFFSET = (25, 10)  # Position of the tooltip window from the pointer (pixels)
+STYLE = "tooltip.TLabel"  # Style of the tooltip label (as in ttkbootstrap)
+
+
+class ActionMenu(ttk.Menubutton):
+    """Menubutton whose menu entries are created once and identified by a
+    key. Changing an option of an entry does not recreate it, and options
+    that keep their value are not sent to Tk."""
+
+    def __init__(self, master, text: str, **kwargs) -> None:
+        super().__init__(master, text=text, **kwargs)
+        self.menu = ttk.Menu(self)
+        self["menu"] = self.menu
+        self._entries = {}  # Key -> index of the entry in the menu
+        self._options = {}  # Key -> options of the entry set in Tk
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, key: str, label: str, command) -> None:
+        """Add an entry at the end of the menu.
+
+        Args:
+            key (str): Identifier of the entry.
+            label (str): Text of the entry.
+            command (Callable): Function called when the entry is selected.
+                It is registered only once, so it must not change (e.g.,
+                a method that checks the current state).
+
+        Raises:
+            KeyError: There is already an entry with this key.
+        """
+        if key in self._entries:
+            raise KeyError(f"Duplicate menu entry '{key}'")
+
+        self.menu.add_command(label=label, command=command)
+        self._entries[key] = self.menu.index("end")
+        self._options[key] = {"label": label}
+
+    def entry(self, key: str, option: str):
+        """Get an option of an entry, as last set.
+
+        Args:
+            key (str): Identifier of the entry.
+            option (str): Option name (e.g., "label").
+
+        Returns:
+            Any: Value of the option, or None if it has not been set.
+        """
+        return self._options[key].get(option)
+
+    def set_entry(self, key: str, **options) -> bool:
+        """Change the options of an entry (e.g., label or state), except
+        its command.
+
+        Args:
+            key (str): Identifier of the entry.
+            **options: Options of the entry.
+
+        Returns:
+            bool: True if any option has changed.
+        """
+        current = self._options[key]
+        changed = {option: value for option, value in options.items()
+                   if current.get(option) != value}
+        if changed:
+            self.menu.entryconfigure(self._entries[key], **changed)
+            current.update(changed)
+
+        return bool(changed)
+
+    def set_state(self, state: str, keys=None) -> None:
+        """Change the state of several entries.
+
+        Args:
+            state (str): "normal", "active" or "disabled".
+            keys (Iterable, optional): Identifiers of the entries.
+                Defaults to None (all).
+        """
+        for key in self._entries if keys is None else keys:
+            self.set_entry(key, state=state)
+
+
+class ManagedToolTip:
+    """Tooltip of a widget whose text can change. Its functions are bound
+    to the widget once, keeping the existing bindings, and it is not shown
+    while its text is empty."""
+
+    def __init__(self, widget, text: str = "", delay: int = DELAY,
+                 wraplength: int = None) -> None:
+        self.widget = widget
+        self.delay = delay
+        self.wraplength = wraplength or utility.scale_size(widget, 300)
+        self._text = text
+        self._after_id = None  # Pending show (after())
+        self._toplevel = None  # Tooltip window, while shown
+        self._label = None  # Label of the tooltip window
+
+        ttk.Style().configure(STYLE, background="#fffddd",
+                              foreground="#333", bordercolor="#888",
+                              borderwidth=1, darkcolor="#fffddd",
+                              lightcolor="#fffddd", relief="raised")
+
+        for sequence, func in (("<Enter>", self._schedule),
+                               ("<Leave>", self.hide),
+                               ("<Motion>", self._move),
+                               ("<ButtonPress>", self.hide)):
+            widget.bind(sequence, func, add="+")
+
+    def hide(self, _event=None) -> None:
+        """Cancel the pending show and close the tooltip window.
+
+        Args:
+            _event (tk.Event, optional): Event that hides the tooltip.
+                Defaults to None.
+        """
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+        if self._toplevel is not None:
+            self._toplevel.destroy()
+            self._toplevel = None
+            self._label = None
+
+    def _move(self, _event=None) -> None:
+        """Follow the pointer with the tooltip window.
+
+        Args:
+            _event (tk.Event, optional): Motion event. Defaults to None.
+        """
+        if self._toplevel is not None:
+            x, y = self._position()
+            self._toplevel.geometry(f"+{x}+{y}")
+
+    def _position(self) -> tuple:
+        """Get the position of the tooltip window.
+
+        Returns:
+            tuple: Screen coordinates (x, y).
+        """
+        return (self.widget.winfo_pointerx() + OFFSET[0],
+                self.widget.winfo_pointery() + OFFSET[1])
+
+    def _schedule(self, _event=None) -> None:
+        """Show the tooltip after the delay.
+
+        Args:
+            _event (tk.Event, optional): Enter event. Defaults to None.
+        """
+        self.hide()
+        if self._text:
+            self._after_id = self.widget.after(self.delay, self._show)
+
+    def _show(self) -> None:
+        """Open the tooltip window next to the pointer."""
+        self._after_id = None
+        if self._toplevel is not None or not self._text:
+            return
+
+        self._toplevel = ttk.Toplevel(position=self._position(),
+                                      master=self.widget,
+                                      overrideredirect=True, alpha=ALPHA)
+        self._label = ttk.Label(self._toplevel, text=self._text,
+                                justify="left", wraplength=self.wraplength,
+                                padding=10, style=STYLE)
+        self._label.pack(fill="both", expand=True)
+
+    @property
+    def text(self) -> str:
+        """Text of the tooltip (empty: not shown)."""
+        return self._text
+
+    @text.setter
+    def text(self, text: str) -> None:
+        if text == self._text:
+            return
+
+        self._text = text
+        if not text:
+            self.hide()
+        elif self._label is not None:
+            self._label.configure(text=text)
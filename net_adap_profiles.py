@@ -10,10 +10,61 @@ import ttkbootstrap as ttk
 from ttkbootstrap.toast import ToastNotification
 from ttkbootstrap.dialogs.dialogs import MessageDialog, Messagebox
 
-from network_adapters import NetworkAdapters
+import ipv4
 import preferences as pref
 
 APPNAME = "Sinamawin"
+CSV_COLUMNS = 6  # name, ip, mask, gateway, pref_dns, alt_dns
+
+
+def read_profiles_csv(lines, delimiter: str, profiles: dict) -> dict:
+    """Read the profiles of a CSV file. Each column is validated in one
+    pass. If a profile name already exists, it is saved as "name_[X]".
+
+    Args:
+        lines (Iterable[str]): Lines of the file, header included.
+        delimiter (str): Column delimiter.
+        profiles (dict): Existing profiles.
+
+    Raises:
+        ValueError: A row has not CSV_COLUMNS columns or has an invalid
+            address or subnet mask.
+
+    Returns:
+        dict: Existing profiles and the new ones.
+    """
+    rows = [line.replace("\n", "").split(delimiter)
+            for line in list(lines)[1:]]
+    if any(len(row) != CSV_COLUMNS for row in rows):
+        raise ValueError("Invalid number of columns")
+
+    columns = list(zip(*rows)) or [()] * CSV_COLUMNS
+    if (ipv4.invalid(columns[1])
+            or ipv4.invalid(columns[2], masks=True)
+            or ipv4.invalid(columns[3], allow_empty=True)
+            or ipv4.invalid(columns[4], allow_empty=True)
+            or ipv4.invalid(columns[5], allow_empty=True)):
+        raise ValueError("Invalid address or subnet mask")
+
+    profiles = dict(profiles)
+    for name, ip, mask, gateway, pref_dns, alt_dns in rows:
+        name = re.sub(r"[^\w\s\-]", "", name)
+
+        ctrl = 2
+        aux_name = name
+        while str(name) in profiles:
+            name = f"{aux_name}_{ctrl}"
+            ctrl += 1
+
+        profiles[name] = {
+            "ip": str(ip),
+            "mask": str(mask),
+            "gateway": str(gateway) if gateway else "0.0.0.0",
+            "pref_dns": str(pref_dns),
+            "alt_dns": str(alt_dns),
+        }
+
+    return profiles
 
 
 class NetAdapProfiles:
@@ -171,44 +222,10 @@ class NetAdapProfiles:
         # Import button
         def import_prof():
             try:
-                profiles = self.get_profiles()
                 delimiter = e_delimiter.get()
                 with open(src_file, "r", encoding="utf-8") as file:
-                    for line in list(file)[1:]:
-                        data = line.replace("\n", "").split(delimiter)
-                        name, ip, mask, gateway, pref_dns, alt_dns = data
-
-                        ctrl = 2
-                        aux_name = name
-                        while str(name) in profiles:
-                            name = f"{aux_name}_{ctrl}"
-                            ctrl += 1
-
-                        name = re.sub(r"[^\w\s\-]", "", name)
-                        na = NetworkAdapters()
-
-                        if not (na.validate_ipv4(ip)
-                                or na.validate_subnet_mask(mask)):
-                            raise ValueError()
-
-                        if gateway == "":
-                            gateway = "0.0.0.0"
-                        elif not na.validate_ipv4(gateway):
-                            raise ValueError()
-
-                        if pref_dns and not na.validate_ipv4(pref_dns):
-                            raise ValueError()
-
-                        if alt_dns and not na.validate_ipv4(alt_dns):
-                            raise ValueError()
-
-                        profiles[name] = {
-                            "ip": str(ip),
-                            "mask": str(mask),
-                            "gateway": str(gateway),
-                            "pref_dns": str(pref_dns),
-                            "alt_dns": str(alt_dns),
-                        }
+                    profiles = read_profiles_csv(file, delimiter,
+                                                 self.get_profiles())
 
                 if self.save_profiles(profiles):
                     self.toast_notification("Profile successfully imported.")
@@ -487,8 +504,6 @@ class NetAdapProfiles:
             # Remove characters not allowed
             self.name = re.sub(r"[^\w\s\-]", "", self.name)
 
-            ni = NetworkAdapters()
-
             def show_error(msg):
                 Messagebox.show_error(
                     message=msg,
@@ -504,25 +519,25 @@ class NetAdapProfiles:
                 show_error("Invalid profile name.")
                 return
 
-            if not ni.validate_ipv4(self.ip):
+            if not ipv4.is_valid(self.ip):
                 show_error("Invalid IP address.")
                 return
 
-            if not ni.validate_subnet_mask(self.mask):
+            if not ipv4.is_valid_mask(self.mask):
                 show_error("Invalid subnet mask.")
                 return
 
             if self.gateway == "":
                 self.gateway = "0.0.0.0"
-            elif not ni.validate_ipv4(self.gateway):
+            elif not ipv4.is_valid(self.gateway):
                 show_error("Invalid default gateway.")
                 return
 
-            if self.pref_dns and not ni.validate_ipv4(self.pref_dns):
+            if self.pref_dns and not ipv4.is_valid(self.pref_dns):
                 show_error("Invalid preferred DNS server.")
                 return
 
-            if self.alt_dns and not ni.validate_ipv4(self.alt_dns):
+            if self.alt_dns and not ipv4.is_valid(self.alt_dns):
                 show_error("Invalid alternate DNS server.")
                 return
 
@@ -1,20 +1,25 @@
 """Create and manipulate the ttk widget for a network adapter"""
 
-import threading
-from time import sleep
 import tkinter as tk
 import traceback
+from typing import Callable
 import ttkbootstrap as ttk
 from ttkbootstrap.toast import ToastNotification
 from ttkbootstrap.dialogs.dialogs import MessageDialog, Messagebox
-from ttkbootstrap.tooltip import ToolTip
 import pyperclip
 
-from network_adapters import NetworkAdapters
+from adapter_info import AdapterInfo
+from async_adapters import AsyncNetworkBackend, get_bridge
+from convergence import DEADLINE, Convergence, wait_for_state
+import ipv4
+from managed_widgets import ActionMenu, ManagedToolTip
+from network_adapters import NetworkBackend
+from net_config import ConfigTransaction, TransactionResult
 from net_adap_profiles import NetAdapProfiles
+from powershell import TIMEOUT
 
 APPNAME = "Sinamawin"
-LOADING_TIME = 10  # Waiting time to obtain the information
+POPUP_MARGIN = 5  # Seconds the pop-up windows wait after their deadline
 ICON = "./resources/sinamawin.ico"  # App icon
 
 
@@ -24,7 +29,8 @@ class NetAdapWidget:
     def __init__(self, idx: int, name: str, desc: str,
                  status: str, mac: str, ip: str, mask: str, gateway: str,
                  prefix_origin: str, suffix_origin: str, pref_dns: str,
-                 alt_dns: str, disabled: bool) -> None:
+                 alt_dns: str, disabled: bool,
+                 addresses: tuple = ()) -> None:
         self.index = idx
         self.name = name
         self.desc = desc
@@ -39,8 +45,12 @@ class NetAdapWidget:
         ) if suffix_origin == "Dhcp" else suffix_origin
         self.pref_dns = pref_dns
         self.alt_dns = alt_dns
+        self.addresses = addresses  # All the IPv4 addresses, primary first
 
         self.disabled = disabled  # Disable widget completely or not
+        self.bootstyle = "default"  # Labelframe border style
+        # Called with the AdapterInfo shown after applying changes
+        self.on_change = None
         self._labelframe = None  # Main widget
         # Other widgets
         self._d_status = None
@@ -51,12 +61,68 @@ class NetAdapWidget:
         self._d_gateway = None
         self._d_prefix_origin = None
         self._d_suffix_origin = None
+        self._t_prefix_origin = None  # Tooltip of the prefix origin
+        self._t_suffix_origin = None  # Tooltip of the suffix origin
         self._d_pref_dns_server = None
         self._d_alt_dns_server = None
+        self._b_addresses = None
+        self._d_addresses = None
+        self._addresses_shown = False  # Secondary IP addresses expanded
         self._m_action = None
 
         self._entries_bck = None  # Copy of all Entry widgets
 
+    def _apply_config(self, coro, message: str, expected=None,
+                      on_failure: Callable = None) -> None:
+        """Apply a configuration change in the asyncio loop, without
+        blocking the interface, while a pop-up window locks the app. If it
+        succeeds, a notification is shown and the widgets are regenerated
+        once the changes are visible (see _regenerate_wd()).
+
+        Args:
+            coro: Coroutine applying the change. It returns a
+                TransactionResult, or None if it raises its errors.
+            message (str): Notification shown if the change is applied.
+            expected (dict | Callable, optional): Expected state (see
+                convergence.matches()). Defaults to None (any).
+            on_failure (Callable, optional): Called if the change is not
+                applied. Defaults to None.
+        """
+        popup = self._popup_refresh_changes(title=self.name,
+                                            text="Applying changes...")
+        # In case the result never arrives
+        popup.after(int((TIMEOUT + POPUP_MARGIN) * 1000),
+                    popup.destroy)
+
+        def done(result: TransactionResult) -> None:
+            if result is not None and not result:
+                popup.destroy()
+                self._show_transaction_error(result)
+                if on_failure:
+                    on_failure()
+                return
+
+            self.toast_notification(message)
+            self._regenerate_wd(expected, popup=popup)
+
+        def failed(err: Exception) -> None:
+            popup.destroy()
+            traceback.print_exception(type(err), err, err.__traceback__)
+            with open(f"{APPNAME.lower()}_error.log", mode="w",
+                      encoding="utf-8") as file:
+                traceback.print_exception(type(err), err, err.__traceback__,
+                                          file=file)
+            Messagebox.show_error(
+                message="The configuration could not be applied.",
+                title=f"{APPNAME} - Error",
+                padding=(30, 30),
+                width=100)
+            if on_failure:
+                on_failure()
+
+        get_bridge(self._labelframe).submit(coro, callback=done,
+                                            errback=failed)
+
     def _change_wd_state(self) -> None:
         """Change the state of the widgets."""
 
@@ -72,13 +138,14 @@ class NetAdapWidget:
         self._d_gateway.configure(state=state)
         self._d_pref_dns_server.configure(state=state)
         self._d_alt_dns_server.configure(state=state)
-        self._m_action.menu.entryconfigure(
-            "Apply changes", state=m_state)
-        self._m_action.menu.entryconfigure(
-            "Apply profile", state=m_state)
+        self._m_action.set_state(m_state, ("apply", "profile"))
 
+        # The profile of a network adapter that is off is only saved from
+        # the manual configuration
         if self._d_status.cget('text') in ["Disabled", "Not Present"]:
-            self._m_action.menu.entryconfigure("Save profile", state=m_state)
+            self._m_action.set_entry("save", state=m_state)
+        else:
+            self._m_action.set_entry("save", state="normal")
 
         return
 
@@ -93,20 +160,7 @@ class NetAdapWidget:
         self._d_gateway.configure(state=state)
         self._d_pref_dns_server.configure(state=state)
         self._d_alt_dns_server.configure(state=state)
-        self._m_action.menu.entryconfigure(
-            "Apply changes", state=m_state)
-        self._m_action.menu.entryconfigure(
-            "Apply profile", state=m_state)
-        try:
-            self._m_action.menu.entryconfigure(
-                "Enable network adapter", state=m_state)
-        except:  # pylint: disable=bare-except # noqa
-            pass
-        try:
-            self._m_action.menu.entryconfigure(
-                "Disable network adapter", state=m_state)
-        except:  # pylint: disable=bare-except # noqa
-            pass
+        self._m_action.set_state(m_state, ("apply", "profile", "endis"))
         self._b_manual.state([m_state])
 
         return
@@ -123,20 +177,7 @@ class NetAdapWidget:
         self._d_gateway.configure(state=state)
         self._d_pref_dns_server.configure(state=state)
         self._d_alt_dns_server.configure(state=state)
-        self._m_action.menu.entryconfigure(
-            "Apply changes", state=m_state)
-        self._m_action.menu.entryconfigure(
-            "Apply profile", state=m_state)
-        try:
-            self._m_action.menu.entryconfigure(
-                "Enable network adapter", state=m_state)
-        except:  # pylint: disable=bare-except # noqa
-            pass
-        try:
-            self._m_action.menu.entryconfigure(
-                "Disable network adapter", state=m_state)
-        except:  # pylint: disable=bare-except # noqa
-            pass
+        self._m_action.set_state(m_state, ("apply", "profile", "endis"))
         self._b_manual.configure(state=state)
         self._b_manual.state([m_state])
 
@@ -166,25 +207,22 @@ class NetAdapWidget:
             dialog.show()
 
             if dialog.result == "Accept":
-                # Enable/Disabled adapter
-                ni = NetworkAdapters()
-                ni.set_net_dhcp(self.index)
-                ni.reset_dns_servers(self.index)
-
-                self.toast_notification(
-                    f"DHCP has been enabled for '{self.name}' adapter.")
-
-                # Regenerate widgets in a thread so as not to crash the app
-                def regenerate_wd():
-                    sleep(5)
-                    self.update_widgets()
-
-                th = threading.Thread(target=regenerate_wd)
-                th.start()
-
-                # Show popup info windows
-                self._popup_refresh_changes(
-                    title=self.name, seconds=LOADING_TIME)
+                tr = ConfigTransaction(self.index)
+                tr.set_net_dhcp()
+                tr.reset_dns_servers()
+
+                def restore() -> None:
+                    self._b_manual.state(["selected"])
+                    self._change_wd_state()
+
+                # Regenerate widgets when the manual address is gone and,
+                # if the adapter is connected, a lease has been obtained
+                self._apply_config(
+                    AsyncNetworkBackend().commit(tr),
+                    f"DHCP has been enabled for '{self.name}' adapter.",
+                    lambda info: info.prefix_origin != "Manual" and (
+                        info.status != "Up" or info.prefix_origin == "Dhcp"),
+                    on_failure=restore)
 
             else:
                 self._b_manual.state(["selected"])
@@ -205,6 +243,12 @@ class NetAdapWidget:
             self._b_manual.state(["selected"])
             self._change_wd_state()
 
+    def _endis_from_menu(self) -> None:
+        """Enable or disable the network adapter, depending on its status
+        (action of the menu entry, which is not recreated when the
+        status changes)."""
+        self.endis_adapter(disable=not self._is_off())
+
     def _entries_wd_bck(self) -> None:
         """Save a copy of the Entry widgets."""
 
@@ -292,14 +336,28 @@ class NetAdapWidget:
 
         return suffix_origin[origin.upper()]
 
+    def _is_off(self) -> bool:
+        """Check if the network adapter is disabled or not present.
+
+        Returns:
+            bool: True if it can only be enabled.
+        """
+        return self.status in ("Disabled", "Not Present")
+
     def _popup_refresh_changes(self, title: str = "",
-                               seconds: int = 5) -> None:
-        """Displays a pop-up window.
+                               text: str = "Refreshing changes..."
+                               ) -> ttk.Toplevel:
+        """Displays a pop-up window that locks the app while the changes
+        are being applied. It is closed by the caller (at the latest,
+        shortly after DEADLINE).
 
         Args:
             title (str, optional): Window title. Defaults to "" (app name).
-            seconds (int, optional): Seconds that the window will be displayed.
-                Defaults to 5.
+            text (str, optional): Message. Defaults to "Refreshing
+                changes...".
+
+        Returns:
+            ttk.Toplevel: Pop-up window.
         """
         popup = ttk.Toplevel(title=APPNAME if not title else title,
                              resizable=(False, False),
@@ -320,34 +378,72 @@ class NetAdapWidget:
         # Disable close button
         popup.protocol("WM_DELETE_WINDOW", lambda: None)
 
-        pbar = ttk.Progressbar(popup)
+        pbar = ttk.Progressbar(popup, mode="indeterminate")
         pbar.grid(row=0, column=0, padx=(20, 10), pady=20, sticky="nsew")
+        pbar.start()
 
-        text = ttk.Label(popup, text="Refreshing changes...", wraplength=350)
-        text.grid(row=0, column=1, padx=10, pady=20, sticky="nsew")
+        label = ttk.Label(popup, text=text, wraplength=350)
+        label.grid(row=0, column=1, padx=10, pady=20, sticky="nsew")
 
         popup.columnconfigure(0, weight=1)
         popup.columnconfigure(1, weight=1)
 
-        # Update the progress bar
-        def update_pbar(prog):
-            try:
-                iters = 101
-                waiting_time = seconds / iters
+        return popup
 
-                for i in range(iters):
-                    prog.configure(value=i)
-                    sleep(waiting_time)
-            except:  # pylint: disable=bare-except # noqa
-                pass
+    def _regenerate_wd(self, expected=None,
+                       popup: ttk.Toplevel = None) -> None:
+        """Update the widgets once the changes have been applied. The
+        network adapter is queried in the asyncio loop, at increasing
+        intervals, until it is in the expected state or DEADLINE passes.
+        Meanwhile, a pop-up window locks the app.
 
-        th = threading.Thread(target=update_pbar, args=(pbar,))
-        th.start()
+        Args:
+            expected (dict | Callable, optional): Expected state (see
+                convergence.matches()). Defaults to None (any).
+            popup (ttk.Toplevel, optional): Pop-up window already shown,
+                closed when done. Defaults to None (a new one).
+        """
+        adapters = AsyncNetworkBackend()
+        if popup is None:
+            popup = self._popup_refresh_changes(title=self.name)
+        popup.after(int((DEADLINE + POPUP_MARGIN) * 1000), popup.destroy)
+
+        # The card may be rebound to another network adapter while waiting
+        index, name = self.index, self.name
+
+        def done(result: Convergence) -> None:
+            popup.destroy()
+            # The card may show another network adapter by now
+            if result.info is not None and self.index == index:
+                self.update_widgets(result.info)
+            if result.info is not None and self.on_change:
+                self.on_change(result.info)
+
+            if not result:
+                self.toast_notification(
+                    f"The changes are not yet visible in '{name}'"
+                    " adapter. The current state is shown.", icon="\u26a0")
 
-        mseconds = seconds * 1000 + 500
-        popup.after(mseconds, popup.destroy)
+        def failed(err: Exception) -> None:
+            popup.destroy()
+            traceback.print_exception(type(err), err, err.__traceback__)
+            with open(f"{APPNAME.lower()}_error.log", mode="w",
+                      encoding="utf-8") as file:
+                traceback.print_exception(type(err), err, err.__traceback__,
+                                          file=file)
+            Messagebox.show_error(
+                message=(f"The state of '{name}' could not be obtained."
+                         " Refresh the network adapters (Ctrl+R) to see"
+                         " it."),
+                title=f"{APPNAME} - Error",
+                padding=(30, 30),
+                width=100)
 
-        return
+        get_bridge(self._labelframe).submit(
+            wait_for_state(
+                lambda: adapters.get_adapter(index),
+                expected if expected is not None else {}),
+            callback=done, errback=failed)
 
     def _save_profile(self) -> None:
         """Save profile into the user folder."""
@@ -364,29 +460,116 @@ class NetAdapWidget:
 
         return
 
+    def _set_info(self, info: AdapterInfo) -> None:
+        """Set the network adapter data from its record.
+
+        Args:
+            info (AdapterInfo): Network adapter information.
+        """
+        self.name = info.name
+        self.desc = info.desc
+        self.status = info.status
+        self.mac = info.mac
+        self.ip = info.ip
+        self.mask = info.mask
+        self.gateway = info.gateway
+        self.prefix_origin = info.prefix_origin.upper(
+        ) if info.prefix_origin == "Dhcp" else info.prefix_origin
+        self.suffix_origin = info.suffix_origin.upper(
+        ) if info.suffix_origin == "Dhcp" else info.suffix_origin
+        self.pref_dns = info.pref_dns
+        self.alt_dns = info.alt_dns
+        self.addresses = info.addresses
+
+        return
+
+    def _show_transaction_error(self, result: TransactionResult) -> bool:
+        """Show the error of a configuration transaction, if any.
+
+        Args:
+            result (TransactionResult): Result of the transaction.
+
+        Returns:
+            bool: True if the transaction succeeded.
+        """
+        if result:
+            return True
+
+        msg = f"The configuration could not be applied.\n\n{result.error}"
+        if result.rollback_errors:
+            msg += ("\n\nThe previous configuration could not be fully"
+                    " restored.")
+        elif result.rolled_back:
+            msg += "\n\nThe previous configuration has been restored."
+
+        Messagebox.show_error(
+            message=msg,
+            title=f"{APPNAME} - Error",
+            padding=(30, 30),
+            width=100)
+
+        return False
+
+    def _toggle_addresses(self) -> None:
+        """Show or hide the secondary IP addresses."""
+        self._addresses_shown = not self._addresses_shown
+        self._update_addresses()
+
+        return
+
+    def _update_addresses(self) -> None:
+        """Update the button and the list of the secondary IP addresses.
+        The button is only shown if there are secondary addresses."""
+        others = self.addresses[1:]
+        if not others:
+            self._b_addresses.grid_remove()
+            self._d_addresses.grid_remove()
+            return
+
+        shown = self._addresses_shown
+        self._b_addresses.configure(
+            text=("▾" if shown else "▸")
+            + f" {len(others)} more IP address"
+            + ("es" if len(others) > 1 else ""))
+        self._b_addresses.grid()
+        self._d_addresses.configure(text="    ".join(
+            f"{addr.ip}/{addr.prefix_length} ({addr.prefix_origin})"
+            for addr in others))
+        if shown:
+            self._d_addresses.grid()
+        else:
+            self._d_addresses.grid_remove()
+
+        return
+
     def _update_info(self) -> None:
         """Update the network adapter data."""
 
-        ni = NetworkAdapters()
-        info = ni.get_info()
+        ni = NetworkBackend()
+        self._set_info(ni.get_adapter(self.index))
 
-        info = info[self.index]
+        return
 
-        self.name = info["name"]
-        self.desc = info["desc"]
-        self.status = info["status"]
-        self.mac = info["mac"]
-        self.ip = info["ip"]
-        self.mask = info["mask"]
-        self.gateway = info["gateway"]
-        prefix_origin = info["prefix_origin"]
-        self.prefix_origin = prefix_origin.upper(
-        ) if prefix_origin == "Dhcp" else prefix_origin
-        suffix_origin = info["suffix_origin"]
-        self.suffix_origin = suffix_origin.upper(
-        ) if suffix_origin == "Dhcp" else suffix_origin
-        self.pref_dns = info["pref_dns"]
-        self.alt_dns = info["alt_dns"]
+    def _update_menu(self) -> None:
+        """Update the entries of the action menu in place."""
+        if self._is_off():
+            self._b_manual.state(['disabled'])
+            label = "Enable network adapter"
+        else:
+            label = "Disable network adapter"
+        self._m_action.set_entry("endis", label=label)
+
+        return
+
+    def _update_tooltips(self) -> None:
+        """Update the text of the tooltips of the prefix and suffix
+        origins (empty if there is no origin)."""
+        self._t_prefix_origin.text = (
+            self._get_prefix_tooltip(self.prefix_origin)
+            if self.prefix_origin else "")
+        self._t_suffix_origin.text = (
+            self._get_suffix_tooltip(self.suffix_origin)
+            if self.suffix_origin else "")
 
         return
 
@@ -395,9 +578,6 @@ class NetAdapWidget:
         the network adapter.
         """
         try:
-
-            ni = NetworkAdapters()
-
             ip = self._d_ip_addr.get().strip()
             mask = self._d_subnet.get().strip()
             gateway = self._d_gateway.get().strip()
@@ -411,25 +591,25 @@ class NetAdapWidget:
                     padding=(30, 30),
                     width=100)
 
-            if not ni.validate_ipv4(ip):
+            if not ipv4.is_valid(ip):
                 show_error("Invalid IP address.")
                 return
 
-            if not ni.validate_subnet_mask(mask):
+            if not ipv4.is_valid_mask(mask):
                 show_error("Invalid subnet mask.")
                 return
 
             if gateway == "":
                 gateway = "0.0.0.0"
-            elif not ni.validate_ipv4(gateway):
+            elif not ipv4.is_valid(gateway):
                 show_error("Invalid default gateway.")
                 return
 
-            if pref_dns and not ni.validate_ipv4(pref_dns):
+            if pref_dns and not ipv4.is_valid(pref_dns):
                 show_error("Invalid preferred DNS server.")
                 return
 
-            if alt_dns and not ni.validate_ipv4(alt_dns):
+            if alt_dns and not ipv4.is_valid(alt_dns):
                 show_error("Invalid alternate DNS server.")
                 return
 
@@ -464,38 +644,27 @@ class NetAdapWidget:
             dialog.show()
 
             if dialog.result == "Apply":
-
-                if self._entries_bck["_d_ip_addr"] == ip:
-                    ni.reset_ip(self.index)
-
-                ni.set_ip_mask(self.index, ip, mask)
+                tr = ConfigTransaction(self.index)
+                tr.set_ip_mask(ip, mask)
 
                 if gateway != "0.0.0.0":
-                    try:
-                        ni.reset_def_gateway(self.index)
-                    except KeyError:
-                        pass
-                    ni.set_def_gateway(self.index, gateway)
+                    tr.set_def_gateway(gateway)
 
                 if not pref_dns and not alt_dns:
-                    ni.reset_dns_servers(self.index)
+                    tr.reset_dns_servers()
                 else:
-                    ni.set_dns_servers(self.index, pref_dns, alt_dns)
-
-                self.toast_notification(
-                    f"Configuration applied for '{self.name}' adapter.")
-
-                # Regenerate widgets in a thread so as not to crash the app
-                def regenerate_wd():
-                    sleep(5)
-                    self.update_widgets()
-
-                th = threading.Thread(target=regenerate_wd)
-                th.start()
+                    tr.set_dns_servers(pref_dns, alt_dns)
 
-                # Show popup info windows
-                self._popup_refresh_changes(
-                    title=self.name, seconds=LOADING_TIME)
+                # Regenerate widgets when the changes are visible
+                expected = {"ip": ip, "mask": mask}
+                if gateway != "0.0.0.0":
+                    expected["gateway"] = gateway
+                if pref_dns:
+                    expected.update(pref_dns=pref_dns, alt_dns=alt_dns)
+                self._apply_config(
+                    AsyncNetworkBackend().commit(tr),
+                    f"Configuration applied for '{self.name}' adapter.",
+                    expected)
 
                 return
         except:  # pylint: disable=bare-except # noqa
@@ -559,6 +728,10 @@ class NetAdapWidget:
             f"\nPreferred DNS Server: {self._d_pref_dns_server.get()}"
             f"\nAlternate DNS Server: {self._d_alt_dns_server.get()}\n"
         )
+        if len(self.addresses) > 1:
+            info += "Other IP addresses: " + ", ".join(
+                f"{addr.ip}/{addr.prefix_length}"
+                for addr in self.addresses[1:]) + "\n"
 
         self.toast_notification(
             f"'{self.name}' network adapter information copied"
@@ -568,7 +741,7 @@ class NetAdapWidget:
 
         return
 
-    def create(self, frame: ttk.Frame, row: int,
+    def create(self, frame: ttk.Frame, row: int = None,
                bootstyle: str = "default") -> None:
         """Create the main widget that will contain all
         the network adapter information.
@@ -576,10 +749,12 @@ class NetAdapWidget:
         Args:
             frame (ttk.Frame): Master frame where the Labelframe
                 will be hosted.
-            row (int): Row where the Labelframe will be placed
-                in the master frame.
+            row (int, optional): Row where the Labelframe will be placed
+                in the master frame. Defaults to None (not placed, e.g.,
+                for a canvas window).
             bootstyle (str): ttk.Labelframe border style.
         """
+        self.bootstyle = bootstyle
         self._labelframe = ttk.Labelframe(
             frame,
             text=f"{self.name} - {self.desc}",
@@ -587,8 +762,9 @@ class NetAdapWidget:
             borderwidth=10,
             bootstyle=bootstyle)
 
-        self._labelframe.grid(row=row, column=0, padx=10,
-                              pady=10, sticky="nsew")
+        if row is not None:
+            self._labelframe.grid(row=row, column=0, padx=10,
+                                  pady=10, sticky="nsew")
 
         self.generate_widgets()
 
@@ -625,32 +801,38 @@ class NetAdapWidget:
         dialog.show()
 
         if dialog.result == "Accept":
-            # Enable/Disabled adapter
-            ni = NetworkAdapters()
+            adapters = AsyncNetworkBackend()
 
+            # Regenerate widgets when the status has changed
             if disable:
-                ni.disable_adapter(self.name)
+                self._apply_config(adapters.disable_adapter(self.name),
+                                   f"'{self.name}' has been disabled.",
+                                   {"status": "Disabled"})
             else:
-                ni.enable_adapter(self.name)
-
-            th_toast = threading.Thread(target=self.toast_notification, args=(
-                f"'{self.name}' has been " +
-                ("disabled." if disable else "enabled."),))
-            th_toast.start()
+                self._apply_config(adapters.enable_adapter(self.name),
+                                   f"'{self.name}' has been enabled.",
+                                   lambda info: info.status != "Disabled")
 
-            # Regenerate widgets in a thread so as not to crash the app
-            def regenerate_wd():
-                sleep(5)
-                self.update_widgets()
+        return
 
-            th = threading.Thread(target=regenerate_wd)
-            th.start()
+    @classmethod
+    def from_info(cls, info: AdapterInfo, disabled: bool) -> "NetAdapWidget":
+        """Create the widget for a network adapter record.
 
-            # Show popup info windows
-            self._popup_refresh_changes(
-                title=self.name, seconds=LOADING_TIME)
+        Args:
+            info (AdapterInfo): Network adapter information.
+            disabled (bool): Disable widget completely or not.
 
-        return
+        Returns:
+            NetAdapWidget: Network adapter widget (not yet created).
+        """
+        return cls(idx=info.index, name=info.name, desc=info.desc,
+                   status=info.status, mac=info.mac, ip=info.ip,
+                   mask=info.mask, gateway=info.gateway,
+                   prefix_origin=info.prefix_origin,
+                   suffix_origin=info.suffix_origin,
+                   pref_dns=info.pref_dns, alt_dns=info.alt_dns,
+                   disabled=disabled, addresses=info.addresses)
 
     def generate_widgets(self) -> None:
         """Create all widgets where the network adapter
@@ -696,27 +878,14 @@ class NetAdapWidget:
         l_manual.grid(row=0, column=5, padx=5, pady=5, sticky="w")
 
         # -- Select action button --
-        self._m_action = ttk.Menubutton(
-            self._labelframe, text="Select action")
-        self._m_action.menu = ttk.Menu(self._m_action)
-        self._m_action["menu"] = self._m_action.menu
-        self._m_action.menu.add_command(
-            label="Apply changes", command=self.apply_changes)
-        self._m_action.menu.add_command(label="Apply profile",
-                                        command=self.apply_profile)
-        self._m_action.menu.add_command(
-            label="Copy information",
-            command=self.copy_clipboard)
-        if self.status == "Disabled" or self.status == "Not Present":
-            self._b_manual.state(['disabled'])
-            self._m_action.menu.add_command(
-                label="Enable network adapter", command=self.endis_adapter)
-        else:
-            self._m_action.menu.add_command(
-                label="Disable network adapter",
-                command=lambda: self.endis_adapter(disable=True))
-        self._m_action.menu.add_command(
-            label="Save profile", command=self._save_profile)
+        self._m_action = ActionMenu(self._labelframe, text="Select action")
+        self._m_action.add("apply", "Apply changes", self.apply_changes)
+        self._m_action.add("profile", "Apply profile", self.apply_profile)
+        self._m_action.add("copy", "Copy information", self.copy_clipboard)
+        self._m_action.add("endis", "Disable network adapter",
+                           self._endis_from_menu)
+        self._m_action.add("save", "Save profile", self._save_profile)
+        self._update_menu()
 
         self._m_action.grid(row=0, column=6, columnspan=2,
                             padx=(15, 5), pady=5, sticky="w")
@@ -759,11 +928,7 @@ class NetAdapWidget:
 
         l_prefix_origin.grid(row=1, column=6, padx=(15, 5), pady=5)
         self._d_prefix_origin.grid(row=1, column=7, padx=5, pady=5)
-
-        if self.prefix_origin:
-            ToolTip(
-                self._d_prefix_origin, text=self._get_prefix_tooltip(
-                    self.prefix_origin), delay=500)
+        self._t_prefix_origin = ManagedToolTip(self._d_prefix_origin)
 
         # -- Suffix Origin --
         l_suffix_origin = ttk.Label(self._labelframe, text="Suffix Origin:")
@@ -772,11 +937,9 @@ class NetAdapWidget:
 
         l_suffix_origin.grid(row=2, column=6, padx=(15, 5), pady=5)
         self._d_suffix_origin.grid(row=2, column=7, padx=5, pady=5)
+        self._t_suffix_origin = ManagedToolTip(self._d_suffix_origin)
 
-        if self.suffix_origin:
-            ToolTip(
-                self._d_suffix_origin, text=self._get_suffix_tooltip(
-                    self.suffix_origin), delay=500)
+        self._update_tooltips()
 
         # ---------
         # | ROW 2 |
@@ -802,6 +965,24 @@ class NetAdapWidget:
         l_alt_dns_server.grid(row=2, column=2, padx=(15, 5), pady=5)
         self._d_alt_dns_server.grid(row=2, column=3, padx=5, pady=5)
 
+        # -- Secondary IP addresses --
+        self._b_addresses = ttk.Button(
+            self._labelframe, bootstyle="link",
+            command=self._toggle_addresses)
+        self._b_addresses.grid(row=2, column=4, columnspan=2,
+                               padx=(15, 5), pady=5, sticky="w")
+
+        # ---------
+        # | ROW 3 |
+        # ---------
+        self._d_addresses = ttk.Label(
+            self._labelframe, wraplength=900, font=("Consolas", 9))
+        self._d_addresses.grid(row=3, column=0, columnspan=8,
+                               padx=(15, 5), pady=(0, 5), sticky="w")
+        self._d_addresses.grid_remove()
+
+        self._update_addresses()
+
         if self.prefix_origin == "Manual":
             self._b_manual.state(["selected"])
 
@@ -812,26 +993,76 @@ class NetAdapWidget:
 
         return
 
-    def toast_notification(self, toast_msg: str) -> None:
+    @property
+    def labelframe(self) -> ttk.Labelframe:
+        """Main widget (None until created)."""
+        return self._labelframe
+
+    def move(self, row: int) -> None:
+        """Move the Labelframe to another row of the master frame.
+
+        Args:
+            row (int): New row.
+        """
+        self._labelframe.grid_configure(row=row)
+
+    def rebind(self, info: AdapterInfo, bootstyle: str = "default") -> None:
+        """Show another network adapter in the existing widgets.
+
+        Args:
+            info (AdapterInfo): Network adapter information.
+            bootstyle (str, optional): ttk.Labelframe border style.
+                Defaults to "default".
+        """
+        self.index = info.index
+        self._addresses_shown = False
+        self.set_bootstyle(bootstyle)
+        self.update_widgets(info)
+
+        return
+
+    def set_bootstyle(self, bootstyle: str) -> None:
+        """Change the border style of the Labelframe.
+
+        Args:
+            bootstyle (str): ttk.Labelframe border style.
+        """
+        if bootstyle != self.bootstyle:
+            self.bootstyle = bootstyle
+            self._labelframe.configure(bootstyle=bootstyle)
+
+    def toast_notification(self, toast_msg: str,
+                           icon: str = "\u2714") -> None:
         """Display a notification toast with a message.
 
         Args:
             toast_msg (str): Message to be displayed.
+            icon (str, optional): Icon of the toast. Defaults to a check
+                mark.
         """
         toast = ToastNotification(
             title=APPNAME,
             message=toast_msg,
             duration=5000,
-            icon="\u2714"
+            icon=icon
         )
         toast.show_toast()
 
         return
 
-    def update_widgets(self) -> None:
-        """Update widgets with network adapter information."""
+    def update_widgets(self, info: AdapterInfo = None) -> None:
+        """Update widgets with network adapter information.
 
-        self._update_info()
+        Args:
+            info (AdapterInfo, optional): Network adapter information.
+                Defaults to None (it is queried).
+        """
+        if info is None:
+            self._update_info()
+        else:
+            self._set_info(info)
+
+        self._labelframe.configure(text=f"{self.name} - {self.desc}")
 
         self._enabled_all_wd()
 
@@ -856,26 +1087,7 @@ class NetAdapWidget:
         self._d_mac_addr.insert(0, self.mac if self.mac else "-")
 
         # -- Select action button --
-        for _ in range(self._m_action.menu.index("end")+1):
-            self._m_action.menu.delete(0)
-
-        self._m_action.menu.add_command(
-            label="Apply changes", command=self.apply_changes)
-        self._m_action.menu.add_command(
-            label="Apply profile", command=self.apply_profile)
-        self._m_action.menu.add_command(
-            label="Copy information",
-            command=self.copy_clipboard)
-        if self.status == "Disabled" or self.status == "Not Present":
-            self._b_manual.state(['disabled'])
-            self._m_action.menu.add_command(
-                label="Enable network adapter", command=self.endis_adapter)
-        else:
-            self._m_action.menu.add_command(
-                label="Disable network adapter",
-                command=lambda: self.endis_adapter(disable=True))
-        self._m_action.menu.add_command(
-            label="Save profile", command=self._save_profile)
+        self._update_menu()
 
         # ---------
         # | ROW 1 |
@@ -896,18 +1108,10 @@ class NetAdapWidget:
         # -- Prefix Origin --
         self._d_prefix_origin.configure(text=self.prefix_origin)
 
-        if self.prefix_origin:
-            ToolTip(
-                self._d_prefix_origin, text=self._get_prefix_tooltip(
-                    self.prefix_origin), delay=500)
-
         # -- Suffix Origin --
         self._d_suffix_origin.configure(text=self.suffix_origin)
 
-        if self.suffix_origin:
-            ToolTip(
-                self._d_suffix_origin, text=self._get_suffix_tooltip(
-                    self.suffix_origin), delay=500)
+        self._update_tooltips()
 
         # ---------
         # | ROW 2 |
@@ -921,6 +1125,9 @@ class NetAdapWidget:
         self._d_alt_dns_server.delete(0, tk.END)
         self._d_alt_dns_server.insert(0, self.alt_dns)
 
+        # -- Secondary IP addresses --
+        self._update_addresses()
+
         if self.prefix_origin == "Manual":
             self._b_manual.state(["selected"])
         else:
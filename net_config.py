@@ -0,0 +1,331 @@
+"""Apply several configuration changes to a network adapter at once"""
+
+import json
+from typing import NamedTuple
+
+import ipv4
+from network_adapters import NetworkAdapters
+from powershell import CommandResult, get_pool
+
+# Stores of the routes: the active one (in effect now) and the persistent
+# one (restored when the system starts). A route may be in both.
+ROUTE_STORES = "'ActiveStore', 'PersistentStore'"
+
+# Save the current configuration of the adapter $txIdx: IPv4 addresses,
+# default routes (with their store), DHCP and static DNS servers (from the
+# registry, since Get-DnsClientServerAddress also returns those obtained by
+# DHCP).
+CAPTURE_SCRIPT = (
+    "$txPrev = @{"
+    "ips = @(Get-NetIPAddress -InterfaceIndex $txIdx -AddressFamily IPv4"
+    " -ErrorAction SilentlyContinue | Where-Object {"
+    " [string]$_.PrefixOrigin -eq 'Manual' } | Select-Object IPAddress,"
+    " PrefixLength); "
+    "routes = @(foreach ($txStore in " + ROUTE_STORES + ") {"
+    " Get-NetRoute -InterfaceIndex $txIdx -AddressFamily IPv4"
+    " -DestinationPrefix 0.0.0.0/0 -PolicyStore $txStore"
+    " -ErrorAction SilentlyContinue | Select-Object NextHop, RouteMetric,"
+    " @{Name = 'Store'; Expression = {$txStore}} }); "
+    "dhcp = [string](Get-NetIPInterface -InterfaceIndex $txIdx"
+    " -AddressFamily IPv4 -ErrorAction SilentlyContinue).Dhcp; "
+    "dns = [string](Get-ItemProperty -ErrorAction SilentlyContinue ("
+    "'HKLM:/SYSTEM/CurrentControlSet/Services/Tcpip/Parameters/"
+    "Interfaces/' + (Get-NetAdapter -InterfaceIndex $txIdx"
+    " -ErrorAction SilentlyContinue).InterfaceGuid)).NameServer}"
+)
+
+# Restore the configuration saved by CAPTURE_SCRIPT. Each part is only
+# restored if the transaction changed it.
+ROLLBACK_SCRIPTS = {
+    "ip": (
+        "Get-NetIPAddress -InterfaceIndex $txIdx -AddressFamily IPv4"
+        " -ErrorAction SilentlyContinue | Remove-NetIPAddress"
+        " -Confirm:$false -ErrorAction SilentlyContinue; "
+        "if ($txPrev.dhcp -eq 'Enabled') { Set-NetIPInterface"
+        " -InterfaceIndex $txIdx -Dhcp Enabled -ErrorAction Stop } else {"
+        " foreach ($txIp in $txPrev.ips) { New-NetIPAddress"
+        " -InterfaceIndex $txIdx -IPAddress $txIp.IPAddress -PrefixLength"
+        " $txIp.PrefixLength -PolicyStore ActiveStore -ErrorAction Stop"
+        " | Out-Null } }"
+    ),
+    "gateway": (
+        "foreach ($txStore in " + ROUTE_STORES + ") { Get-NetRoute"
+        " -InterfaceIndex $txIdx -AddressFamily IPv4 -DestinationPrefix"
+        " 0.0.0.0/0 -PolicyStore $txStore -ErrorAction SilentlyContinue"
+        " | Remove-NetRoute -Confirm:$false -ErrorAction SilentlyContinue"
+        " }; "
+        "foreach ($txRoute in $txPrev.routes) { New-NetRoute"
+        " -InterfaceIndex $txIdx -DestinationPrefix 0.0.0.0/0 -NextHop"
+        " $txRoute.NextHop -RouteMetric $txRoute.RouteMetric -PolicyStore"
+        " $txRoute.Store -ErrorAction Stop | Out-Null }"
+    ),
+    "dns": (
+        "if ($txPrev.dns) { Set-DnsClientServerAddress -InterfaceIndex"
+        " $txIdx -ServerAddresses ($txPrev.dns -split '[, ]+')"
+        " -ErrorAction Stop } else { Set-DnsClientServerAddress"
+        " -InterfaceIndex $txIdx -ResetServerAddresses -ErrorAction Stop }"
+    ),
+}
+
+
+class StepResult(NamedTuple):
+    """Result of a step of a transaction"""
+    name: str  # Name of the step (e.g., "set_ip_mask")
+    error: str  # Error message ("" if the step succeeded)
+
+    def __bool__(self) -> bool:
+        return not self.error
+
+
+class TransactionResult(NamedTuple):
+    """Result of a transaction"""
+    steps: list  # StepResult of each step run, in order
+    rolled_back: bool  # A step failed and the rollback was run
+    rollback_errors: list  # Errors of the rollback ([] if it succeeded)
+
+    def __bool__(self) -> bool:
+        return all(self.steps)
+
+    @property
+    def error(self) -> str:
+        """Error of the step that failed ("" if all succeeded)."""
+        return next((step.error for step in self.steps if step.error), "")
+
+    def raise_for_error(self) -> None:
+        """Raise the exception of the step that failed, if any.
+
+        Raises:
+            PermissionError: No permissions to execute the command.
+            KeyError: There is no network adapter for the given index.
+            NotImplementedError: Unidentified error.
+        """
+        error = self.error
+        if "PermissionDenied" in error:
+            raise PermissionError("No administrator permissions")
+        elif "ObjectNotFound" in error:
+            raise KeyError("Invalid network adapter index")
+        elif error:
+            raise NotImplementedError(error)
+
+
+def parse_result(output: CommandResult, enconding: str) -> TransactionResult:
+    """Parse the output of ConfigTransaction.script().
+
+    Args:
+        output (CommandResult): Result of the script.
+        enconding (str): Output enconding.
+
+    Raises:
+        NotImplementedError: The result could not be read.
+
+    Returns:
+        TransactionResult: Result of each step and of the rollback.
+    """
+    try:
+        result = json.loads(output.stdout.decode(enconding))
+        steps = [StepResult(step["name"], step["error"] or "")
+                 for step in result["steps"]]
+
+        return TransactionResult(steps, bool(result["rolled_back"]),
+                                 [str(err) for err in result["rollback"]])
+    except (ValueError, KeyError, TypeError) as e:
+        raise NotImplementedError(
+            "An error occurred while applying the configuration: "
+            + output.stderr.decode(enconding).strip()) from e
+
+
+class ConfigTransaction:
+    """Set of configuration changes for a network adapter that are run as
+    a single PowerShell script. The steps are run in order and, if one
+    fails, the rest are skipped and the previous configuration is restored.
+
+    Example:
+        tr = ConfigTransaction(12)
+        tr.set_ip_mask("192.168.1.10", "255.255.255.0")
+        tr.set_def_gateway("192.168.1.1")
+        tr.set_dns_servers("1.1.1.1", "")
+        result = tr.commit()
+    """
+
+    def __init__(self, index: int, runner=None) -> None:
+        self.index = int(index)
+        # Object with a run(args) method returning a CommandResult.
+        # Defaults to the shared pool.
+        self._runner = runner
+        self.steps = []  # (name, part, PowerShell command)
+
+    def _add(self, name: str, part: str, command: str) -> None:
+        """Add a step to the transaction.
+
+        Args:
+            name (str): Name of the step.
+            part (str): Part of the configuration it changes
+                (key of ROLLBACK_SCRIPTS).
+            command (str): PowerShell command (only single quotes).
+        """
+        self.steps.append((name, part, command))
+
+    def commit(self) -> TransactionResult:
+        """Run all the steps in a single command.
+
+        Raises:
+            NotImplementedError: The result could not be read.
+
+        Returns:
+            TransactionResult: Result of each step and of the rollback.
+        """
+        if not self.steps:
+            return TransactionResult([], False, [])
+
+        runner = self._runner if self._runner else get_pool()
+        enconding = NetworkAdapters(runner=runner).enconding
+
+        return parse_result(
+            runner.run(["powershell.exe", self.script()]), enconding)
+
+    def reset_def_gateway(self) -> None:
+        """Remove the default gateway."""
+        self._add("reset_def_gateway", "gateway",
+                  f"Get-NetRoute -InterfaceIndex {self.index}"
+                  " -AddressFamily IPv4 -DestinationPrefix 0.0.0.0/0"
+                  " -ErrorAction SilentlyContinue | Remove-NetRoute"
+                  " -Confirm:$false -ErrorAction Stop")
+
+    def reset_dns_servers(self) -> None:
+        """Remove the DNS servers set (obtain them automatically)."""
+        self._add("reset_dns_servers", "dns",
+                  f"Set-DnsClientServerAddress -InterfaceIndex {self.index}"
+                  " -ResetServerAddresses -ErrorAction Stop")
+
+    def remove_primary_ip(self, ip: str = "") -> None:
+        """Remove the primary IPv4 address, as chosen by sort_addresses()
+        (the first manual one or, if there is none, the first one), and
+        the given address if it is already assigned. The other addresses
+        (e.g., the secondary ones) are kept.
+
+        Args:
+            ip (str, optional): Address about to be set. Defaults to ""
+                (none).
+        """
+        self._add("remove_primary_ip", "ip",
+                  "$txAddrs = @(Get-NetIPAddress -InterfaceIndex"
+                  f" {self.index} -AddressFamily IPv4"
+                  " -ErrorAction SilentlyContinue); "
+                  "$txPrimary = @($txAddrs | Where-Object {"
+                  " [string]$_.PrefixOrigin -eq 'Manual' -or"
+                  " [string]$_.SuffixOrigin -eq 'Manual' }) + $txAddrs"
+                  " | Select-Object -First 1; "
+                  "$txAddrs | Where-Object { $_.IPAddress -in"
+                  f" @($txPrimary.IPAddress, '{ip}') }} | Remove-NetIPAddress"
+                  " -Confirm:$false -ErrorAction Stop")
+
+    def reset_ip(self) -> None:
+        """Remove all the IPv4 addresses."""
+        self._add("reset_ip", "ip",
+                  f"Get-NetIPAddress -InterfaceIndex {self.index}"
+                  " -AddressFamily IPv4 -ErrorAction SilentlyContinue"
+                  " | Remove-NetIPAddress -Confirm:$false -ErrorAction Stop")
+
+    def script(self) -> str:
+        """Get the script of the transaction. It writes a JSON document
+        with the result of each step and of the rollback.
+
+        Returns:
+            str: PowerShell script.
+        """
+        parts = []
+        lines = [f"$txIdx = {self.index}",
+                 CAPTURE_SCRIPT,
+                 "$txSteps = @()",
+                 "$txFailed = $false",
+                 "$txRollback = @()"]
+
+        for name, part, command in self.steps:
+            lines.append(
+                "if (-not $txFailed) { try { " + command + " | Out-Null;"
+                f" $txSteps += @{{name = '{name}'; error = ''}} }}"
+                " catch { $txSteps += @{name = '" + name + "'; error ="
+                " [string]$_.CategoryInfo.Category + ': '"
+                " + $_.Exception.Message}; $txFailed = $true } }")
+            if part not in parts:
+                parts.append(part)
+
+        for part in parts:
+            lines.append("if ($txFailed) { try { " + ROLLBACK_SCRIPTS[part]
+                         + " } catch { $txRollback += [string]$_ } }")
+
+        lines.append("@{steps = $txSteps; rolled_back = $txFailed;"
+                     " rollback = $txRollback} | ConvertTo-Json -Depth 3"
+                     " -Compress")
+
+        return "; ".join(lines)
+
+    def set_def_gateway(self, ip: str) -> None:
+        """Replace the default gateway.
+
+        Args:
+            ip (str): Address to be set.
+
+        Raises:
+            ValueError: Invalid address.
+        """
+        if not ip or ip == "0.0.0.0" or not ipv4.is_valid(ip):
+            raise ValueError("Invalid configuration")
+
+        self.reset_def_gateway()
+        self._add("set_def_gateway", "gateway",
+                  f"New-NetRoute -InterfaceIndex {self.index}"
+                  f" -DestinationPrefix 0.0.0.0/0 -NextHop {ip}"
+                  " -ErrorAction Stop")
+
+    def set_dns_servers(self, pref_dns: str, alt_dns: str) -> None:
+        """Set the DNS servers.
+
+        Args:
+            pref_dns (str): Address for the preferred DNS server.
+            alt_dns (str): Address for the alternate DNS server.
+
+        Raises:
+            ValueError: Invalid address.
+        """
+        servers = [dns for dns in (pref_dns, alt_dns) if dns]
+        if not servers or any(
+                dns == "0.0.0.0" or not ipv4.is_valid(dns)
+                for dns in servers):
+            raise ValueError("Invalid configuration")
+
+        self._add("set_dns_servers", "dns",
+                  f"Set-DnsClientServerAddress -InterfaceIndex {self.index}"
+                  f" -ServerAddresses {','.join(servers)} -ErrorAction Stop")
+
+    def set_ip_mask(self, ip: str, mask: str) -> None:
+        """Replace the primary IPv4 address with a static address. The
+        secondary addresses are kept (see remove_primary_ip()).
+
+        Args:
+            ip (str): Address to be set.
+            mask (str): Subnet mask to be set.
+
+        Raises:
+            ValueError: Invalid address or subnet mask.
+        """
+        prefix_length = ipv4.prefix_length(mask)
+        if (not ip or ip == "0.0.0.0" or not prefix_length
+                or not ipv4.is_valid(ip)):
+            raise ValueError("Invalid configuration")
+
+        # Removing the address first avoids the "MSFT_NetIPAddress already
+        # exists" error if it is only the prefix length that changes
+        ip = ipv4.unpack(ipv4.pack(ip))
+        self.remove_primary_ip(ip)
+        self._add("set_ip_mask", "ip",
+                  f"New-NetIPAddress -InterfaceIndex {self.index}"
+                  f" -IPAddress {ip} -PrefixLength {prefix_length}"
+                  " -PolicyStore ActiveStore -ErrorAction Stop")
+
+    def set_net_dhcp(self) -> None:
+        """Remove the default gateway and enable DHCP."""
+        self.reset_def_gateway()
+        self._add("set_net_dhcp", "ip",
+                  f"Set-NetIPInterface -InterfaceIndex {self.index}"
+                  " -Dhcp Enabled -ErrorAction Stop")
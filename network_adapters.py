@@ -1,14 +1,257 @@
 """Get information about and configure network adapters in Windows"""
 
-import re
-import subprocess
+from concurrent import futures
+import io
+import json
+import sys
+import threading
+from time import monotonic
+
+from adapter_backend import AdapterBackend, Route
+from adapter_info import AdapterInfo, IPAddress, sort_addresses
+import ipv4
+from linux_adapters import LinuxNetworkAdapters
+from powershell import CommandResult, get_pool
+
+MAX_WORKERS = 4  # Queries run at the same time by get_info()
+QUERY_TIMEOUT = 30  # Seconds to wait for the queries of get_info()
+DEFAULT_ROUTE = "0.0.0.0/0"
+
+_ENCONDING = None  # Terminal enconding, detected once per process
+_ENCONDING_LOCK = threading.Lock()
+# Command that returns the OEM code page used by the terminal
+ENCONDING_COMMAND = ["powershell.exe", "Get-ItemPropertyValue",
+                     "HKLM:\\SYSTEM\\CurrentControlSet" +
+                     "\\Control\\Nls\\CodePage OEMCP"]
+
+
+def cache_enconding(output: bytes) -> str:
+    """Save the terminal enconding from the output of ENCONDING_COMMAND.
+
+    Args:
+        output (bytes): Output of the command (e.g., b"850\\r\\n").
 
+    Raises:
+        ValueError: The output is not a code page.
+
+    Returns:
+        str: Terminal enconding (e.g., "cp850").
+    """
+    global _ENCONDING  # pylint: disable=global-statement
+    oemcp = output.decode("utf-8").strip()
+    if not oemcp.isdigit():
+        raise ValueError("Invalid code page")
 
-class NetworkAdapters:
+    _ENCONDING = f"cp{oemcp}"
+    return _ENCONDING
+
+
+def cached_enconding():
+    """Get the terminal enconding if it has already been detected.
+
+    Returns:
+        str | None: Terminal enconding or None.
+    """
+    return _ENCONDING
+
+
+def invalidate_enconding() -> None:
+    """Forget the detected terminal enconding so that the next
+    NetworkAdapters object detects it again."""
+    global _ENCONDING  # pylint: disable=global-statement
+    with _ENCONDING_LOCK:
+        _ENCONDING = None
+
+
+def iter_format_list(output, enconding: str):
+    """Parse the output of Format-List in a single pass, yielding one
+    record at a time. Values may contain colons and wrapped values
+    (continuation lines indented) are joined.
+
+    Args:
+        output (bytes | Iterable[bytes]): Raw output or its lines
+            (e.g., a process stdout).
+        enconding (str): Output enconding.
+
+    Yields:
+        dict: Properties of each record ({"ifIndex": "12", ...}).
+    """
+    if isinstance(output, (bytes, bytearray)):
+        lines = io.StringIO(output.decode(enconding))
+    else:
+        lines = (raw.decode(enconding) for raw in output)
+
+    record = {}
+    key = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+
+        if not line.strip():
+            if record:
+                yield record
+            record = {}
+            key = None
+            continue
+
+        if key is not None and line[0].isspace():
+            # Wrapped value
+            record[key] = f"{record[key]} {line.strip()}"
+            continue
+
+        name, sep, value = line.partition(":")
+        if not sep:
+            if key is not None:
+                record[key] = f"{record[key]} {line.strip()}"
+            continue
+
+        key = name.strip()
+        record[key] = value.strip()
+
+    if record:
+        yield record
+
+
+def metric(value) -> int:
+    """Convert a route or interface metric.
+
+    Args:
+        value (str | int | None): Metric as read from the output.
+
+    Returns:
+        int: Metric (0 if missing).
+    """
+    return int(value) if value not in (None, "") else 0
+
+
+def rank_default_routes(routes) -> dict:
+    """Choose the default route of each network adapter: the one with the
+    lowest route metric plus interface metric, as Windows does.
+
+    Args:
+        routes (Iterable): (index, next_hop, metric) of each default route.
+
+    Returns:
+        dict: Next hop by network adapter index.
+    """
+    best = {}
+    for index, next_hop, route_metric in routes:
+        if index not in best or route_metric < best[index][1]:
+            best[index] = (next_hop, route_metric)
+
+    return {index: next_hop for index, (next_hop, _) in best.items()}
+
+
+def parse_snapshot(output: bytes, enconding: str) -> dict:
+    """Parse the output of snapshot_script().
+
+    Args:
+        output (bytes): Output of the script.
+        enconding (str): Output enconding.
+
+    Raises:
+        ValueError: The output is not a valid snapshot.
+
+    Returns:
+        dict: Same as NetworkAdapters.get_info().
+    """
+    try:
+        snapshot = json.loads(output.decode(enconding))
+        adapters = {}
+        for adap in snapshot["adapters"]:
+            index = int(adap["ifIndex"])
+            adapters[index] = AdapterInfo(
+                index=index,
+                name=adap["Name"] or "",
+                desc=adap["InterfaceDescription"] or "",
+                status=adap["Status"] or "",
+                mac=adap["MacAddress"] or "")
+
+        addresses = {}  # Index -> [IPAddress, ...]
+        for ip in snapshot["ips"]:
+            index = int(ip["InterfaceIndex"])
+            if index not in adapters:
+                continue
+
+            prefix_length = ip["PrefixLength"]
+            addresses.setdefault(index, []).append(IPAddress(
+                ipv4.pack(ip["IPAddress"]),
+                None if prefix_length is None else int(prefix_length),
+                ip["PrefixOrigin"] or "",
+                ip["SuffixOrigin"] or ""))
+
+        # (Issue #4) If more than one IP is assigned to an interface, the
+        # "Manual" one is the primary
+        for index, addrs in addresses.items():
+            adapters[index].set_addresses(addrs)
+
+        for dns in snapshot["dns"]:
+            adap = adapters.get(int(dns["InterfaceIndex"]))
+            servers = dns["ServerAddresses"] or []
+            if adap is None or not servers:
+                continue
+
+            adap.pref_dns_int = ipv4.pack(servers[0])
+            adap.alt_dns_int = ipv4.pack(
+                servers[1] if len(servers) > 1 else "")
+
+        gateways = rank_default_routes(
+            (int(route["ifIndex"]), route["NextHop"],
+             metric(route.get("RouteMetric"))
+             + metric(route.get("InterfaceMetric")))
+            for route in snapshot["routes"])
+        for index, gateway in gateways.items():
+            adap = adapters.get(index)
+            if adap is not None:
+                adap.gateway_int = ipv4.pack(gateway)
+
+    except (KeyError, TypeError, AttributeError) as err:
+        raise ValueError("Invalid network adapters snapshot") from err
+
+    return dict(sorted(adapters.items()))
+
+
+def snapshot_script(index: int = None) -> str:
+    """Get the script that returns adapters, IPv4 addresses, DNS servers
+    and default routes as one JSON document. Only single quotes are used
+    so that it can be passed as one argument to powershell.exe.
+
+    Args:
+        index (int, optional): Only get the information of this network
+            adapter. Defaults to None (all).
+
+    Returns:
+        str: PowerShell script.
+    """
+    filt = "" if index is None else " -InterfaceIndex " + str(int(index))
+
+    return "; ".join([
+        "$ErrorActionPreference = 'SilentlyContinue'",
+        "@{adapters = @(Get-NetAdapter" + filt + " | Select-Object ifIndex,"
+        " Name, InterfaceDescription, @{n='Status'; e={[string]$_.Status}},"
+        " MacAddress)",
+        "ips = @(Get-NetIPAddress -AddressFamily IPv4" + filt +
+        " | Select-Object InterfaceIndex, IPAddress, PrefixLength,"
+        " @{n='PrefixOrigin'; e={[string]$_.PrefixOrigin}},"
+        " @{n='SuffixOrigin'; e={[string]$_.SuffixOrigin}})",
+        "dns = @(Get-DnsClientServerAddress -AddressFamily IPv4" + filt +
+        " | Select-Object InterfaceIndex, ServerAddresses)",
+        "routes = @(Get-NetRoute -AddressFamily IPv4" + filt +
+        " -DestinationPrefix " + DEFAULT_ROUTE + " | Select-Object ifIndex,"
+        " NextHop, RouteMetric, InterfaceMetric)}"
+        " | ConvertTo-Json -Depth 3 -Compress"
+    ])
+
+
+class NetworkAdapters(AdapterBackend):
     """Network Adapters"""
 
-    def __init__(self) -> None:
+    def __init__(self, runner=None) -> None:
+        super().__init__()
+        # Object with a run(args) method returning a CommandResult
+        # (e.g., powershell.PowerShellPool). Defaults to the shared pool.
+        self._runner = runner if runner else get_pool()
         self.enconding = self.get_enconding()
+        self.failed_queries = {}  # Queries of the last get_info() that failed
 
     def _get_dns_client_server_address(self) -> dict:
         """Get network adapter information from Get-DnsClientServerAddress.
@@ -24,74 +267,78 @@ class NetworkAdapters:
             ...
             }
         """
-        p = subprocess.Popen(["powershell.exe", "Get-DnsClientServerAddress",
-                              "-AddressFamily IPv4",
-                              "| Format-List -Property",
-                              "InterfaceIndex",
-                              ",ServerAddresses"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        output, _ = p.communicate()
-
-        out_dec = output.decode(self.enconding).split("InterfaceIndex")
+        output = self._run(["powershell.exe", "Get-DnsClientServerAddress",
+                            "-AddressFamily IPv4",
+                            "| Format-List -Property",
+                            "InterfaceIndex",
+                            ",ServerAddresses"]).stdout
 
         adapters = {}
-        for adapter in out_dec:
-            if "ServerAddresses" not in adapter:
+        for record in iter_format_list(output, self.enconding):
+            if "ServerAddresses" not in record:
                 continue
 
-            list_prop = adapter.split("\r\n")
-            while "" in list_prop:
-                list_prop.remove("")
-
-            list_prop[0] = "InterfaceIndex" + list_prop[0]
-
-            properties = {}
-            pref_dns = ""
-            alt_dns = ""
-            for prop in list_prop:
-                if "ServerAddresses" in prop:
-                    dns = prop.split(":")[1].strip()[1:-1].split(",")
-                    pref_dns = dns[0]
-                    if len(dns) == 2:
-                        alt_dns = dns[1]
-                    properties["PreferredDNSServer"] = pref_dns
-                    properties["AlternateDNSServer"] = alt_dns
-                else:
-                    desc, value = prop.split(":")
-                    properties[desc.strip()] = value.strip()
+            # {1.1.1.1, 8.8.8.8}
+            servers = record["ServerAddresses"].strip("{}").split(",")
+            dns = [server.strip() for server in servers if server.strip()]
 
-            adapters[int(properties["InterfaceIndex"])] = {
-                "pref_dns": properties["PreferredDNSServer"].strip(),
-                "alt_dns": properties["AlternateDNSServer"].strip()
+            adapters[int(record["InterfaceIndex"])] = {
+                "pref_dns": dns[0] if dns else "",
+                "alt_dns": dns[1] if len(dns) > 1 else ""
             }
 
         return adapters
 
+    def get_arp_table(self, ip_netap: str) -> list:
+        """Get the ARP table of a network adapter.
+
+        Args:
+            ip_netap (str): Network adapter IP.
+
+        Returns:
+            list: Entries ({"iaddr": ..., "phyaddr": ..., "itype": ...}).
+        """
+        output, error, _ = self._run(["powershell.exe", "arp -a -N",
+                                      str(ip_netap)])
+        out_dec = output.decode(self.enconding)
+
+        data_arp = []
+
+        if out_dec.find("---") == -1 or error:
+            return data_arp
+
+        ret = out_dec.split("\r\n")
+        ret = [elem.strip() for elem in ret if elem.strip() != ""]
+
+        for line in ret:
+            data = [elem.strip() for elem in line.split(" ")
+                    if elem.strip() != ""]
+            if ipv4.is_valid(data[0]):
+                data_arp.append({
+                    "iaddr": str(data[0]),
+                    "phyaddr": str((data[1])).upper(),
+                    "itype": str(data[2])
+                })
+
+        return data_arp
+
     def get_enconding(self) -> str:
-        """Get terminal enconding.
+        """Get terminal enconding. It is only detected the first time
+        (see invalidate_enconding()).
 
         Returns:
             str: Terminal enconding.
         """
-        try:
-            p = subprocess.Popen(["powershell.exe", "Get-ItemPropertyValue",
-                                  "HKLM:\\SYSTEM\\CurrentControlSet" +
-                                  "\\Control\\Nls\\CodePage OEMCP"],
-                                 stdout=subprocess.PIPE,
-                                 stderr=subprocess.PIPE,
-                                 stdin=subprocess.DEVNULL,
-                                 creationflags=subprocess.CREATE_NO_WINDOW)
+        with _ENCONDING_LOCK:
+            if _ENCONDING:
+                return _ENCONDING
 
-            oemcp, _ = p.communicate()
-            oemcp = oemcp.decode('utf-8').replace("\n", "")
-            return f"cp{oemcp}"
+            try:
+                return cache_enconding(self._run(ENCONDING_COMMAND).stdout)
 
-        except (OSError, TypeError, ValueError):
-            return "utf-8"
+            except (OSError, TypeError, ValueError):
+                # Not cached, so that it is detected again next time
+                return "utf-8"
 
     def _get_net_adapter(self) -> dict:
         """Get network adapter information from Get-NetAdapter.
@@ -109,43 +356,24 @@ class NetworkAdapters:
             ...
             }
         """
-        p = subprocess.Popen(["powershell.exe", "Get-NetAdapter",
-                              "| Format-List -Property",
-                              "ifIndex",
-                              ",Name",
-                              ",InterfaceDescription",
-                              ",Status",
-                              ",MacAddress"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        output, _ = p.communicate()
-
-        out_dec = output.decode(self.enconding).split("ifIndex")
+        output = self._run(["powershell.exe", "Get-NetAdapter",
+                            "| Format-List -Property",
+                            "ifIndex",
+                            ",Name",
+                            ",InterfaceDescription",
+                            ",Status",
+                            ",MacAddress"]).stdout
 
         adapters = {}
-        for adapter in out_dec:
-            if "Name" not in adapter:
+        for record in iter_format_list(output, self.enconding):
+            if "Name" not in record:
                 continue
 
-            list_prop = adapter.split("\r\n")
-            while "" in list_prop:
-                list_prop.remove("")
-
-            list_prop[0] = "ifIndex" + list_prop[0]
-
-            properties = {}
-            for prop in list_prop:
-                desc, value = prop.split(":")
-                properties[desc.strip()] = value.strip()
-
-            adapters[int(properties["ifIndex"])] = {
-                "name": properties["Name"].strip(),
-                "desc": properties["InterfaceDescription"].strip(),
-                "status": properties["Status"].strip(),
-                "mac": properties["MacAddress"].strip()
+            adapters[int(record["ifIndex"])] = {
+                "name": record["Name"],
+                "desc": record.get("InterfaceDescription", ""),
+                "status": record.get("Status", ""),
+                "mac": record.get("MacAddress", "")
             }
 
         return adapters
@@ -162,66 +390,55 @@ class NetworkAdapters:
                 "prefix_length": 24,
                 "mask": "255.255.255.0",
                 "prefix_origin": "Dhcp",
-                "suffix_origin": "Dhcp"
+                "suffix_origin": "Dhcp",
+                "addresses": (IPAddress(...), ...)
             },
             ...
             }
         """
-        p = subprocess.Popen(["powershell.exe", "Get-NetIPAddress",
-                              "-AddressFamily IPv4",
-                              "| Format-List -Property",
-                              "InterfaceIndex",
-                              ",IPAddress",
-                              ",PrefixLength",
-                              ",PrefixOrigin",
-                              ",SuffixOrigin"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        output, _ = p.communicate()
-
-        out_dec = output.decode(self.enconding).split("InterfaceIndex")
-
-        adapters = {}
-        for adapter in out_dec:
-            if "IPAddress" not in adapter:
+        output = self._run(["powershell.exe", "Get-NetIPAddress",
+                            "-AddressFamily IPv4",
+                            "| Format-List -Property",
+                            "InterfaceIndex",
+                            ",IPAddress",
+                            ",PrefixLength",
+                            ",PrefixOrigin",
+                            ",SuffixOrigin"]).stdout
+
+        addresses = {}  # Index -> [IPAddress, ...]
+        for record in iter_format_list(output, self.enconding):
+            if "IPAddress" not in record:
                 continue
 
-            list_prop = adapter.split("\r\n")
-            while "" in list_prop:
-                list_prop.remove("")
-
-            list_prop[0] = "InterfaceIndex" + list_prop[0]
-
-            properties = {}
-            for prop in list_prop:
-                desc, value = prop.split(":")
-                properties[desc.strip()] = value.strip()
+            prefix_length = record.get("PrefixLength", "")
+            addresses.setdefault(int(record["InterfaceIndex"]), []).append(
+                IPAddress(ipv4.pack(record["IPAddress"]),
+                          int(prefix_length) if prefix_length else None,
+                          record.get("PrefixOrigin", ""),
+                          record.get("SuffixOrigin", "")))
 
+        adapters = {}
+        for index, addrs in addresses.items():
             # (Issue #4) If more than one IP is assigned to an interface,
-            # the "Manual" prevails
-            if (int(properties["InterfaceIndex"]) in adapters
-                and not (properties["PrefixOrigin"] == "Manual"
-                         or properties["SuffixOrigin"]) == "Manual"):
-                continue
-
-            adapters[int(properties["InterfaceIndex"])] = {
-                "ip": properties["IPAddress"].strip(),
-                "prefix_length": int(properties["PrefixLength"]) if
-                properties["PrefixLength"] else "",
-                "mask": self.prefix_length_2_subnet_mask(
-                    int(properties["PrefixLength"])) if
-                properties["PrefixLength"] else "",
-                "prefix_origin": properties["PrefixOrigin"].strip(),
-                "suffix_origin": properties["SuffixOrigin"].strip()
+            # the "Manual" one is the primary
+            addrs = sort_addresses(addrs)
+            primary = addrs[0]
+            adapters[index] = {
+                "ip": primary.ip,
+                "prefix_length": ("" if primary.prefix_length is None
+                                  else primary.prefix_length),
+                "mask": primary.mask,
+                "prefix_origin": primary.prefix_origin,
+                "suffix_origin": primary.suffix_origin,
+                "addresses": addrs
             }
 
         return adapters
 
     def _get_net_route(self) -> dict:
-        """Get network adapter information from Get-NetRoute.
+        """Get the default gateway of the network adapters from
+        Get-NetRoute. Only the default routes are requested and, if a
+        network adapter has several, the one with the lowest metric wins.
 
         Returns:
             dict: Dictionary of dictionaries with the data of network adapters
@@ -233,41 +450,44 @@ class NetworkAdapters:
             ...
             }
         """
-        p = subprocess.Popen(["powershell.exe", "Get-NetRoute",
-                              "-AddressFamily IPv4",
-                              "| Format-List -Property",
-                              "ifIndex",
-                              ",NextHop"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        output, _ = p.communicate()
-
-        out_dec = output.decode(self.enconding).split("ifIndex")
-
-        adapters = {}
-        for adapter in out_dec:
-            if "NextHop" not in adapter:
-                continue
-
-            list_prop = adapter.split("\r\n")
-            while "" in list_prop:
-                list_prop.remove("")
+        output = self._run(["powershell.exe", "Get-NetRoute",
+                            "-AddressFamily IPv4",
+                            f"-DestinationPrefix {DEFAULT_ROUTE}",
+                            "-ErrorAction SilentlyContinue",
+                            "| Format-List -Property",
+                            "ifIndex",
+                            ",NextHop",
+                            ",RouteMetric",
+                            ",InterfaceMetric"]).stdout
+
+        gateways = rank_default_routes(
+            (int(record["ifIndex"]), record["NextHop"],
+             metric(record.get("RouteMetric"))
+             + metric(record.get("InterfaceMetric")))
+            for record in iter_format_list(output, self.enconding)
+            if "NextHop" in record)
+
+        return {index: {"gateway": gateway}
+                for index, gateway in gateways.items()}
+
+    def _get_snapshot(self, index: int = None) -> dict:
+        """Get the information about the network adapters with a single
+        command that returns a JSON document.
 
-            list_prop[0] = "ifIndex" + list_prop[0]
+        Args:
+            index (int, optional): Only get the information of this network
+                adapter. Defaults to None (all).
 
-            properties = {}
-            for prop in list_prop:
-                desc, value = prop.split(":")
-                properties[desc.strip()] = value.strip()
+        Raises:
+            ValueError: The output is not a valid snapshot.
 
-            adapters[int(properties["ifIndex"])] = {
-                "gateway": properties["NextHop"].strip()
-            }
+        Returns:
+            dict: Same as get_info().
+        """
+        output = self._run(["powershell.exe",
+                            snapshot_script(index)]).stdout
 
-        return adapters
+        return parse_snapshot(output, self.enconding)
 
     def _merge_dicts(self, d1: dict, d2: dict) -> dict:
         """Merge two dictionaries while preserving the properties of both.
@@ -304,16 +524,10 @@ class NetworkAdapters:
             KeyError: There is no network adapter for the given alias.
             NotImplementedError: Unidentified error.
         """
-        p = subprocess.Popen(["powershell.exe", "Disable-NetAdapter",
-                              "-Name",
-                              f"'{str(alias)}'",
-                              "-Confirm:$false"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        _, error = p.communicate()
+        error = self._run(["powershell.exe", "Disable-NetAdapter",
+                           "-Name",
+                           f"'{str(alias)}'",
+                           "-Confirm:$false"]).stderr
         err_dec = error.decode(self.enconding)
 
         if "PermissionDenied" in err_dec:
@@ -337,15 +551,9 @@ class NetworkAdapters:
             KeyError: There is no network adapter for the given alias.
             NotImplementedError: Unidentified error.
         """
-        p = subprocess.Popen(["powershell.exe", "Enable-NetAdapter",
-                              "-Name",
-                              f"'{str(alias)}'"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        _, error = p.communicate()
+        error = self._run(["powershell.exe", "Enable-NetAdapter",
+                           "-Name",
+                           f"'{str(alias)}'"]).stderr
         err_dec = error.decode(self.enconding)
 
         if "PermissionDenied" in err_dec:
@@ -358,12 +566,48 @@ class NetworkAdapters:
 
         return
 
-    def get_info(self) -> dict:
-        """Get the information about the network adapters.
+    def get_adapter(self, index: int) -> AdapterInfo:
+        """Get the information about a network adapter. Only this adapter
+        is queried, falling back to get_info() if it fails.
+
+        Args:
+            index (int): Network adapter index.
+
+        Raises:
+            KeyError: There is no network adapter for the given index.
 
         Returns:
-            dict: Dictionary of dictionaries with all network adapters whose
-                    key is the index of the adapter and sorted by index.
+            AdapterInfo: Information about the network adapter (same as
+                each value of get_info()).
+        """
+        try:
+            adapters = self._get_snapshot(index)
+        except ValueError:
+            adapters = self.get_info(snapshot=False)
+
+        if index not in adapters:
+            raise KeyError("Invalid network adapter index")
+
+        return adapters[index]
+
+    def get_info(self, snapshot: bool = True,
+                 timeout: float = QUERY_TIMEOUT) -> dict:
+        """Get the information about the network adapters. The individual
+        commands are run concurrently and, if any of them fails or does not
+        finish in time, the rest of the information is returned and the
+        error is saved in failed_queries.
+
+        Args:
+            snapshot (bool, optional): If True, all the information is
+                obtained with a single JSON command, falling back to the
+                individual commands if it fails. Defaults to True.
+            timeout (float, optional): Seconds to wait for the individual
+                commands. Defaults to QUERY_TIMEOUT.
+
+        Returns:
+            dict: AdapterInfo records (also readable as dictionaries) of all
+                    network adapters whose key is the index of the adapter
+                    and sorted by index.
             {
             1: {
                 "prefix_origin": "Dhcp",
@@ -382,39 +626,87 @@ class NetworkAdapters:
             ...
             }
         """
-        properties = ["prefix_origin", "pref_dns", "alt_dns", "gateway",
-                      "status", "mac", "ip", "suffix_origin", "name",
-                      "desc", "mask", "prefix_length"]
+        self.failed_queries = {}
+        if snapshot:
+            try:
+                return self._get_snapshot()
+            except ValueError:
+                pass
 
         # Get the network adapters information
-        net_adapters = self._get_net_adapter()
-        net_ip = self._get_net_ip_address()
-        net_dns = self._get_dns_client_server_address()
-        net_gateway = self._get_net_route()
+        queries = {
+            "adapter": self._get_net_adapter,
+            "ip": self._get_net_ip_address,
+            "dns": self._get_dns_client_server_address,
+            "gateway": self._get_net_route
+        }
+        results = {}
+        executor = futures.ThreadPoolExecutor(max_workers=MAX_WORKERS)
+        try:
+            running = {name: executor.submit(query)
+                       for name, query in queries.items()}
+            deadline = monotonic() + timeout
+            for name, future in running.items():
+                try:
+                    results[name] = future.result(
+                        timeout=max(0, deadline - monotonic()))
+                except Exception as err:  # pylint: disable=broad-exception-caught # noqa
+                    results[name] = {}
+                    self.failed_queries[name] = err
+        finally:
+            # Do not wait for the queries that did not finish in time
+            executor.shutdown(wait=False, cancel_futures=True)
 
         # Merge data
-        net_info = self._merge_dicts(net_gateway, self._merge_dicts(
-            self._merge_dicts(net_adapters, net_ip), net_dns))
+        net_info = self._merge_dicts(results["gateway"], self._merge_dicts(
+            self._merge_dicts(results["adapter"], results["ip"]),
+            results["dns"]))
 
-        # Sort by network adapter index
-        net_info_sorted = {}
-        keys_sorted = sorted(net_info.keys())
-        for key in keys_sorted:
-            # Save only visible adapters
-            if "name" in net_info[key].keys():
-                set_prop = set(properties)
-                set_adap = set(net_info[key].keys())
+        # Sort by network adapter index and save only visible adapters
+        return {key: AdapterInfo.from_dict(key, net_info[key])
+                for key in sorted(net_info.keys())
+                if "name" in net_info[key]}
 
-                # Complete the dictionary with the missing properties
-                if not set_prop.issubset(set_adap):
-                    for prop in (set_prop - set_adap):
-                        net_info[key][prop] = ""
+    def iter_routes(self, index: int = None):
+        """Get the IPv4 route table, one route at a time. If the command
+        runner has a stream() method, the output is parsed while it is
+        being written, so the memory used does not depend on the number of
+        routes.
 
-                net_info_sorted[key] = net_info[key]
+        Args:
+            index (int, optional): Only the routes of this network adapter.
+                Defaults to None (all).
 
-        return net_info_sorted
+        Yields:
+            Route: Each route.
+        """
+        args = ["powershell.exe", "Get-NetRoute", "-AddressFamily IPv4"]
+        if index is not None:
+            args.append(f"-InterfaceIndex {int(index)}")
+        args += ["-ErrorAction SilentlyContinue",
+                 "| Format-List -Property",
+                 "ifIndex",
+                 ",DestinationPrefix",
+                 ",NextHop",
+                 ",RouteMetric",
+                 ",InterfaceMetric"]
+
+        source = getattr(self._runner, "stream", None)
+        lines = source(args) if source else io.BytesIO(self._run(args).stdout)
+
+        for record in iter_format_list(lines, self.enconding):
+            if "DestinationPrefix" not in record:
+                continue
+
+            yield Route(index=int(record["ifIndex"]),
+                        destination=record["DestinationPrefix"],
+                        next_hop=record.get("NextHop", ""),
+                        route_metric=metric(record.get("RouteMetric")),
+                        interface_metric=metric(
+                            record.get("InterfaceMetric")))
 
-    def prefix_length_2_subnet_mask(self, bits: int) -> str:
+    @staticmethod
+    def prefix_length_2_subnet_mask(bits: int) -> str:
         """Convert the size of the local subnet into a subnet mask.
 
         Args:
@@ -427,19 +719,7 @@ class NetworkAdapters:
             str: The subnet mask corresponding to the number of
                 bits (255.255.255.255).
         """
-        if not 0 <= bits <= 32:
-            raise ValueError(
-                "Invalid number of bits. Must be between 0 and 32.")
-
-        subnet_mask_int = (0xFFFFFFFF << (32 - bits)) & 0xFFFFFFFF
-        subnet_mask = (
-            (subnet_mask_int >> 24),
-            ((subnet_mask_int >> 16) & 0xFF),
-            ((subnet_mask_int >> 8) & 0xFF),
-            (subnet_mask_int & 0xFF),
-        )
-
-        return ".".join(map(str, subnet_mask))
+        return ipv4.subnet_mask(bits)
 
     def reset_def_gateway(self, index: int) -> None:
         """Remove the default gateway for a given network adapter.
@@ -452,18 +732,12 @@ class NetworkAdapters:
             KeyError: There is no network adapter for the given index.
             NotImplementedError: Unidentified error.
         """
-        p = subprocess.Popen(["powershell.exe", "Remove-NetRoute",
-                              " -ifIndex",
-                              str(index),
-                              "-DestinationPrefix",
-                              "0.0.0.0/0",
-                              "-Confirm:$false"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        _, error = p.communicate()
+        error = self._run(["powershell.exe", "Remove-NetRoute",
+                           " -ifIndex",
+                           str(index),
+                           "-DestinationPrefix",
+                           "0.0.0.0/0",
+                           "-Confirm:$false"]).stderr
         err_dec = error.decode(self.enconding)
 
         if "PermissionDenied" in err_dec:
@@ -488,16 +762,10 @@ class NetworkAdapters:
             KeyError: There is no network adapter for the given index.
             NotImplementedError: Unidentified error.
         """
-        p = subprocess.Popen(["powershell.exe", "Set-DnsClientServerAddress",
-                              "-InterfaceIndex",
-                              str(index),
-                              "-ResetServerAddresses"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        _, error = p.communicate()
+        error = self._run(["powershell.exe", "Set-DnsClientServerAddress",
+                           "-InterfaceIndex",
+                           str(index),
+                           "-ResetServerAddresses"]).stderr
         err_dec = error.decode(self.enconding)
 
         if "PermissionDenied" in err_dec:
@@ -521,16 +789,10 @@ class NetworkAdapters:
             KeyError: There is no network adapter for the given index.
             NotImplementedError: Unidentified error.
         """
-        p = subprocess.Popen(["powershell.exe", "Remove-NetIPAddress",
-                              " -InterfaceIndex",
-                              str(index),
-                              "-Confirm:$false"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        _, error = p.communicate()
+        error = self._run(["powershell.exe", "Remove-NetIPAddress",
+                           " -InterfaceIndex",
+                           str(index),
+                           "-Confirm:$false"]).stderr
         err_dec = error.decode(self.enconding)
 
         if "PermissionDenied" in err_dec:
@@ -544,6 +806,18 @@ class NetworkAdapters:
 
         return
 
+    def _run(self, args: list) -> CommandResult:
+        """Run a command through the command runner.
+
+        Args:
+            args (list): Program and arguments (e.g., ["powershell.exe",
+                "Get-NetAdapter"]).
+
+        Returns:
+            CommandResult: Output, error and exit code of the command.
+        """
+        return self._runner.run(args)
+
     def set_def_gateway(self, index: int, ip: str) -> None:
         """Set the default gateway for a given network adapter.
 
@@ -560,19 +834,13 @@ class NetworkAdapters:
         if not ip or ip == "0.0.0.0":
             raise ValueError("Invalid configuration")
 
-        p = subprocess.Popen(["powershell.exe", "New-NetRoute",
-                              "-InterfaceIndex",
-                              str(index),
-                              "-DestinationPrefix",
-                              "0.0.0.0/0",
-                              "-NextHop",
-                              str(ip)],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        _, error = p.communicate()
+        error = self._run(["powershell.exe", "New-NetRoute",
+                           "-InterfaceIndex",
+                           str(index),
+                           "-DestinationPrefix",
+                           "0.0.0.0/0",
+                           "-NextHop",
+                           str(ip)]).stderr
         err_dec = error.decode(self.enconding)
 
         if "PermissionDenied" in err_dec:
@@ -601,19 +869,13 @@ class NetworkAdapters:
         if (pref_dns == "0.0.0.0" or alt_dns == "0.0.0.0"):
             raise ValueError("Invalid configuration")
 
-        p = subprocess.Popen(["powershell.exe", "Set-DnsClientServerAddress",
-                              "-InterfaceIndex",
-                              str(index),
-                              "-ServerAddresses",
-                              ",".join(list(
-                                  filter(None,
-                                         [str(pref_dns), str(alt_dns)])))],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        _, error = p.communicate()
+        error = self._run(["powershell.exe", "Set-DnsClientServerAddress",
+                           "-InterfaceIndex",
+                           str(index),
+                           "-ServerAddresses",
+                           ",".join(list(
+                               filter(None,
+                                      [str(pref_dns), str(alt_dns)])))]).stderr
         err_dec = error.decode(self.enconding)
 
         if "PermissionDenied" in err_dec:
@@ -640,25 +902,21 @@ class NetworkAdapters:
             KeyError: There is no network adapter for the given index.
             NotImplementedError: Unidentified error.
         """
-        if not ip or not mask or ip == "0.0.0.0" or mask == "0.0.0.0":
+        prefix_length = ipv4.prefix_length(mask)
+        if (not ip or ip == "0.0.0.0" or not prefix_length
+                or not ipv4.is_valid(ip)):
             raise ValueError("Invalid configuration")
 
-        p = subprocess.Popen(["powershell.exe", "New-NetIPAddress",
-                              "-InterfaceIndex",
-                              str(index),
-                              "-IPAddress",
-                              str(ip),
-                              "-PrefixLength",
-                              str(self.subnet_mask_2_prefix_length(mask)),
-                              "-PolicyStore",
-                              "ActiveStore"
-                              ],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        _, error = p.communicate()
+        error = self._run(["powershell.exe", "New-NetIPAddress",
+                           "-InterfaceIndex",
+                           str(index),
+                           "-IPAddress",
+                           str(ip),
+                           "-PrefixLength",
+                           str(prefix_length),
+                           "-PolicyStore",
+                           "ActiveStore"
+                           ]).stderr
         err_dec = error.decode(self.enconding)
 
         if "PermissionDenied" in err_dec:
@@ -692,17 +950,11 @@ class NetworkAdapters:
             pass
 
         # Set DHCP
-        p = subprocess.Popen(["powershell.exe", "Set-NetIPInterface",
-                              "-InterfaceIndex",
-                              str(index),
-                              "-DHCP",
-                              "Enabled"],
-                             stdout=subprocess.PIPE,
-                             stderr=subprocess.PIPE,
-                             stdin=subprocess.DEVNULL,
-                             creationflags=subprocess.CREATE_NO_WINDOW)
-
-        _, error = p.communicate()
+        error = self._run(["powershell.exe", "Set-NetIPInterface",
+                           "-InterfaceIndex",
+                           str(index),
+                           "-DHCP",
+                           "Enabled"]).stderr
         err_dec = error.decode(self.enconding)
 
         if "PermissionDenied" in err_dec:
@@ -715,7 +967,8 @@ class NetworkAdapters:
 
         return
 
-    def subnet_mask_2_prefix_length(self, mask: str) -> int:
+    @staticmethod
+    def subnet_mask_2_prefix_length(mask: str) -> int:
         """Calculate the size of the local subnet corresponding
         to a subnet mask.
 
@@ -723,23 +976,19 @@ class NetworkAdapters:
             mask (str): Subnet mask (255.255.255.255).
 
         Raises:
-            ValueError: Invalid subnet mask octet(s). Must be between 0
-                and 255.
+            ValueError: Invalid subnet mask.
 
         Returns:
             int: The number of bits corresponding to the subnet mask.
         """
-        octets = list(map(int, mask.split(".")))
-
-        if any(octet < 0 or octet > 255 for octet in octets):
-            raise ValueError(
-                "Invalid subnet mask octet(s). Must be between 0 and 255.")
+        bits = ipv4.prefix_length(mask)
+        if bits is None:
+            raise ValueError("Invalid subnet mask.")
 
-        bits_count = sum(bin(octet).count('1') for octet in octets)
+        return bits
 
-        return int(bits_count)
-
-    def validate_ipv4(self, ip: str) -> bool:
+    @staticmethod
+    def validate_ipv4(ip: str) -> bool:
         """Check if the IP is in IPv4 format.
 
         Args:
@@ -748,16 +997,10 @@ class NetworkAdapters:
         Returns:
             bool: True if it has the correct format, False otherwise.
         """
-        pattern = r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$'
-        match = re.match(pattern, ip)
-        if match:
-            for group in match.groups():
-                if int(group) > 255:
-                    return False
-            return True
-        return False
-
-    def validate_subnet_mask(self, mask: str) -> bool:
+        return ipv4.is_valid(ip)
+
+    @staticmethod
+    def validate_subnet_mask(mask: str) -> bool:
         """Check if the subnet mask is in the correct format (255.255.255.255).
 
         Args:
@@ -766,21 +1009,9 @@ class NetworkAdapters:
         Returns:
             bool: True if it has the correct format, False otherwise.
         """
-        octects = mask.split('.')
-        if len(octects) != 4:
-            return False
-
-        for octect in octects:
-            try:
-                value = int(octect)
-                if value < 0 or value > 255:
-                    return False
-            except ValueError:
-                return False
-
-        binary = ''.join(format(int(octet), '08b') for octet in octects)
+        return ipv4.is_valid_mask(mask)
 
-        if '0' in binary.rstrip('0'):
-            return False
 
-        return True
+# Backend used by the application, selected by platform
+NetworkBackend = (LinuxNetworkAdapters if sys.platform.startswith("linux")
+                  else NetworkAdapters)
@@ -1,38 +1,76 @@
 """Use Nmap to get information about active hosts"""
 
-from time import sleep
-import ipaddress
-import subprocess
-import threading
+from concurrent.futures import CancelledError
 import tkinter as tk
 import traceback
 import webbrowser
 import ttkbootstrap as ttk
 from ttkbootstrap.dialogs.dialogs import MessageDialog, Messagebox
 
+from address_index import AddressIndex
+import execution
+from execution import CancelToken
+import ipv4
 from network_adapters import NetworkAdapters
+from powershell import ProcessRunner
+from tk_dispatch import get_dispatcher
 
 
 APPNAME = "Sinamawin"
+NMAP_TIMEOUT = 3600  # Seconds after which a scan is killed
+VERSION_TIMEOUT = 30  # Seconds to wait for the Nmap version
 
 
-def get_nmap_version() -> str:
+def format_services(servs: dict) -> str:
+    """Format the services of the hosts as lines of the output table.
+
+    Args:
+        servs (dict): Services by IP address (the "tcp" or "udp" value
+            returned by nmap()).
+
+    Returns:
+        str: One line for each service.
+    """
+    lines = []
+    for ip, ip_data in servs.items():
+        mac = ip_data["mac"]
+        device = ip_data["device"]
+        for serv_data in ip_data["services"]:
+            port = serv_data["port"]
+            state = serv_data["state"]
+            service = serv_data["service"]
+
+            line = ip[:19].ljust(21)
+            line += port[:12].ljust(14)
+            line += state[:9].ljust(11)
+            if len(service) > 15:
+                service = service[:-3] + "..."
+            line += service[:15].ljust(17)
+            line += mac.ljust(22) + device
+            lines.append(line + "\n")
+
+    return "".join(lines)
+
+
+def get_nmap_version(runner=None) -> str:
     """Get the namp version.
 
+    Args:
+        runner (optional): Object with a run(args) method returning a
+            CommandResult. Defaults to None (new ProcessRunner with a
+            VERSION_TIMEOUT timeout).
+
+    Raises:
+        TimeoutError: Nmap did not answer in time.
+
     Returns:
         str: Nmap version.
     """
+    runner = runner if runner else ProcessRunner(timeout=VERSION_TIMEOUT)
 
     version = ""
-    p = subprocess.Popen(["powershell.exe", "nmap", "--version"],
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.PIPE,
-                         stdin=subprocess.DEVNULL,
-                         creationflags=subprocess.CREATE_NO_WINDOW)
-
-    na = NetworkAdapters()
-    output, _ = p.communicate()
-    out_dec = output.decode(na.enconding)
+    output = runner.run(["powershell.exe", "nmap", "--version"]).stdout
+    out_dec = output.decode(NetworkAdapters(runner=runner).enconding)
 
     if out_dec:
         version = out_dec.split(" ")[2]
@@ -40,8 +78,14 @@ def get_nmap_version() -> str:
     return version
 
 
-def nmap_widget() -> None:
-    """Create the Nmap module popup window."""
+def nmap_widget(adapters: dict = None) -> None:
+    """Create the Nmap module popup window. When an IP address is entered,
+    the network adapter connected to its subnet is shown.
+
+    Args:
+        adapters (dict, optional): AdapterInfo records by network adapter
+            index (result of get_info()). Defaults to None (none shown).
+    """
     try:
         nmap_ver = get_nmap_version()
         header = ("Internet Address     Port          State"
@@ -65,7 +109,7 @@ def nmap_widget() -> None:
 
             return
 
-        na = NetworkAdapters()
+        addr_index = AddressIndex(adapters or {})
         style = ttk.Style()
         style.configure("Normal.TLabel", foreground="black",
                         font=("Consolas", 9))
@@ -73,15 +117,15 @@ def nmap_widget() -> None:
                         font=("Consolas", 9, "bold"))
 
         def on_change_ip_netmask(*_):
-            ip = ip_var.get()
+            ip = ipv4.pack(ip_var.get())
             port = port_var.get()
-            netmask = cb_netmask.get()
-            if na.validate_ipv4(ip):
-                net = ipaddress.ip_network(f"{ip}{netmask}", strict=False)
-                first_ip = str(net.network_address)
-                last_ip = str(net.broadcast_address)
+            bits = int(cb_netmask.get().replace("/", ""))
+            if ip is not None:
+                first, last = ipv4.network(ip, bits)
+                first_ip = ipv4.unpack(first)
+                last_ip = ipv4.unpack(last)
 
-                if int(netmask.replace("/", "")) >= 24:
+                if bits >= 24:
                     last_segment = last_ip.split(".")[3]
                     if first_ip == last_ip:
                         d_ip_range.configure(text=f"{first_ip}",
@@ -93,12 +137,17 @@ def nmap_widget() -> None:
                     d_ip_range.configure(text=f"{first_ip} to\n{last_ip}",
                                          style="Normal.TLabel")
 
+                index = addr_index.find_subnet(ip)
+                d_iface.configure(text=adapters[index].name
+                                  if index is not None else "-")
+
                 if port:
                     b_run.configure(state="enabled")
                 else:
                     b_run.configure(state="disabled")
             else:
                 d_ip_range.configure(text="Invalid IP", style="Wrong.TLabel")
+                d_iface.configure(text="-")
                 b_run.configure(state="disabled")
 
         popup = ttk.Toplevel(
@@ -145,6 +194,13 @@ def nmap_widget() -> None:
         l_ip_range.grid(row=2, column=0, padx=(15, 5), pady=5)
         d_ip_range.grid(row=2, column=1, padx=5, pady=5)
 
+        # -- Interface --
+        l_iface = ttk.Label(popup, text="Interface:", justify="center")
+        d_iface = ttk.Label(popup, text="-", style="Normal.TLabel",
+                            justify="center")
+        l_iface.grid(row=4, column=0, padx=(15, 5), pady=5)
+        d_iface.grid(row=4, column=1, padx=5, pady=5)
+
         # -- Port --
         l_port = ttk.Label(popup, text="Ports:")
         port_var = tk.StringVar()
@@ -184,12 +240,41 @@ def nmap_widget() -> None:
         cb_prot.bind("<<ComboboxSelected>>", on_change_protocol)
 
         # -- Run --
+        scan = {"cancel": CancelToken()}  # Cancellation of the last scan
+
+        def show_output(tcp_out: list, udp_out: list) -> None:
+            """Show the result of a scan and enable the inputs again (in
+            the Tk thread).
+
+            Args:
+                tcp_out (list): (text, tag) to insert in the TCP tab.
+                udp_out (list): (text, tag) to insert in the UDP tab.
+            """
+            if not popup.winfo_exists():
+                return
+
+            for t_out, out in ((t_tcp, tcp_out), (t_udp, udp_out)):
+                t_out.configure(state="normal")
+                t_out.delete(1.0, tk.END)
+                for text, tag in out:
+                    t_out.insert(tk.END, text, tag)
+                t_out.configure(state="disabled")
+
+            d_ip_addr.configure(state="enabled")
+            cb_netmask.configure(state="readonly")
+            cb_prot.configure(state="readonly")
+            d_port.configure(state="enabled")
+            b_run.configure(state="enabled")
+            b_cancel.configure(state="disabled")
+
         def run_btn():
             d_ip_addr.configure(state="readonly")
             cb_netmask.configure(state="disabled")
             cb_prot.configure(state="disabled")
             d_port.configure(state="readonly")
             b_run.configure(state="disabled")
+            b_cancel.configure(state="enabled")
+            cancel = scan["cancel"] = CancelToken()
 
             t_tcp.configure(state="normal")
             t_tcp.delete(1.0, tk.END)
@@ -201,12 +286,16 @@ def nmap_widget() -> None:
             t_udp.insert(tk.END, "Running... (it may take several minutes)")
             t_udp.configure(state="disabled")
 
+            # The widgets are only read and updated in the Tk thread
+            ip_mask = f"{ip_var.get()}{cb_netmask.get()}"
+            prot_sel = cb_prot.get()
+            ports = port_var.get()
+            dispatcher = get_dispatcher(popup)
+
             def run_nmap():
                 try:
-                    sleep(5)  # To avoid errors
-                    ip_mask = f"{ip_var.get()}{cb_netmask.get()}"
-                    prot_sel = cb_prot.get()
-                    ports = port_var.get()
+                    cancel.wait(5)  # To avoid errors
+                    cancel.check()
                     tcp_op = False
                     udp_op = False
 
@@ -216,91 +305,40 @@ def nmap_widget() -> None:
                     if "UDP" in prot_sel:
                         udp_op = True
 
-                    ret = nmap(ip=ip_mask, ports=ports, tcp=tcp_op, udp=udp_op)
-
-                    tcp_data = ret["tcp"]
-                    udp_data = ret["udp"]
-
-                    t_tcp.configure(state="normal")
-                    t_tcp.delete(1.0, tk.END)
-                    t_udp.configure(state="normal")
-                    t_udp.delete(1.0, tk.END)
-
-                    if tcp_data:
-                        t_tcp.insert(tk.END, header, "bold")
-
-                        for ip, ip_data in tcp_data.items():
-                            mac = ip_data["mac"]
-                            device = ip_data["device"]
-                            for serv_data in ip_data["services"]:
-                                port = serv_data["port"]
-                                state = serv_data["state"]
-                                service = serv_data["service"]
-
-                                line = ip[:19].ljust(21)
-                                line += port[:12].ljust(14)
-                                line += state[:9].ljust(11)
-                                if len(service) > 15:
-                                    service = service[:-3] + "..."
-                                line += service[:15].ljust(17)
-                                line += mac.ljust(22) + device
-                                line += "\n"
-                                t_tcp.insert(tk.END, line)
-                    else:
-                        t_tcp.insert(tk.END, "No data available.")
-
-                    if udp_data:
-                        t_udp.insert(tk.END, header, "bold")
-
-                        for ip, ip_data in udp_data.items():
-                            mac = ip_data["mac"]
-                            device = ip_data["device"]
-                            for serv_data in ip_data["services"]:
-                                port = serv_data["port"]
-                                state = serv_data["state"]
-                                service = serv_data["service"]
-
-                                line = ip[:19].ljust(21)
-                                line += port[:12].ljust(14)
-                                line += state[:9].ljust(11)
-                                if len(service) > 15:
-                                    service = service[:-3] + "..."
-                                line += service[:15].ljust(17)
-                                line += mac.ljust(22) + device
-                                line += "\n"
-                                t_udp.insert(tk.END, line)
-                    else:
-                        t_udp.insert(tk.END, "No data available.")
+                    ret = nmap(ip=ip_mask, ports=ports, tcp=tcp_op, udp=udp_op,
+                               runner=ProcessRunner(timeout=NMAP_TIMEOUT,
+                                                    cancel=cancel))
+
+                    tcp_out = [("No data available.", "")]
+                    udp_out = [("No data available.", "")]
+                    if ret["tcp"]:
+                        tcp_out = [(header, "bold"),
+                                   (format_services(ret["tcp"]), "")]
+                    if ret["udp"]:
+                        udp_out = [(header, "bold"),
+                                   (format_services(ret["udp"]), "")]
+
+                    dispatcher.post(show_output, tcp_out, udp_out)
 
                 except (KeyError, ValueError, NotImplementedError) as err:
-                    t_tcp.configure(state="normal")
-                    t_tcp.delete(1.0, tk.END)
-                    t_udp.configure(state="normal")
-                    t_udp.delete(1.0, tk.END)
+                    out = [(f"Error: {err}", "error")]
+                    dispatcher.post(show_output, out, out)
 
-                    t_tcp.insert(tk.END, f"Error: {err}", "error")
-                    t_udp.insert(tk.END, f"Error: {err}", "error")
+                except CancelledError:
+                    out = [("Scan cancelled.", "")]
+                    dispatcher.post(show_output, out, out)
+
+                except TimeoutError:
+                    out = [("Error: The scan did not finish in"
+                            f" {NMAP_TIMEOUT // 60} minutes.", "error")]
+                    dispatcher.post(show_output, out, out)
 
                 except:  # pylint: disable=bare-except # noqa
                     traceback.print_exc()
-                    t_tcp.configure(state="normal")
-                    t_tcp.delete(1.0, tk.END)
-                    t_udp.configure(state="normal")
-                    t_udp.delete(1.0, tk.END)
-
-                    t_tcp.insert(tk.END, "Error: Failed to run Nmap.", "error")
-                    t_udp.insert(tk.END, "Error: Failed to run Nmap.", "error")
-                finally:
-                    d_ip_addr.configure(state="enabled")
-                    cb_netmask.configure(state="readonly")
-                    cb_prot.configure(state="readonly")
-                    d_port.configure(state="enabled")
-                    b_run.configure(state="enabled")
-                    t_tcp.configure(state="disabled")
-                    t_udp.configure(state="disabled")
+                    out = [("Error: Failed to run Nmap.", "error")]
+                    dispatcher.post(show_output, out, out)
 
-            th_run = threading.Thread(target=run_nmap)
-            th_run.start()
+            execution.start_thread(run_nmap, name="nmap")
 
         b_run = ttk.Button(popup,
                            text="Run", width=10,
@@ -308,9 +346,21 @@ def nmap_widget() -> None:
                            state="disabled")
         b_run.grid(row=3, column=3, padx=(5, 15), pady=5)
 
+        # -- Cancel --
+        def on_destroy(event):
+            if event.widget is popup:
+                scan["cancel"].cancel()
+
+        b_cancel = ttk.Button(popup,
+                              text="Cancel", width=10,
+                              command=lambda: scan["cancel"].cancel(),
+                              state="disabled")
+        b_cancel.grid(row=4, column=3, padx=(5, 15), pady=5)
+        popup.bind("<Destroy>", on_destroy, add="+")
+
         # -- Notebook --
         nb_output = ttk.Notebook(popup, bootstyle="light")
-        nb_output.grid(row=4, column=0, columnspan=4, padx=15, pady=(10, 15))
+        nb_output.grid(row=5, column=0, columnspan=4, padx=15, pady=(10, 15))
 
         tcp_frame = ttk.Frame(nb_output)
         nb_output.add(tcp_frame, text="TCP")
@@ -358,7 +408,8 @@ def nmap_widget() -> None:
             width=100)
 
 
-def nmap(ip: str, ports: str, tcp: bool = True, udp: bool = False) -> dict:
+def nmap(ip: str, ports: str, tcp: bool = True, udp: bool = False,
+         runner=None) -> dict:
     """Run Nmap and return a dictionary separating TCP and UDP.
 
     Args:
@@ -366,30 +417,32 @@ def nmap(ip: str, ports: str, tcp: bool = True, udp: bool = False) -> dict:
         ports (str): Ports to scan.
         tcp (bool, optional): Scan TCP ports. Defaults to True.
         udp (bool, optional): Scan UDP ports. Defaults to False.
+        runner (optional): Object with a run(args) method returning a
+            CommandResult. Defaults to None (new ProcessRunner with a
+            NMAP_TIMEOUT timeout).
 
     Raises:
+        CancelledError: The runner has been cancelled.
         KeyError: Ports are not valid.
         NotImplementedError: Nmap error.
         ValueError: No hosts up.
         ValueError: No information.
+        TimeoutError: The scan did not finish in time.
 
     Returns:
         dict: Dictionary with port information separated by TCP and UDP.
     """
-    protocols = " -sS" if tcp else ""
-    protocols += " -sU" if udp else ""
-
-    p = subprocess.Popen(["powershell.exe", "nmap",
-                          "-p", str(ports),
-                          protocols,
-                          str(ip)],
-                         stdout=subprocess.PIPE,
-                         stderr=subprocess.PIPE,
-                         stdin=subprocess.DEVNULL,
-                         creationflags=subprocess.CREATE_NO_WINDOW)
-
-    na = NetworkAdapters()
-    output, error = p.communicate()
+    runner = runner if runner else ProcessRunner(timeout=NMAP_TIMEOUT)
+
+    protocols = ["-sS"] if tcp else []
+    protocols += ["-sU"] if udp else []
+
+    output, error, _ = runner.run(["powershell.exe", "nmap",
+                                   "-p", str(ports),
+                                   *protocols,
+                                   str(ip)])
+
+    na = NetworkAdapters(runner=runner)
     out_dec = output.decode(na.enconding)
     error_dec = error.decode(na.enconding)
 
@@ -401,7 +454,7 @@ def nmap(ip: str, ports: str, tcp: bool = True, udp: bool = False) -> dict:
         err = error_dec.split("\r\n", maxsplit=1)[0]
         raise NotImplementedError(err)
 
-    if "0 hosts up" in out_dec:
+    if "(0 hosts up)" in out_dec:
         raise ValueError("0 hosts up")
 
     if not out_dec:
@@ -440,6 +493,7 @@ def nmap(ip: str, ports: str, tcp: bool = True, udp: bool = False) -> dict:
 
                 if ip in udp_servs:
                     udp_servs[ip]["mac"] = mac_info[2].replace(":", "-")
+                    device = udp_servs[ip]["device"]
                     udp_servs[ip]["device"] = " ".join(mac_info[3:])[1:-1] + (
                         f" ({device})" if device else "")
 
@@ -0,0 +1,498 @@
+"""Run PowerShell commands through a pool of long-lived sessions"""
+
+import atexit
+import base64
+from concurrent.futures import CancelledError
+import itertools
+import queue
+import subprocess
+import threading
+from time import monotonic
+from typing import Callable
+
+import execution
+from execution import CREATE_NO_WINDOW, CancelToken, CommandResult
+
+POWERSHELL = "powershell.exe"
+POOL_SIZE = 2  # Maximum number of warm sessions
+TIMEOUT = 60  # Seconds to wait for the result of a command in a session
+HEALTH_INTERVAL = 30  # Idle seconds after which a session is pinged
+MAX_FAILURES = 3  # Consecutive session failures before spawning per call
+ACQUIRE_WAIT = 1  # Seconds between checks while waiting for a busy session
+
+# Loop executed by every session. Each request is a line "<id> <script>"
+# where the script is base64 (UTF-8). Each reply is a line
+# "<id> <returncode> <stdout> <stderr>" where stdout and stderr are base64
+# using the console output encoding, so that the bytes are the same as
+# those of a new powershell.exe process. Each script runs in a child scope
+# with the default error preference, so that the variables it sets (e.g.,
+# $ErrorActionPreference = 'SilentlyContinue') do not reach the next ones.
+HOST_SCRIPT = r"""
+$ProgressPreference = 'SilentlyContinue'
+$enc = [Console]::OutputEncoding
+while ($true) {
+    $line = [Console]::In.ReadLine()
+    if ($null -eq $line) { break }
+    $id, $b64 = $line.Split(' ', 2)
+    $script = [Text.Encoding]::UTF8.GetString(
+        [Convert]::FromBase64String($b64))
+    $out = ''
+    $err = ''
+    $code = 0
+    $ErrorActionPreference = 'Continue'
+    try {
+        $res = & ([scriptblock]::Create($script)) 2>&1
+        $out = $res | Where-Object {
+            $_ -isnot [Management.Automation.ErrorRecord] } | Out-String
+        $err = $res | Where-Object {
+            $_ -is [Management.Automation.ErrorRecord] } | Out-String
+    } catch {
+        $err = $_ | Out-String
+    }
+    if ($err) { $code = 1 }
+    [Console]::Out.WriteLine($id + ' ' + $code + ' ' +
+        [Convert]::ToBase64String($enc.GetBytes([string]$out)) + ' ' +
+        [Convert]::ToBase64String($enc.GetBytes([string]$err)))
+    [Console]::Out.Flush()
+}
+"""
+
+
+def launch_powershell() -> subprocess.Popen:
+    """Start a hidden PowerShell process running the session loop.
+
+    Returns:
+        subprocess.Popen: PowerShell process waiting for commands on stdin.
+    """
+    encoded = base64.b64encode(HOST_SCRIPT.encode("utf-16-le")).decode()
+
+    return subprocess.Popen([POWERSHELL, "-NoLogo", "-NoProfile",
+                             "-NonInteractive", "-EncodedCommand", encoded],
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.DEVNULL,
+                            stdin=subprocess.PIPE,
+                            creationflags=CREATE_NO_WINDOW)
+
+
+class ProcessRunner:
+    """Command runner that starts a new process for each command. Used for
+    long-running programs (e.g., nmap) that must not hold a session."""
+
+    def __init__(self, timeout: float = None,
+                 cancel: CancelToken = None) -> None:
+        self.timeout = timeout  # Default seconds to wait (None: no limit)
+        self.cancel = cancel  # Cancellation of the commands (None: none)
+
+    def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Run a command in a new process.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the process.
+                Defaults to None (runner timeout).
+
+        Raises:
+            CancelledError: The runner has been cancelled.
+            TimeoutError: The process did not finish in time.
+
+        Returns:
+            CommandResult: Output, error and exit code of the process.
+        """
+        return execution.run(args,
+                             timeout=self.timeout if timeout is None
+                             else timeout,
+                             cancel=self.cancel)
+
+    def stream(self, args: list, timeout: float = None):
+        """Run a command in a new process and yield its output lines.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the process.
+                Defaults to None (runner timeout).
+
+        Raises:
+            CancelledError: The runner has been cancelled.
+            TimeoutError: The process did not finish in time.
+
+        Yields:
+            bytes: Each line of the output.
+        """
+        yield from execution.stream(args,
+                                    timeout=self.timeout if timeout is None
+                                    else timeout,
+                                    cancel=self.cancel)
+
+
+class PowerShellSession:
+    """Long-lived PowerShell process that runs commands sent over stdin"""
+
+    def __init__(self, launcher: Callable = launch_powershell) -> None:
+        self._launcher = launcher
+        self._proc = None
+        self._lines = None  # Lines read from stdout (None at EOF)
+        self._ids = itertools.count(1)
+        self.last_used = monotonic()
+
+    def _read_lines(self, stream, lines: queue.Queue) -> None:
+        """Move the lines written by the session to the queue.
+
+        Args:
+            stream: Session stdout.
+            lines (queue.Queue): Queue receiving the lines.
+        """
+        try:
+            for line in iter(stream.readline, b""):
+                lines.put(line)
+        except (OSError, ValueError):
+            pass
+        lines.put(None)
+
+    def close(self) -> None:
+        """Terminate the session."""
+        if self._proc is None:
+            return
+
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+
+        try:
+            self._proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            # A hung cmdlet may have started other processes
+            execution.kill_tree(self._proc.pid)
+            self._proc.kill()
+            self._proc.wait()
+
+        self._proc = None
+
+    def execute(self, script: str, timeout: float = TIMEOUT) -> CommandResult:
+        """Run a script in the session and wait for its framed result.
+
+        Args:
+            script (str): PowerShell script.
+            timeout (float, optional): Seconds to wait for the result.
+                Defaults to TIMEOUT.
+
+        Raises:
+            ConnectionError: The session is not running or has terminated.
+            TimeoutError: No result in time. The session is terminated.
+
+        Returns:
+            CommandResult: Output, error and exit code of the script.
+        """
+        proc = self._proc  # close() may be called from another thread
+        lines = self._lines
+        if proc is None or proc.poll() is not None:
+            raise ConnectionError("The PowerShell session is not running")
+
+        req_id = str(next(self._ids))
+        request = base64.b64encode(script.encode("utf-8"))
+
+        try:
+            proc.stdin.write(req_id.encode() + b" " + request + b"\n")
+            proc.stdin.flush()
+        except (OSError, ValueError) as err:
+            raise ConnectionError("The PowerShell session has terminated") \
+                from err
+
+        deadline = None if timeout is None else monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else deadline - monotonic()
+            try:
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                line = lines.get(timeout=remaining)
+            except queue.Empty as err:
+                self.close()
+                raise TimeoutError(
+                    "The PowerShell session did not respond in time") from err
+
+            if line is None:
+                self.close()
+                raise ConnectionError("The PowerShell session has terminated")
+
+            frame = line.rstrip(b"\r\n").split(b" ")
+            # Anything else is noise written outside the session loop
+            if len(frame) == 4 and frame[0].decode(errors="ignore") == req_id:
+                break
+
+        self.last_used = monotonic()
+
+        return CommandResult(base64.b64decode(frame[2]),
+                             base64.b64decode(frame[3]),
+                             int(frame[1]))
+
+    def is_alive(self) -> bool:
+        """Check if the session process is running.
+
+        Returns:
+            bool: True if it is running.
+        """
+        return self._proc is not None and self._proc.poll() is None
+
+    def kill(self) -> None:
+        """Kill the session and the processes it started, without waiting
+        for it. The command running gets a ConnectionError, and the
+        session is restarted the next time it is acquired."""
+        proc = self._proc
+        if proc is not None and proc.poll() is None:
+            execution.kill_tree(proc.pid)
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+    def ping(self, timeout: float = 5) -> bool:
+        """Check that the session answers a trivial command.
+
+        Args:
+            timeout (float, optional): Seconds to wait for the answer.
+                Defaults to 5.
+
+        Returns:
+            bool: True if the session is healthy.
+        """
+        try:
+            return self.execute("$null", timeout=timeout).returncode == 0
+        except (ConnectionError, TimeoutError, ValueError):
+            return False
+
+    def restart(self) -> None:
+        """Terminate the session (if running) and start a new one."""
+        self.close()
+        self.start()
+
+    def start(self) -> None:
+        """Start the session process.
+
+        Raises:
+            OSError: The process could not be started.
+        """
+        self._proc = self._launcher()
+        self._lines = queue.Queue()
+        threading.Thread(target=self._read_lines,
+                         args=(self._proc.stdout, self._lines),
+                         daemon=True).start()
+        self.last_used = monotonic()
+
+
+class PowerShellPool:
+    """Pool of warm PowerShell sessions with fallback to a process per call"""
+
+    def __init__(self, size: int = POOL_SIZE,
+                 launcher: Callable = launch_powershell,
+                 timeout: float = TIMEOUT) -> None:
+        self.size = size
+        self.timeout = timeout
+        self.fallback = False  # True when sessions are no longer used
+        self._launcher = launcher
+        self._idle = queue.LifoQueue()  # Sessions waiting for commands
+        self._sessions = []  # All the sessions created
+        self._failures = 0  # Consecutive session failures
+        self._lock = threading.Lock()
+
+    def _acquire(self) -> PowerShellSession:
+        """Get an idle session, starting a new one if the pool is not full.
+
+        Raises:
+            OSError: The session could not be started.
+
+        Returns:
+            PowerShellSession: Session reserved for the caller.
+        """
+        session = None
+        while session is None:
+            if self.fallback:
+                raise OSError("The PowerShell sessions are no longer used")
+
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    if len(self._sessions) < self.size:
+                        session = PowerShellSession(self._launcher)
+                        self._sessions.append(session)
+
+            if session is None:
+                # Check again from time to time: the pool may have been
+                # closed or switched to fallback while waiting
+                try:
+                    session = self._idle.get(timeout=ACQUIRE_WAIT)
+                except queue.Empty:
+                    pass
+
+        try:
+            if not session.is_alive():
+                session.restart()
+            elif monotonic() - session.last_used > HEALTH_INTERVAL:
+                if not session.ping():
+                    session.restart()
+        except OSError:
+            self._release(session)
+            raise
+
+        return session
+
+    def check_health(self) -> int:
+        """Ping the idle sessions and restart those that do not answer.
+
+        Returns:
+            int: Number of restarted sessions.
+        """
+        restarted = 0
+        sessions = []
+        while True:
+            try:
+                sessions.append(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+        for session in sessions:
+            if not session.ping():
+                try:
+                    session.restart()
+                    restarted += 1
+                except OSError:
+                    pass
+            self._release(session)
+
+        return restarted
+
+    def close(self) -> None:
+        """Terminate all the sessions. Those running a command are
+        terminated when they are released."""
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+            # The queue is kept: callers of _acquire() may be waiting on it
+            while True:
+                try:
+                    self._idle.get_nowait()
+                except queue.Empty:
+                    break
+
+        for session in sessions:
+            session.close()
+
+    def _release(self, session: PowerShellSession) -> None:
+        """Return a session to the pool, or terminate it if the pool has
+        been closed since it was acquired.
+
+        Args:
+            session (PowerShellSession): Session acquired.
+        """
+        with self._lock:
+            owned = session in self._sessions
+            if owned:
+                self._idle.put(session)
+        if not owned:
+            session.close()
+
+    def run(self, args: list, timeout: float = None,
+            cancel: CancelToken = None) -> CommandResult:
+        """Run a command in a warm session. Commands that are not
+        PowerShell, or any command once the sessions keep failing,
+        are run in a new process.
+
+        Args:
+            args (list): Program and arguments as for subprocess.Popen.
+            timeout (float, optional): Seconds to wait for the result.
+                Defaults to None (pool timeout).
+            cancel (CancelToken, optional): Cancellation of the command.
+                Cancelling kills the session running it. Defaults to None
+                (not cancellable).
+
+        Raises:
+            CancelledError: The command has been cancelled.
+            TimeoutError: No result in time.
+
+        Returns:
+            CommandResult: Output, error and exit code of the command.
+        """
+        timeout = self.timeout if timeout is None else timeout
+
+        if self.fallback or not args or args[0] != POWERSHELL:
+            return execution.run(args, timeout=timeout, cancel=cancel)
+
+        # powershell.exe joins its arguments into a single command
+        script = " ".join(str(arg) for arg in args[1:])
+
+        for _ in range(2):  # Retry once on a restarted session
+            if cancel is not None:
+                cancel.check()
+
+            try:
+                session = self._acquire()
+            except OSError:
+                break
+
+            killed = threading.Event()
+
+            def on_cancel(session=session, killed=killed) -> None:
+                killed.set()
+                session.kill()
+
+            unsubscribe = (cancel.subscribe(on_cancel) if cancel
+                           else None)
+            try:
+                result = session.execute(script, timeout=timeout)
+                with self._lock:
+                    self._failures = 0
+                return result
+            except ConnectionError as err:
+                if killed.is_set():
+                    raise CancelledError(
+                        f"'{args[0]}' has been cancelled") from err
+            finally:
+                if unsubscribe is not None:
+                    unsubscribe()
+                self._release(session)
+
+        with self._lock:
+            self._failures += 1
+            if self._failures >= MAX_FAILURES:
+                self.fallback = True
+        if self.fallback:
+            self.close()
+
+        return execution.run(args, timeout=timeout, cancel=cancel)
+
+    def stream(self, args: list, timeout: float = None):
+        """Run a command in a new process and yield its output lines. The
+        sessions return the whole output at once, so they are not used.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the process.
+                Defaults to None (pool timeout).
+
+        Raises:
+            TimeoutError: The process did not finish in time.
+
+        Yields:
+            bytes: Each line of the output.
+        """
+        yield from execution.stream(args,
+                                    timeout=self.timeout if timeout is None
+                                    else timeout)
+
+
+_POOL = None  # Process-wide pool
+_POOL_LOCK = threading.Lock()
+
+
+def get_pool() -> PowerShellPool:
+    """Get the process-wide PowerShell pool, creating it on first use.
+
+    Returns:
+        PowerShellPool: Shared pool.
+    """
+    global _POOL  # pylint: disable=global-statement
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = PowerShellPool()
+            atexit.register(_POOL.close)
+
+    return _POOL
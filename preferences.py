@@ -5,8 +5,10 @@ import ttkbootstrap as ttk
 from ttkbootstrap.toast import ToastNotification
 from ttkbootstrap.dialogs.dialogs import MessageDialog, Messagebox
 
+from auto_refresh import DEFAULT_INTERVAL, MIN_INTERVAL
 
 APPNAME = "Sinamawin"
+MAX_INTERVAL = 3600  # Longest base interval of the auto-refresh (seconds)
 
 
 def get_preferences() -> dict:
@@ -14,7 +16,8 @@ def get_preferences() -> dict:
 
     Returns:
         dict: User preferences.
-            {"themename": "litera","skip_vers": []}
+            {"themename": "litera", "skip_vers": [], "auto_refresh": False,
+            "refresh_interval": 30}
     """
     with open(os.environ.get(f"{APPNAME}_PREFERENCES"), "r",
               encoding="utf-8") as fprefers:
@@ -56,6 +59,25 @@ def preferences_widget() -> None:
     l_theme.grid(row=0, column=0, padx=(15, 5), pady=15)
     cb_theme.grid(row=0, column=1, padx=(5, 15), pady=15)
 
+    # Auto-refresh
+    l_auto_refresh = ttk.Label(popup, text="Auto-refresh:")
+    auto_refresh = ttk.BooleanVar(
+        value=preferences.get("auto_refresh", False))
+    cb_auto_refresh = ttk.Checkbutton(popup, bootstyle="round-toggle",
+                                      variable=auto_refresh)
+
+    l_auto_refresh.grid(row=1, column=0, padx=(15, 5), pady=5, sticky="w")
+    cb_auto_refresh.grid(row=1, column=1, padx=(5, 15), pady=5, sticky="w")
+
+    # Base interval of the auto-refresh
+    l_interval = ttk.Label(popup, text="Refresh interval (s):")
+    sb_interval = ttk.Spinbox(popup, from_=MIN_INTERVAL, to=MAX_INTERVAL,
+                              increment=5, width=8)
+    sb_interval.set(preferences.get("refresh_interval", DEFAULT_INTERVAL))
+
+    l_interval.grid(row=2, column=0, padx=(15, 5), pady=5, sticky="w")
+    sb_interval.grid(row=2, column=1, padx=(5, 15), pady=5, sticky="w")
+
     # Save button
     def save_btn():
         msg = "Do you want to save the changes?"
@@ -73,6 +95,14 @@ def preferences_widget() -> None:
                 theme_sel = "litera (ligth)"
 
             preferences["themename"] = theme_sel.split(" ")[0]
+
+            try:
+                interval = int(sb_interval.get())
+            except ValueError:
+                interval = DEFAULT_INTERVAL
+            preferences["auto_refresh"] = auto_refresh.get()
+            preferences["refresh_interval"] = min(
+                max(interval, MIN_INTERVAL), MAX_INTERVAL)
             save_preferences(preferences)
 
             toast = ToastNotification(
@@ -94,7 +124,7 @@ def preferences_widget() -> None:
                         text="Save", width=8,
                         command=save_btn)
 
-    b_save.grid(row=1, column=1, padx=(5, 15), pady=(5, 15), sticky="e")
+    b_save.grid(row=3, column=1, padx=(5, 15), pady=(5, 15), sticky="e")
 
     # Mouse wheel behavior
     def popup_window_scroll(_):
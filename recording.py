@@ -0,0 +1,228 @@
+"""Record commands to fixture files and replay them
+
+A fixture is a JSON document with the enconding of the outputs and the
+commands run, in order:
+
+    {
+        "encoding": "cp850",
+        "commands": [
+            {"args": ["powershell.exe", "Get-NetAdapter", ...],
+             "stdout": "...", "stderr": "", "returncode": 0,
+             "elapsed": 0.45},
+            ...
+        ],
+        "timing": "measured"
+    }
+
+The durations ("elapsed") are "measured" when the commands are recorded
+in a real host, or "modeled" when they are estimated (e.g., the synthetic
+hosts of benchmarks/generate_fixtures.py).
+"""
+
+import io
+import json
+import threading
+from time import monotonic, sleep
+
+from powershell import CommandResult
+
+
+def load_fixture(path: str) -> dict:
+    """Read a fixture file.
+
+    Args:
+        path (str): Fixture file.
+
+    Returns:
+        dict: Fixture ("encoding", "commands" and "timing").
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def save_fixture(path: str, encoding: str, commands: list,
+                 timing: str = "measured") -> None:
+    """Write a fixture file.
+
+    Args:
+        path (str): Fixture file.
+        encoding (str): Enconding of the outputs.
+        commands (list): Recorded commands.
+        timing (str, optional): Origin of the durations, "measured" or
+            "modeled". Defaults to "measured".
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"encoding": encoding, "commands": commands,
+                   "timing": timing}, file, indent=4)
+        file.write("\n")
+
+
+class RecordingRunner:
+    """Command runner that runs the commands with another runner and keeps
+    their arguments, output, error, exit code and duration"""
+
+    def __init__(self, runner, encoding: str = "utf-8") -> None:
+        self.runner = runner  # Object with a run(args, timeout) method
+        self.encoding = encoding  # Enconding used to save the outputs
+        self.commands = []  # Recorded commands, in order
+        self._lock = threading.Lock()
+
+    def _record(self, args: list, result: CommandResult,
+                elapsed: float) -> None:
+        """Keep a command.
+
+        Args:
+            args (list): Program and arguments.
+            result (CommandResult): Output, error and exit code.
+            elapsed (float): Seconds the command took.
+        """
+        with self._lock:
+            self.commands.append({
+                "args": [str(arg) for arg in args],
+                "stdout": result.stdout.decode(self.encoding,
+                                               errors="replace"),
+                "stderr": result.stderr.decode(self.encoding,
+                                               errors="replace"),
+                "returncode": result.returncode,
+                "elapsed": round(elapsed, 6)
+            })
+
+    def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Run and record a command. Commands that raise an exception
+        (e.g., a timeout) are not recorded.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the result.
+                Defaults to None (runner timeout).
+
+        Returns:
+            CommandResult: Output, error and exit code of the command.
+        """
+        start = monotonic()
+        result = self.runner.run(args, timeout=timeout)
+        self._record(args, result, monotonic() - start)
+
+        return result
+
+    def save(self, path: str) -> None:
+        """Write the recorded commands to a fixture file.
+
+        Args:
+            path (str): Fixture file.
+        """
+        with self._lock:
+            save_fixture(path, self.encoding, list(self.commands))
+
+    def stream(self, args: list, timeout: float = None):
+        """Run a command, yield its output lines and record it once it has
+        been read completely. Runners without stream() are run at once.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the command.
+                Defaults to None (runner timeout).
+
+        Yields:
+            bytes: Each line of the output.
+        """
+        source = getattr(self.runner, "stream", None)
+        if source is None:
+            yield from io.BytesIO(self.run(args, timeout=timeout).stdout)
+            return
+
+        start = monotonic()
+        lines = []
+        for line in source(args, timeout=timeout):
+            lines.append(line)
+            yield line
+
+        self._record(args, CommandResult(b"".join(lines), b"", 0),
+                     monotonic() - start)
+
+
+class ReplayRunner:
+    """Command runner that serves the commands of a fixture (file or
+    loaded dictionary). A command recorded several times returns its
+    results in order, repeating the last one."""
+
+    def __init__(self, fixture, latency=0) -> None:
+        if isinstance(fixture, str):
+            fixture = load_fixture(fixture)
+
+        self.encoding = fixture["encoding"]
+        # Origin of the durations, "measured" or "modeled"
+        self.timing = fixture.get("timing", "measured")
+        # Seconds to wait before returning each result, or "recorded" to
+        # wait the recorded duration
+        self.latency = latency
+        self._results = {}  # Arguments -> [(result, elapsed), ...]
+        for cmd in fixture["commands"]:
+            self._results.setdefault(tuple(cmd["args"]), []).append((
+                CommandResult(cmd["stdout"].encode(self.encoding),
+                              cmd["stderr"].encode(self.encoding),
+                              cmd["returncode"]),
+                cmd["elapsed"]))
+
+        self._served = {}  # Arguments -> times served
+        self._lock = threading.Lock()
+        self.launches = 0  # Number of commands served
+        self.elapsed = 0  # Recorded seconds of the commands served
+
+    def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Return the recorded result of a command.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the result.
+                Defaults to None (no limit).
+
+        Raises:
+            KeyError: The command is not in the fixture.
+            TimeoutError: The injected latency exceeds the timeout.
+
+        Returns:
+            CommandResult: Recorded output, error and exit code.
+        """
+        key = tuple(str(arg) for arg in args)
+        results = self._results[key]
+
+        with self._lock:
+            served = self._served.get(key, 0)
+            self._served[key] = served + 1
+            result, elapsed = results[min(served, len(results) - 1)]
+            self.launches += 1
+            self.elapsed += elapsed
+
+        delay = elapsed if self.latency == "recorded" else self.latency
+        if timeout is not None and delay > timeout:
+            sleep(timeout)
+            raise TimeoutError(f"'{args[0]}' did not finish in time")
+        if delay:
+            sleep(delay)
+
+        return result
+
+    def reset(self) -> None:
+        """Serve the commands from the beginning and reset the counters."""
+        with self._lock:
+            self._served = {}
+            self.launches = 0
+            self.elapsed = 0
+
+    def stream(self, args: list, timeout: float = None):
+        """Yield the recorded output of a command line by line.
+
+        Args:
+            args (list): Program and arguments.
+            timeout (float, optional): Seconds to wait for the result.
+                Defaults to None (no limit).
+
+        Raises:
+            KeyError: The command is not in the fixture.
+            TimeoutError: The injected latency exceeds the timeout.
+
+        Yields:
+            bytes: Each line of the output.
+        """
+        yield from io.BytesIO(self.run(args, timeout=timeout).stdout)
@@ -4,7 +4,7 @@ import ctypes
 from datetime import datetime
 import os
 import re
-import threading
+import sys
 import tkinter as tk
 from tkinter import filedialog
 import traceback
@@ -16,12 +16,19 @@ from ttkbootstrap.dialogs.dialogs import MessageDialog
 from PIL import Image, ImageTk
 from packaging.version import Version
 
-from network_adapters import NetworkAdapters
-from net_adap_widget import NetAdapWidget
+from adapter_list import AdapterList
+from adapter_watcher import AdapterWatcher
+from auto_refresh import DEFAULT_INTERVAL, AutoRefresh
+from async_adapters import get_bridge
+from network_adapters import NetworkBackend
 from net_adap_profiles import NetAdapProfiles
+from snapshot_diff import SnapshotDiff, diff_snapshots
 from arp import arp_widget
+from bulk_apply import bulk_apply_widget
+import execution
 from nmap import nmap_widget
 import preferences as pref
+from tk_dispatch import get_dispatcher
 
 
 APPNAME = "Sinamawin"
@@ -31,9 +38,7 @@ ABOUT_LOGO = ""  # App logo in About window
 ADMIN = False  # Privileges
 MAIN_FRAME = None  # Frame containing the network adapters and the scrollbar
 NETADAPTERS = None  # Network adapters
-NETADAPTERS_FRAME = None  # Frame containing all the frames
-# of the network adapters
-NETFRAMES = []  # Frames of all network adapters
+ADAPTER_LIST = None  # Cards of the network adapters (only those in view)
 NOT_FOUND_TEXT = None  # Label when no adapters are found
 
 
@@ -195,7 +200,9 @@ def check_app_folder() -> None:
     if not os.path.exists(prefdata_path):
         preferences = {
             "themename": "litera",
-            "skip_vers": []
+            "skip_vers": [],
+            "auto_refresh": False,
+            "refresh_interval": DEFAULT_INTERVAL
         }
         pref.save_preferences(preferences)
 
@@ -269,30 +276,8 @@ def check_app_version() -> None:
         if last_version in preferences["skip_vers"]:
             return
 
-        # Show "New version" modal
-        title = f"{APPNAME} - New version"
-        last_ver_datetime = datetime.strptime(
-            last_version_date, "%Y-%m-%dT%H:%M:%SZ")
-        msg = (f"New version available: {last_version}"
-               f" ({last_ver_datetime.strftime('%b %Y')})")
-        dialog = MessageDialog(message=msg,
-                               title=title,
-                               buttons=["Download", "Skip", "Cancel"],
-                               padding=(30, 30),
-                               width=100,
-                               alert=True)
-
-        dialog.show()
-
-        if dialog.result == "Download":
-            webbrowser.open(url_last_ver)
-        elif dialog.result == "Skip":
-            try:
-                preferences["skip_vers"].append(last_version)
-
-                pref.save_preferences(preferences)
-            except:  # pylint: disable=bare-except # noqa
-                pass
+        get_dispatcher().post(show_new_version, last_version,
+                              last_version_date, url_last_ver)
 
     except:  # pylint: disable=bare-except # noqa
         pass
@@ -303,38 +288,10 @@ def create_net_wd(adapters: dict) -> None:
 
     Args:
         adapters (dict): Dictionary with the information
-            of the network adapters.
+            of the network adapters (AdapterInfo).
     """
     if adapters:
-        global NETADAPTERS_FRAME  # pylint: disable=W0602
-
-        for idx, (a_idx, a_info) in enumerate(adapters.items()):
-            bootstyle = "default"
-            if "bootstyle" in a_info.keys():
-                bootstyle = a_info["bootstyle"]
-
-            netframe = NetAdapWidget(
-                idx=a_idx,
-                name=a_info["name"],
-                desc=a_info["desc"],
-                status=a_info["status"],
-                mac=a_info["mac"],
-                ip=a_info["ip"],
-                mask=a_info["mask"],
-                gateway=a_info["gateway"],
-                prefix_origin=a_info["prefix_origin"],
-                suffix_origin=a_info["suffix_origin"],
-                pref_dns=a_info["pref_dns"],
-                alt_dns=a_info["alt_dns"],
-                disabled=not ADMIN
-            )
-            netframe.create(
-                frame=NETADAPTERS_FRAME,
-                row=idx,
-                bootstyle=bootstyle
-            )
-
-            NETFRAMES.append(netframe)
+        ADAPTER_LIST.update(adapters)
 
         return
     else:
@@ -377,7 +334,8 @@ def export_netadap2csv() -> None:
         headers = ["Index", "Name", "Description", "Status",
                    "MAC address", "IP address", "Subnet mask",
                    "Default gateway", "Prefix Origin", "Suffix Origin",
-                   "Preferred DNS Server", "Alternate DNS Server"]
+                   "Preferred DNS Server", "Alternate DNS Server",
+                   "Other IP addresses"]
 
         with open(dest_file, "w", encoding="utf-8") as fdest:
             fdest.write(f"{str(delimiter)}".join(headers) + "\n")
@@ -394,6 +352,8 @@ def export_netadap2csv() -> None:
                 info.append(data["suffix_origin"])
                 info.append(data["pref_dns"])
                 info.append(data["alt_dns"])
+                info.append(" ".join(f"{addr.ip}/{addr.prefix_length}"
+                                     for addr in data["addresses"][1:]))
 
                 fdest.write(f"{str(delimiter)}".join(info) + "\n")
 
@@ -464,45 +424,145 @@ def get_window_size() -> list:
 def refresh() -> None:
     """Refresh information and widgets for all network adapters."""
 
-    adapters = NetworkAdapters().get_info()
+    adapters = NetworkBackend().get_info()
 
-    # Check if a new adapter has been added
-    new_adapters = [index for index in adapters
-                    if index not in NETADAPTERS]
+    update_net_wd(adapters)
 
-    for index, _ in adapters.items():
-        if index in new_adapters:
-            adapters[index]["bootstyle"] = "primary"
-        else:
-            adapters[index]["bootstyle"] = "default"
+    toast = ToastNotification(
+        title=APPNAME,
+        message="Network adapters refreshed.",
+        duration=5000,
+        icon="\u2714"
+    )
+    toast.show_toast()
 
-    global NETADAPTERS  # pylint: disable=global-statement
-    NETADAPTERS = adapters
+    return
 
-    global NETFRAMES  # pylint: disable=global-statement
 
-    if isinstance(NETFRAMES, list):
-        for netframe in NETFRAMES:
-            netframe.destroy()
+def show_new_version(last_version: str, last_version_date: str,
+                     url: str) -> None:
+    """Show the "New version" modal (in the Tk thread).
 
-        NETFRAMES = []
+    Args:
+        last_version (str): Last version (e.g., "v1.1.0").
+        last_version_date (str): Publication date of the last version.
+        url (str): Release page of the last version.
+    """
+    try:
+        title = f"{APPNAME} - New version"
+        last_ver_datetime = datetime.strptime(
+            last_version_date, "%Y-%m-%dT%H:%M:%SZ")
+        msg = (f"New version available: {last_version}"
+               f" ({last_ver_datetime.strftime('%b %Y')})")
+        dialog = MessageDialog(message=msg,
+                               title=title,
+                               buttons=["Download", "Skip", "Cancel"],
+                               padding=(30, 30),
+                               width=100,
+                               alert=True)
 
-        global NOT_FOUND_TEXT  # pylint: disable=global-statement
-        if NOT_FOUND_TEXT:
-            NOT_FOUND_TEXT.destroy()
-            NOT_FOUND_TEXT = None
+        dialog.show()
 
-        create_net_wd(adapters)
+        if dialog.result == "Download":
+            webbrowser.open(url)
+        elif dialog.result == "Skip":
+            try:
+                preferences = pref.get_preferences()
+                preferences["skip_vers"].append(last_version)
 
-        toast = ToastNotification(
-            title=APPNAME,
-            message="Network adapters refreshed.",
-            duration=5000,
-            icon="\u2714"
-        )
-        toast.show_toast()
+                pref.save_preferences(preferences)
+            except:  # pylint: disable=bare-except # noqa
+                pass
 
-    return
+    except:  # pylint: disable=bare-except # noqa
+        pass
+
+
+def start_auto_refresh(window: ttk.Window,
+                       interval: float = DEFAULT_INTERVAL) -> AutoRefresh:
+    """Update the widgets of the network adapters periodically (if enabled
+    in the preferences), more often after a change and less while nothing
+    changes.
+
+    Args:
+        window (ttk.Window): Main window. Nothing is queried while it is
+            minimized or does not have the focus.
+        interval (float, optional): Base seconds between refreshes.
+            Defaults to DEFAULT_INTERVAL.
+
+    Returns:
+        AutoRefresh: Running scheduler.
+    """
+    auto_refresh = AutoRefresh(window,
+                               collect=lambda: NetworkBackend().get_info(),
+                               apply=update_net_wd,
+                               interval=interval)
+    auto_refresh.start()
+
+    return auto_refresh
+
+
+def start_watcher(window: ttk.Window):
+    """Update the widgets of the network adapters when the system reports
+    a change (adapter, IP address or route), without pressing Ctrl+R.
+    The changes are reported by PowerShell, so they are not watched
+    outside Windows.
+
+    Args:
+        window (ttk.Window): Main window. The widgets are updated from its
+            event loop.
+
+    Returns:
+        AdapterWatcher | None: Running watcher, or None if not supported.
+    """
+    if os.name != "nt":
+        print("Network changes are not watched on this platform",
+              file=sys.stderr)
+        return None
+
+    dispatcher = get_dispatcher(window)
+
+    def on_change(_kinds: set) -> None:
+        adapters = NetworkBackend().get_info()
+        # Only the last snapshot is shown if several are pending
+        dispatcher.post(update_net_wd, adapters, key="adapters")
+
+    watcher = AdapterWatcher(on_change)
+    watcher.start()
+
+    return watcher
+
+
+def update_net_wd(adapters: dict) -> SnapshotDiff:
+    """Update only the widgets of the network adapters that have been
+    added, removed or changed since the last snapshot. New network
+    adapters are highlighted.
+
+    Args:
+        adapters (dict): Dictionary with the information
+            of the network adapters (AdapterInfo).
+
+    Returns:
+        SnapshotDiff: Differences with the previous snapshot.
+    """
+    global NETADAPTERS  # pylint: disable=global-statement
+    global NOT_FOUND_TEXT  # pylint: disable=global-statement
+
+    diff = diff_snapshots(NETADAPTERS, adapters)
+    NETADAPTERS = adapters
+
+    ADAPTER_LIST.update(adapters, diff)
+
+    if not adapters:
+        if not NOT_FOUND_TEXT:
+            create_net_wd(adapters)
+        return diff
+
+    if NOT_FOUND_TEXT:
+        NOT_FOUND_TEXT.destroy()
+        NOT_FOUND_TEXT = None
+
+    return diff
 
 
 if __name__ == "__main__":
@@ -511,7 +571,7 @@ if __name__ == "__main__":
         check_app_folder()
 
         # Get network adapter info
-        net_adapters = NetworkAdapters().get_info()
+        net_adapters = NetworkBackend().get_info()
         NETADAPTERS = net_adapters
 
         # To know if the application has been launched as administrator.
@@ -529,9 +589,14 @@ if __name__ == "__main__":
         ADJ_HEIGHT = 1.06 if ADMIN else 1.11
 
         THEME = "litera"
+        AUTO_REFRESH = False
+        REFRESH_INTERVAL = DEFAULT_INTERVAL
         try:
             prefs = pref.get_preferences()
             THEME = prefs["themename"]
+            AUTO_REFRESH = prefs.get("auto_refresh", False)
+            REFRESH_INTERVAL = prefs.get("refresh_interval",
+                                         DEFAULT_INTERVAL)
         except:  # pylint: disable=bare-except # noqa
             pass
 
@@ -545,8 +610,11 @@ if __name__ == "__main__":
         app.iconbitmap(default=ICON)  # Set the default bitmap (.ico)
         app.iconbitmap(default='')  # Remove the default bitmap
 
+        # Updates of the background threads
+        dispatcher = get_dispatcher(app)
+
         # App version
-        threading.Thread(target=check_app_version).start()
+        execution.start_thread(check_app_version, name="app-version")
 
         # Menu bar
         menubar = tk.Menu(app)
@@ -573,6 +641,13 @@ if __name__ == "__main__":
         editmenu.add_command(
             label="Profiles",
             command=lambda: NetAdapProfiles().manage_profiles())
+        editmenu.add_command(
+            label="Apply profiles to adapters",
+            command=lambda: bulk_apply_widget(
+                NETADAPTERS,
+                on_done=lambda: update_net_wd(
+                    NetworkBackend().get_info())),
+            state="normal" if ADMIN else "disabled")
         editmenu.add_command(
             label="Preferences",
             command=pref.preferences_widget)
@@ -580,13 +655,11 @@ if __name__ == "__main__":
         # Tools menu
         toolsmenu.add_command(
             label="ARP",
-            command=lambda: arp_widget([{
-                "ip": data["ip"], "name": data["name"]}
-                for data in NETADAPTERS.values()])
+            command=lambda: arp_widget(NETADAPTERS)
         )
         toolsmenu.add_command(
             label="Nmap",
-            command=nmap_widget
+            command=lambda: nmap_widget(NETADAPTERS)
         )
 
         # Help menu
@@ -637,17 +710,15 @@ if __name__ == "__main__":
         scrollbar.grid(row=CANVAS_ROW, column=1, sticky="ns")
 
         # Displacement of network adapters
-        netadapters_canvas.configure(yscrollcommand=scrollbar.set)
         netadapters_canvas.bind_all(
             "<MouseWheel>",
             lambda e: netadapters_canvas.yview_scroll(-1*(e.delta//120),
                                                       "units"))
 
-        # Frame with the network adapters
-        NETADAPTERS_FRAME = ttk.Frame(
-            netadapters_canvas, width=WIDTH, height=HEIGHT)
-        netadapters_canvas.create_window(
-            (0, 0), window=NETADAPTERS_FRAME, anchor="nw")
+        # Cards of the network adapters, created as they are scrolled into
+        # view. It also sets the scroll region and updates the scrollbar
+        ADAPTER_LIST = AdapterList(netadapters_canvas, scrollbar,
+                                   disabled=not ADMIN)
 
         # Network adapters
         create_net_wd(net_adapters)
@@ -656,13 +727,25 @@ if __name__ == "__main__":
         app.grid_rowconfigure(0, weight=1)
         app.grid_columnconfigure(0, weight=1)
 
-        app.bind("<Configure>",
-                 lambda e: netadapters_canvas.configure(
-                     scrollregion=netadapters_canvas.bbox("all"))
-                 )
+        # Network changes
+        watcher = start_watcher(app)
+
+        # Periodic refresh (opt-in)
+        auto_refresh = (start_auto_refresh(app, REFRESH_INTERVAL)
+                        if AUTO_REFRESH else None)
+
+        # Event loop for the asynchronous queries
+        bridge = get_bridge(app)
 
         app.mainloop()
 
+        if watcher:
+            watcher.stop()
+        if auto_refresh:
+            auto_refresh.stop()
+        bridge.close()
+        dispatcher.close()
+
     except Exception as e:  # pylint: disable=broad-exception-caught # noqa
         traceback.print_exc()
         with open(f"{APPNAME.lower()}_error.log", mode="w",
@@ -0,0 +1,60 @@
+"""Differences between two snapshots of the network adapters"""
+
+from typing import NamedTuple
+
+from adapter_info import AdapterInfo
+
+
+class SnapshotDiff(NamedTuple):
+    """Network adapters added, removed and changed between two snapshots"""
+    added: list  # Indexes of the new network adapters
+    removed: list  # Indexes of the network adapters no longer present
+    changed: dict  # Index -> names of the fields that changed
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def changed_fields(old: AdapterInfo, new: AdapterInfo) -> list:
+    """Get the fields that differ between two records of a network adapter.
+
+    Args:
+        old (AdapterInfo): Previous record.
+        new (AdapterInfo): Current record.
+
+    Returns:
+        list: Field names (e.g., ["status", "ip"]). Addresses are named
+            without the "_int" suffix.
+    """
+    if old == new:
+        return []
+
+    return [field[:-4] if field.endswith("_int") else field
+            for field in AdapterInfo.__slots__
+            if getattr(old, field) != getattr(new, field)]
+
+
+def diff_snapshots(old: dict, new: dict) -> SnapshotDiff:
+    """Compare two results of NetworkAdapters.get_info().
+
+    Args:
+        old (dict): Previous snapshot (index -> AdapterInfo).
+        new (dict): Current snapshot (index -> AdapterInfo).
+
+    Returns:
+        SnapshotDiff: Added, removed and changed network adapters,
+            sorted by index.
+    """
+    old = old or {}
+    new = new or {}
+
+    added = sorted(index for index in new if index not in old)
+    removed = sorted(index for index in old if index not in new)
+    changed = {}
+    for index in sorted(new):
+        if index in old:
+            fields = changed_fields(old[index], new[index])
+            if fields:
+                changed[index] = fields
+
+    return SnapshotDiff(added, removed, changed)
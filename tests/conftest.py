@@ -0,0 +1,7 @@
+"""Make the application modules importable from the tests"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
@@ -0,0 +1,32 @@
+"""Tests of the network adapter records"""
+
+import pytest
+
+from adapter_info import AdapterInfo, IPAddress
+import ipv4
+
+INFO = {"name": "Ethernet", "status": "Up", "ip": "192.168.1.10",
+        "prefix_length": "24", "gateway": "192.168.1.1"}
+
+
+def test_compared_by_value_but_unhashable():
+    """Records are equal if their fields are, but since they can change
+    they cannot be used in sets or as dictionary keys."""
+    info = AdapterInfo.from_dict(7, INFO)
+
+    assert info == AdapterInfo.from_dict(7, INFO)
+    assert info == {**AdapterInfo.from_dict(7, INFO)}
+    with pytest.raises(TypeError):
+        hash(info)
+
+
+def test_set_addresses_changes_equality():
+    """Changing the addresses changes the primary one and the equality."""
+    info = AdapterInfo.from_dict(7, INFO)
+    other = AdapterInfo.from_dict(7, INFO)
+
+    other.set_addresses([IPAddress(ipv4.pack("192.168.1.20"), 24, "Manual",
+                                   "Manual")])
+
+    assert other.ip == "192.168.1.20"
+    assert info != other
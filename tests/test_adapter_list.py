@@ -0,0 +1,107 @@
+"""Tests of the virtualized list of network adapter cards"""
+
+import os
+import tkinter as tk
+
+import pytest
+import ttkbootstrap as ttk
+
+from adapter_info import AdapterInfo
+from adapter_list import AdapterList, CardPool
+from snapshot_diff import diff_snapshots
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADAPTERS = 60  # Network adapters in the list
+VIEW = (600, 400)  # Size of the canvas (pixels)
+
+
+class FakeCard:
+    """Card that records the network adapters it is bound to."""
+
+    def __init__(self, info: AdapterInfo) -> None:
+        self.index = info.index
+        self.bound = [info.index]  # Indexes of the network adapters shown
+
+    def rebind(self, info: AdapterInfo, bootstyle: str = "default") -> None:
+        """Show another network adapter."""
+        # pylint: disable=unused-argument
+        self.index = info.index
+        self.bound.append(info.index)
+
+
+def snapshot(status: str) -> dict:
+    """Get the information of ADAPTERS network adapters.
+
+    Args:
+        status (str): Status of all of them.
+
+    Returns:
+        dict: AdapterInfo by index.
+    """
+    return {index: AdapterInfo.from_dict(index, {
+        "name": f"Ethernet {index}", "status": status,
+        "ip": f"10.0.{index}.1", "prefix_length": "24",
+        "prefix_origin": "Manual", "suffix_origin": "Manual"})
+        for index in range(1, ADAPTERS + 1)}
+
+
+@pytest.fixture(name="app")
+def fixture_app(monkeypatch):
+    """Hidden application window (skipped without a display)."""
+    monkeypatch.chdir(ROOT)  # The widgets load ./resources
+    try:
+        app = ttk.Window()
+    except tk.TclError as err:
+        pytest.skip(str(err))
+    app.withdraw()
+    yield app
+    app.destroy()
+
+
+def test_pool_rebinds_free_cards():
+    """A released card is rebound instead of creating a new one."""
+    pool = CardPool(lambda info, bootstyle: FakeCard(info))
+    infos = snapshot("Up")
+
+    first = pool.acquire(infos[1])
+    pool.release(first)
+    second = pool.acquire(infos[2], bootstyle="primary")
+    third = pool.acquire(infos[3])
+
+    assert second is first and first.bound == [1, 2]
+    assert third is not first
+    assert (pool.created, pool.reused, len(pool)) == (2, 1, 0)
+
+
+def test_refresh_and_scroll_reuse_cards(app):
+    """Refreshing and scrolling a hidden list rebinds the pooled cards
+    instead of creating new ones."""
+    canvas = tk.Canvas(app, width=VIEW[0], height=VIEW[1])
+    adapter_list = AdapterList(canvas, disabled=True)
+    adapters = snapshot("Up")
+    adapter_list.update(adapters)
+
+    def cycle(number: int) -> None:
+        nonlocal adapters
+        new = snapshot("Disabled" if number % 2 else "Up")
+        adapter_list.update(new, diff_snapshots(adapters, new))
+        adapters = new
+        canvas.yview_moveto(number * 3 % 10 / 10)
+        adapter_list.render()
+        app.update_idletasks()
+
+    # Every position once, so that the rows are measured and the rows in
+    # the middle of the list (with cards above and below) have been shown
+    for number in range(10):
+        cycle(number)
+    created = adapter_list.pool.created
+    reused = adapter_list.pool.reused
+    assert 0 < created < ADAPTERS
+
+    for number in range(10):
+        cycle(number)
+
+    assert adapter_list.pool.created == created
+    assert adapter_list.pool.reused > reused
+    assert all(card.index == index
+               for index, card in adapter_list.cards().items())
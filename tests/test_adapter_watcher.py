@@ -0,0 +1,139 @@
+"""Tests of the watcher of network changes"""
+
+import base64
+import sys
+import threading
+
+import pytest
+
+import adapter_watcher
+from adapter_watcher import (WATCH_SCRIPT, AdapterWatcher, EventSource,
+                             PowerShellEventSource, watch_command)
+import execution
+
+
+class FlakySource(EventSource):
+    """Source that fails to start, then ends after some events, then
+    yields events until closed."""
+
+    def __init__(self) -> None:
+        self.starts = 0
+        self._closed = threading.Event()
+
+    def __iter__(self):
+        self.starts += 1
+        if self.starts == 1:
+            raise FileNotFoundError("powershell.exe")
+        yield "ip"
+        if self.starts == 2:
+            return
+        yield "route"
+        self._closed.wait(5)
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+class BurstSource(EventSource):
+    """Source that yields bursts of events, each one after the previous
+    has been notified, and then waits until closed."""
+
+    def __init__(self, bursts: list) -> None:
+        self.bursts = bursts  # Kinds of change of each burst
+        self._closed = threading.Event()
+
+    def __iter__(self):
+        for burst in self.bursts:
+            yield from burst
+            self._closed.wait(0.2)
+        self._closed.wait(5)
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+@pytest.fixture(name="fast_restart")
+def fixture_fast_restart(monkeypatch) -> None:
+    """Restart the sources at once."""
+    monkeypatch.setattr(adapter_watcher, "RESTART_DELAY", 0.01)
+
+
+def test_watch_command_interval():
+    """The script run by PowerShell starts by setting the interval."""
+    command = watch_command(interval=30)
+    script = base64.b64decode(command[-1]).decode("utf-16-le")
+
+    assert command[-2] == "-EncodedCommand"
+    assert script == "$interval = 30\n" + WATCH_SCRIPT
+
+
+def test_callback_failures_logged(capsys):
+    """A callback that raises is logged with its traceback and the next
+    bursts are still notified."""
+    notices = []
+    received = threading.Event()
+
+    def callback(kinds: set) -> None:
+        notices.append(kinds)
+        if len(notices) == 1:
+            raise ValueError("Invalid snapshot")
+        received.set()
+
+    source = BurstSource([["ip"], ["adapter"]])
+    watcher = AdapterWatcher(callback, source=source, debounce=0.01,
+                             max_delay=0.01)
+    watcher.start()
+    assert received.wait(5)
+    watcher.stop()
+
+    assert notices == [{"ip"}, {"adapter"}]
+    err = capsys.readouterr().err
+    assert "Traceback" in err and "ValueError: Invalid snapshot" in err
+
+
+@pytest.mark.usefixtures("fast_restart")
+def test_source_restarted_after_failures(capsys):
+    """A source that cannot be started or ends is started again, and the
+    failures are logged."""
+    notices = []
+    received = threading.Event()
+
+    def callback(kinds: set) -> None:
+        notices.append(kinds)
+        if "route" in kinds:
+            received.set()
+
+    source = FlakySource()
+    watcher = AdapterWatcher(callback, source=source, debounce=0.05)
+    watcher.start()
+    assert received.wait(5)
+    watcher.stop()
+
+    assert source.starts == 3
+    assert watcher.restarts == 2
+    assert set().union(*notices) == {"ip", "route"}
+    assert "powershell.exe" in capsys.readouterr().err
+    for thread in watcher._threads:  # pylint: disable=protected-access
+        thread.join(5)
+    assert not watcher.is_alive()
+
+
+def test_powershell_source_is_tracked(monkeypatch):
+    """The PowerShell process is started by the execution layer and
+    killed when the source is closed."""
+    script = ("import sys, time\n"
+              "print('noise'); print('route'); sys.stdout.flush()\n"
+              "time.sleep(60)")
+    monkeypatch.setattr(adapter_watcher, "watch_command",
+                        lambda interval: [sys.executable, "-c", script])
+    running = execution.diagnostics().running
+
+    source = PowerShellEventSource()
+    events = iter(source)
+
+    assert next(events) == "route"
+    assert execution.diagnostics().running == running + 1
+    source.close()
+    assert list(events) == []
+    assert execution.diagnostics().running == running
+    assert list(source) == []
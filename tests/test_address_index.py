@@ -0,0 +1,73 @@
+"""Tests of the index of the addresses of the network adapters"""
+
+import pytest
+
+from adapter_info import AdapterInfo, IPAddress
+from address_index import AddressIndex
+import ipv4
+
+# Addresses (ip/prefix length) by network adapter index
+ADDRESSES = {
+    3: ["10.0.0.1/8"],
+    5: ["10.1.0.1/16"],
+    7: ["192.168.1.10/24", "10.1.2.1/24"],
+    9: ["192.168.1.20/24", "10.1.2.1/24"],
+    11: ["172.16.5.5/32", "169.254.10.10"],
+}
+
+
+@pytest.fixture(name="index")
+def fixture_index() -> AddressIndex:
+    """Index of the network adapters of ADDRESSES."""
+    adapters = {}
+    for idx, addresses in ADDRESSES.items():
+        addrs = []
+        for address in addresses:
+            ip, _, prefix_length = address.partition("/")
+            addrs.append(IPAddress(ipv4.pack(ip), int(prefix_length)
+                                   if prefix_length else None, "Manual"))
+        adapters[idx] = AdapterInfo(idx, name=f"Ethernet {idx}",
+                                    addresses=addrs)
+
+    return AddressIndex(adapters)
+
+
+@pytest.mark.parametrize("ip, expected", [
+    ("10.1.2.200", 7),  # 10.1.2.0/24 inside 10.1.0.0/16 inside 10.0.0.0/8
+    ("10.1.3.1", 5),  # After 10.1.2.0/24, in its parent
+    ("10.2.0.1", 3),  # Two levels up
+    ("10.255.255.255", 3),
+    ("172.16.5.5", 11),
+    (ipv4.pack("10.1.2.1"), 7),
+])
+def test_most_specific_subnet(index, ip, expected):
+    """The adapter of the smallest subnet that contains the address is
+    found, walking up the enclosing subnets."""
+    assert index.find_subnet(ip) == expected
+
+
+def test_lowest_index_wins(index):
+    """An address or subnet shared by several adapters belongs to the one
+    with the lowest index."""
+    assert index.find_subnet("192.168.1.99") == 7
+    assert index.owner("10.1.2.1") == 7
+    assert index.owner("192.168.1.20") == 9
+
+
+@pytest.mark.parametrize("ip", [
+    "9.255.255.255", "11.0.0.0", "172.16.5.6", "192.168.2.1",
+    "169.254.10.11", "300.1.1.1", "", None])
+def test_subnet_misses(index, ip):
+    """Addresses outside every subnet, invalid ones and addresses without
+    prefix length do not match."""
+    assert index.find_subnet(ip) is None
+
+
+def test_owner_misses(index):
+    """Only the assigned addresses have an owner."""
+    assert index.owner("169.254.10.10") == 11
+    assert index.owner("192.168.1.11") is None
+    assert index.owner("10.0.0.01") == 3
+    assert index.owner("256.0.0.1") is None
+    assert len(index) == 7
+    assert AddressIndex({}).find_subnet("10.0.0.1") is None
@@ -0,0 +1,175 @@
+"""Tests of the asynchronous queries over the pool of PowerShell sessions"""
+
+import asyncio
+from concurrent.futures import CancelledError
+import json
+import re
+import threading
+
+import pytest
+
+from adapter_info import AdapterInfo
+import async_adapters
+from async_adapters import AsyncNetworkAdapters, PoolRunner, ThreadedAdapters
+from linux_adapters import LinuxNetworkAdapters
+from network_adapters import ENCONDING_COMMAND
+from powershell import POWERSHELL, CommandResult
+
+
+class FakePool:
+    """Stand-in for PowerShellPool that records the commands and the
+    threads that run them. Commands in `hung` wait until cancelled."""
+
+    def __init__(self, hung=(), stderr: bytes = b"") -> None:
+        self.hung = hung  # Scripts that do not finish
+        self.stderr = stderr  # Error output of every command
+        self.calls = []  # (args, timeout, thread)
+        self.cancelled = threading.Event()
+
+    def run(self, args: list, timeout: float = None,
+            cancel=None) -> CommandResult:
+        """Record the command and return its script as the output."""
+        self.calls.append((args, timeout, threading.get_ident()))
+        if args[1] in self.hung:
+            cancel.wait(5)
+            self.cancelled.set()
+            raise CancelledError(f"'{args[0]}' has been cancelled")
+
+        return CommandResult(" ".join(args[1:]).encode(), self.stderr, 0)
+
+
+class TransactionPool(FakePool):
+    """FakePool that answers the transaction scripts with the result of
+    their steps, failing with `error` if it is set."""
+
+    def __init__(self, error: str = "") -> None:
+        super().__init__()
+        self.error = error
+
+    def run(self, args: list, timeout: float = None,
+            cancel=None) -> CommandResult:
+        """Record the script and return the result of its steps."""
+        super().run(args, timeout, cancel)
+        names = list(dict.fromkeys(re.findall(
+            r"\$txSteps \+= @\{name = '(\w+)'", args[1])))
+        steps = [{"name": name, "error": self.error if number == 0 else ""}
+                 for number, name in enumerate(names)]
+
+        return CommandResult(json.dumps({
+            "steps": steps, "rolled_back": bool(self.error),
+            "rollback": []}).encode(), b"", 0)
+
+
+@pytest.fixture(name="enconding")
+def fixture_enconding(monkeypatch) -> None:
+    """The terminal enconding is already known."""
+    monkeypatch.setattr(async_adapters, "cached_enconding", lambda: "utf-8")
+
+
+def test_commands_run_in_the_pool_outside_the_loop():
+    """The commands are sent to the pool from an executor thread, so the
+    event loop is not blocked while a session runs them."""
+    pool = FakePool()
+
+    async def run():
+        return (await PoolRunner(pool).run([POWERSHELL, "Get-Date"], 5),
+                threading.get_ident())
+
+    result, loop_thread = asyncio.run(run())
+
+    assert result == CommandResult(b"Get-Date", b"", 0)
+    assert pool.calls[0][:2] == ([POWERSHELL, "Get-Date"], 5)
+    assert pool.calls[0][2] != loop_thread
+
+
+def test_default_runner_uses_the_shared_pool(monkeypatch):
+    """AsyncNetworkAdapters runs its commands in the pool of the
+    application, like NetworkAdapters."""
+    pool = FakePool()
+    monkeypatch.setattr(async_adapters, "get_pool", lambda: pool)
+    monkeypatch.setattr(async_adapters, "cached_enconding", lambda: None)
+    monkeypatch.setattr(async_adapters, "cache_enconding", bytes.decode)
+
+    enconding = asyncio.run(AsyncNetworkAdapters().get_enconding())
+
+    assert [call[0] for call in pool.calls] == [ENCONDING_COMMAND]
+    assert enconding == " ".join(ENCONDING_COMMAND[1:])
+
+
+def test_cancellation_reaches_the_pool():
+    """Cancelling the task (here, by a timeout) cancels the command in the
+    pool, so that the session running it is killed."""
+    pool = FakePool(hung=("Start-Sleep",))
+
+    async def run():
+        await asyncio.wait_for(
+            PoolRunner(pool).run([POWERSHELL, "Start-Sleep"]), 0.1)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(run())
+
+    assert pool.cancelled.wait(5)
+
+
+@pytest.mark.usefixtures("enconding")
+def test_config_coroutines_run_transactions(monkeypatch):
+    """The configuration coroutines run a transaction in the pool and raise
+    the error of the step that failed."""
+    pool = TransactionPool()
+    monkeypatch.setattr(async_adapters, "get_pool", lambda: pool)
+
+    asyncio.run(AsyncNetworkAdapters().set_ip_mask(
+        7, "192.168.1.10", "255.255.255.0"))
+
+    script = pool.calls[0][0][1]
+    assert script.startswith("$txIdx = 7;")
+    assert "-IPAddress 192.168.1.10 -PrefixLength 24" in script
+
+    pool.error = "PermissionDenied: Access is denied"
+    with pytest.raises(PermissionError):
+        asyncio.run(AsyncNetworkAdapters().set_def_gateway(7, "192.168.1.1"))
+    with pytest.raises(ValueError):
+        asyncio.run(AsyncNetworkAdapters().set_def_gateway(7, "0.0.0.0"))
+
+
+@pytest.mark.usefixtures("enconding")
+def test_enable_and_disable_errors(monkeypatch):
+    """The errors of enabling and disabling are raised as in
+    NetworkAdapters."""
+    pool = FakePool()
+    monkeypatch.setattr(async_adapters, "get_pool", lambda: pool)
+
+    asyncio.run(AsyncNetworkAdapters().disable_adapter("Ethernet"))
+    assert pool.calls[0][0][:4] == [POWERSHELL, "Disable-NetAdapter",
+                                    "-Name", "'Ethernet'"]
+
+    pool.stderr = b"Enable-NetAdapter : ObjectNotFound"
+    with pytest.raises(KeyError):
+        asyncio.run(AsyncNetworkAdapters().enable_adapter("Ethernet"))
+    pool.stderr = b"Something else"
+    with pytest.raises(NotImplementedError):
+        asyncio.run(AsyncNetworkAdapters().enable_adapter("Ethernet"))
+
+
+def test_threaded_backend_runs_outside_the_loop():
+    """A blocking backend is run in a thread and does not support the
+    configuration changes."""
+    threads = []
+
+    class Backend(LinuxNetworkAdapters):
+        """Backend with a single network adapter."""
+
+        def get_info(self) -> dict:
+            threads.append(threading.current_thread())
+            return {3: AdapterInfo.from_dict(3, {"name": "eth0"})}
+
+    adapters = ThreadedAdapters(Backend())
+
+    assert asyncio.run(adapters.get_adapter(3)).name == "eth0"
+    with pytest.raises(KeyError):
+        asyncio.run(adapters.get_adapter(4))
+    with pytest.raises(NotImplementedError):
+        asyncio.run(adapters.disable_adapter("eth0"))
+    with pytest.raises(NotImplementedError):
+        asyncio.run(adapters.commit(None))
+    assert threading.main_thread() not in threads
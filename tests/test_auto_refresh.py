@@ -0,0 +1,211 @@
+"""Tests of the periodic refresh of the network adapters"""
+
+import tkinter as tk
+
+import pytest
+
+import auto_refresh
+from auto_refresh import AutoRefresh
+
+
+class FakeWindow:
+    """Main window whose after() calls are run by the test."""
+
+    def __init__(self) -> None:
+        self.pending = {}  # Id -> (milliseconds, function) of each after()
+        self.window_state = "normal"  # Result of state()
+        self.focus = "."  # Result of focus_get()
+        self.destroyed = False
+        self._ids = 0
+
+    def after(self, delay: int, func) -> str:
+        """Schedule a function."""
+        self._ids += 1
+        after_id = f"after#{self._ids}"
+        self.pending[after_id] = (delay, func)
+        return after_id
+
+    def after_cancel(self, after_id: str) -> None:
+        """Cancel a scheduled function."""
+        if self.destroyed:
+            raise tk.TclError("can't invoke \"after\" command")
+        del self.pending[after_id]
+
+    def focus_get(self):
+        """Widget with the focus (None if another application has it)."""
+        return self.focus
+
+    @property
+    def delays(self) -> list:
+        """Seconds of the pending cycles."""
+        return [delay / 1000 for delay, _ in self.pending.values()]
+
+    def run_next(self) -> None:
+        """Run the scheduled cycle."""
+        after_id = next(iter(self.pending))
+        _, func = self.pending.pop(after_id)
+        func()
+
+    def state(self) -> str:
+        """State of the window ("normal", "iconic"...)."""
+        return self.window_state
+
+
+class Harness:
+    """AutoRefresh over a FakeWindow, whose collections run when the test
+    finishes them and whose results are posted to a list."""
+
+    def __init__(self, monkeypatch, changes=(), failing=(),
+                 interval: float = 10) -> None:
+        self.window = FakeWindow()
+        self.changes = changes  # Collections whose snapshot changes
+        self.failing = failing  # Collections that fail
+        self.threads = []  # Collections started and not finished
+        self.posted = []  # (function, args) posted to the Tk thread
+        self.applied = []  # Snapshots applied
+        self.refresh = AutoRefresh(self.window, self._collect, self._apply,
+                                   interval=interval)
+
+        harness = self
+
+        class Dispatcher:
+            """Dispatcher that keeps the posted functions."""
+
+            def post(self, func, *args) -> None:
+                """Keep a function to run in the Tk thread."""
+                harness.posted.append((func, args))
+
+        monkeypatch.setattr(auto_refresh, "get_dispatcher", Dispatcher)
+        monkeypatch.setattr(
+            auto_refresh.execution, "start_thread",
+            lambda target, name=None: self.threads.append(target))
+
+    def _apply(self, adapters: dict) -> bool:
+        self.applied.append(adapters)
+        return adapters["cycle"] in self.changes
+
+    def _collect(self) -> dict:
+        if self.refresh.cycles in self.failing:
+            raise OSError("powershell.exe")
+        return {"cycle": self.refresh.cycles}
+
+    def finish(self) -> None:
+        """Finish the collections and run what they posted."""
+        while self.threads:
+            self.threads.pop(0)()
+        while self.posted:
+            func, args = self.posted.pop(0)
+            func(*args)
+
+    def cycle(self) -> list:
+        """Run the next cycle and finish its collection.
+
+        Returns:
+            list: Seconds until the next cycle.
+        """
+        self.window.run_next()
+        self.finish()
+        return self.window.delays
+
+
+@pytest.fixture(name="harness")
+def fixture_harness(monkeypatch):
+    """Factory of Harness."""
+    return lambda **kwargs: Harness(monkeypatch, **kwargs)
+
+
+def test_interval_grows_while_nothing_changes(harness):
+    """Without changes the interval doubles up to MAX_FACTOR times the
+    base one."""
+    test = harness(interval=10)
+    test.refresh.start()
+    assert test.window.delays == [10]
+
+    delays = [test.cycle()[0] for _ in range(5)]
+
+    assert delays == [20, 40, 80, 80, 80]
+    assert (test.refresh.cycles, test.refresh.changes) == (5, 0)
+    assert [snapshot["cycle"] for snapshot in test.applied] == [
+        1, 2, 3, 4, 5]
+
+
+def test_interval_tightens_after_a_change(harness):
+    """A change drops the interval to half the base one (at least
+    MIN_INTERVAL), replacing the cycle pending, and it grows again."""
+    test = harness(interval=30, changes=(2,))
+    test.refresh.start()
+
+    delays = [test.cycle() for _ in range(4)]
+
+    assert delays == [[60], [15], [30], [60]]
+    assert test.refresh.changes == 1
+
+    small = harness(interval=6, changes=(1,))
+    small.refresh.start()
+    assert small.cycle() == [auto_refresh.MIN_INTERVAL]
+
+
+def test_skipped_while_collecting(harness):
+    """A cycle is skipped if the previous collection is still running,
+    keeping the interval."""
+    test = harness(interval=10)
+    test.refresh.start()
+    test.window.run_next()
+    test.window.run_next()
+
+    assert (test.refresh.cycles, test.refresh.skipped) == (1, 1)
+    assert len(test.threads) == 1
+    assert test.window.delays == [20]
+
+    test.finish()
+    test.window.run_next()
+    assert test.refresh.cycles == 2
+
+
+@pytest.mark.parametrize("window_state, focus", [
+    ("iconic", "."), ("withdrawn", "."), ("normal", None)])
+def test_skipped_while_inactive(harness, window_state, focus):
+    """Nothing is collected while the window is minimized, hidden or
+    without the focus."""
+    test = harness(interval=10)
+    test.window.window_state = window_state
+    test.window.focus = focus
+    test.refresh.start()
+
+    assert test.cycle() == [10]
+    assert (test.refresh.cycles, test.refresh.skipped) == (0, 1)
+
+    test.window.window_state, test.window.focus = "normal", "."
+    assert test.cycle() == [20]
+    assert test.refresh.cycles == 1
+
+
+def test_failed_collection(harness, capsys):
+    """A collection that fails is logged and nothing is applied."""
+    test = harness(interval=10, failing=(1,))
+    test.refresh.start()
+
+    assert test.cycle() == [20]
+    assert not test.applied
+    assert "OSError: powershell.exe" in capsys.readouterr().err
+    test.cycle()
+    assert [snapshot["cycle"] for snapshot in test.applied] == [2]
+
+
+def test_stop_leaves_nothing_scheduled(harness):
+    """After stop() nothing is scheduled, even when a collection that was
+    running finishes or the window has been destroyed."""
+    test = harness(interval=10, changes=(1,))
+    test.refresh.start()
+    test.window.run_next()
+
+    test.refresh.stop()
+    test.finish()
+
+    assert not test.window.pending
+    assert not test.applied
+
+    test.refresh.start()
+    test.window.destroyed = True
+    test.refresh.stop()
+    test.refresh.stop()
@@ -0,0 +1,119 @@
+"""Tests of applying profiles to several network adapters"""
+
+import json
+import re
+import threading
+import time
+
+import pytest
+
+from bulk_apply import BulkResult, apply_profiles
+import network_adapters
+from powershell import CommandResult
+
+PROFILES = {
+    "office": {"ip": "192.168.1.10", "mask": "255.255.255.0",
+               "gateway": "192.168.1.1", "pref_dns": "1.1.1.1",
+               "alt_dns": ""},
+    "lab": {"ip": "10.0.0.5", "mask": "255.0.0.0", "gateway": "",
+            "pref_dns": "", "alt_dns": "8.8.8.8"},
+    "broken": {"ip": "192.168.1.300", "mask": "255.255.255.0"},
+}
+
+
+class TransactionBackend:
+    """Command runner that answers the transaction scripts like
+    powershell.exe: every step succeeds, except the first one of the
+    network adapters in `failing`, which is rolled back."""
+
+    def __init__(self, failing=(), delay: float = 0) -> None:
+        self.failing = failing  # Indexes whose transaction fails
+        self.delay = delay  # Seconds each transaction takes
+        self.scripts = {}  # Script by network adapter index
+        self.running = 0  # Transactions running now
+        self.max_running = 0  # Most transactions run at the same time
+        self._lock = threading.Lock()
+
+    def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Run a transaction script."""
+        # pylint: disable=unused-argument
+        script = args[1]
+        index = int(re.match(r"\$txIdx = (\d+);", script).group(1))
+        with self._lock:
+            self.scripts[index] = script
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+
+        names = list(dict.fromkeys(re.findall(
+            r"\$txSteps \+= @\{name = '(\w+)'", script)))
+        if index in self.failing:
+            steps = [{"name": names[0],
+                      "error": "PermissionDenied: Access is denied"}]
+        else:
+            steps = [{"name": name, "error": ""} for name in names]
+
+        return CommandResult(json.dumps({
+            "steps": steps, "rolled_back": index in self.failing,
+            "rollback": []}).encode(), b"", 0)
+
+
+@pytest.fixture(autouse=True)
+def fixture_enconding(monkeypatch) -> None:
+    """The terminal enconding is already known."""
+    monkeypatch.setattr(network_adapters, "_ENCONDING", "utf-8")
+
+
+def test_results_and_progress():
+    """Each network adapter gets its own transaction, progress is called
+    once per adapter and the results are sorted by index."""
+    backend = TransactionBackend(failing=(9,))
+    reported = []
+
+    results = apply_profiles({12: "office", 3: "lab", 9: "office"},
+                             profiles=PROFILES, runner=backend,
+                             progress=reported.append)
+
+    assert list(results) == [3, 9, 12]
+    assert sorted(res.index for res in reported) == [3, 9, 12]
+    assert all(isinstance(res, BulkResult) for res in reported)
+    assert results[12] and results[3]
+    assert results[12].result.steps[-1].name == "set_dns_servers"
+    assert [step.name for step in results[3].result.steps] == [
+        "remove_primary_ip", "set_ip_mask", "set_dns_servers"]
+    assert not results[9]
+    assert results[9].result.rolled_back
+    assert results[9].error == "PermissionDenied: Access is denied"
+    assert set(backend.scripts) == {3, 9, 12}
+    assert "-ServerAddresses 8.8.8.8" in backend.scripts[3]
+
+
+def test_unknown_and_invalid_profiles():
+    """A missing or invalid profile fails only its network adapter,
+    without running any command for it."""
+    backend = TransactionBackend()
+
+    results = apply_profiles({1: "office", 2: "missing", 3: "broken"},
+                             profiles=PROFILES, runner=backend)
+
+    assert results[1]
+    assert results[2].error == "Unknown profile 'missing'"
+    assert results[2].result is None
+    assert results[3].error == "Invalid configuration"
+    assert results[3].result is None
+    assert set(backend.scripts) == {1}
+
+
+def test_max_workers():
+    """No more than max_workers network adapters are configured at the
+    same time."""
+    backend = TransactionBackend(delay=0.05)
+
+    results = apply_profiles({index: "office" for index in range(8)},
+                             profiles=PROFILES, runner=backend,
+                             max_workers=2)
+
+    assert all(results.values())
+    assert backend.max_running == 2
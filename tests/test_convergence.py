@@ -0,0 +1,122 @@
+"""Tests of waiting for the expected state of a network adapter"""
+
+import asyncio
+from itertools import repeat
+
+import pytest
+
+from adapter_info import AdapterInfo
+from convergence import matches, wait_for_state
+
+INFO = AdapterInfo.from_dict(7, {
+    "name": "Ethernet", "status": "Up", "ip": "192.168.1.10",
+    "prefix_length": "24", "gateway": "192.168.1.1",
+    "pref_dns": "8.8.8.8", "alt_dns": ""})
+
+
+def test_addresses_with_leading_zeros():
+    """Addresses entered with leading zeros match the reported ones."""
+    assert matches(INFO, {"ip": "192.168.001.010",
+                          "mask": "255.255.255.000",
+                          "gateway": "192.168.1.001",
+                          "pref_dns": "008.008.008.008"})
+
+
+def test_different_values():
+    """Different addresses and other fields do not match."""
+    assert not matches(INFO, {"ip": "192.168.1.11"})
+    assert not matches(INFO, {"status": "Disabled"})
+    assert not matches(INFO, {"alt_dns": "8.8.4.4"})
+
+
+def test_empty_and_other_fields():
+    """Empty addresses and non-address fields are compared as they are."""
+    assert matches(INFO, {"alt_dns": "", "status": "Up"})
+    assert not matches(None, {})
+    assert matches(INFO, lambda info: info.name == "Ethernet")
+
+
+class FakeQuery:
+    """Coroutine function that returns (or raises) the given results in
+    order, repeating the last one."""
+
+    def __init__(self, results: list, delay: float = 0) -> None:
+        self.results = results  # AdapterInfo or exception of each query
+        self.delay = delay  # Seconds each query takes
+        self.calls = 0
+
+    async def __call__(self) -> AdapterInfo:
+        result = self.results[min(self.calls, len(self.results) - 1)]
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_converges_on_nth_poll():
+    """The wait ends at the first query that returns the expected
+    state."""
+    disabled = AdapterInfo.from_dict(7, {"name": "Ethernet",
+                                         "status": "Disabled"})
+    query = FakeQuery([INFO, INFO, disabled, INFO])
+
+    result = asyncio.run(wait_for_state(query, {"status": "Disabled"},
+                                        deadline=5, delays=repeat(0.01)))
+
+    assert result
+    assert result.info is disabled
+    assert result.polls == query.calls == 3
+    assert result.elapsed < 1
+
+
+def test_deadline_returns_last_info():
+    """If the state is not reached in time, the last information is
+    returned without converging."""
+    query = FakeQuery([AdapterInfo.from_dict(7, {"status": "Up"}), INFO])
+
+    result = asyncio.run(wait_for_state(query, {"ip": "10.0.0.1"},
+                                        deadline=0.3, delays=repeat(0.05)))
+
+    assert not result.converged
+    assert result.info is INFO
+    assert result.polls == query.calls > 2
+    assert 0.3 <= result.elapsed < 1
+
+
+def test_slow_query_stops_at_deadline():
+    """A query still running at the deadline is abandoned."""
+    query = FakeQuery([INFO], delay=10)
+
+    result = asyncio.run(wait_for_state(query, {"status": "Up"},
+                                        deadline=0.2, delays=repeat(0.01)))
+
+    assert not result.converged and result.info is None
+    assert result.polls == 1
+    assert result.elapsed < 1
+
+
+@pytest.mark.parametrize("error", [
+    KeyError("Invalid network adapter index"),
+    OSError("The pipe has been ended"),
+    TimeoutError("'powershell.exe' did not finish in time")])
+def test_failed_queries_are_retried(error):
+    """A query that fails (e.g., while the adapter restarts) is retried."""
+    query = FakeQuery([error, error, INFO])
+
+    result = asyncio.run(wait_for_state(query, {"status": "Up"},
+                                        deadline=5, delays=[0.01] * 5))
+
+    assert result and result.info is INFO
+    assert result.polls == 3
+
+
+def test_delays_exhausted():
+    """The wait also ends when there are no delays left."""
+    query = FakeQuery([ValueError("Unreadable output")])
+
+    result = asyncio.run(wait_for_state(query, {"status": "Up"},
+                                        deadline=5, delays=[0.01, 0.01]))
+
+    assert not result and result.info is None
+    assert result.polls == 2
@@ -0,0 +1,151 @@
+"""Tests of the processes run with timeouts and cancellation"""
+
+from concurrent.futures import CancelledError
+import sys
+import threading
+from time import monotonic, sleep
+
+import pytest
+
+import execution
+
+# Starts a child that sleeps, writes its process identifier and waits
+PARENT_SCRIPT = (
+    "import subprocess, sys, time\n"
+    "child = subprocess.Popen([sys.executable, '-c',"
+    " 'import time; time.sleep(60)'])\n"
+    "print(child.pid, flush=True)\n"
+    "time.sleep(60)\n")
+
+pytestmark = pytest.mark.skipif(
+    execution.psutil is None and not sys.platform.startswith("linux"),
+    reason="Processes can only be checked with psutil or /proc")
+
+
+def is_running(pid: int) -> bool:
+    """Check if a process is running (zombies are not).
+
+    Args:
+        pid (int): Process identifier.
+
+    Returns:
+        bool: True if it is running.
+    """
+    if execution.psutil is not None:
+        try:
+            return (execution.psutil.Process(pid).status()
+                    != execution.psutil.STATUS_ZOMBIE)
+        except execution.psutil.Error:
+            return False
+
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as file:
+            return file.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def wait_until_ended(pid: int, timeout: float = 5) -> bool:
+    """Wait for a process to end.
+
+    Args:
+        pid (int): Process identifier.
+        timeout (float, optional): Seconds to wait. Defaults to 5.
+
+    Returns:
+        bool: True if it has ended.
+    """
+    deadline = monotonic() + timeout
+    while is_running(pid):
+        if monotonic() > deadline:
+            return False
+        sleep(0.05)
+
+    return True
+
+
+def test_timeout_kills_the_tree():
+    """A command that does not finish in time is killed together with the
+    processes it started, and counted as timed out."""
+    before = execution.diagnostics()
+    children = []
+
+    def read_child() -> None:
+        for line in execution.stream([sys.executable, "-c", PARENT_SCRIPT],
+                                     timeout=1):
+            children.append(int(line))
+
+    start = monotonic()
+    with pytest.raises(TimeoutError):
+        read_child()
+    elapsed = monotonic() - start
+
+    after = execution.diagnostics()
+    assert 1 <= elapsed < 5
+    assert len(children) == 1
+    assert wait_until_ended(children[0])
+    assert after.started == before.started + 1
+    assert after.timed_out == before.timed_out + 1
+    assert after.running == before.running
+
+
+def test_run_timeout():
+    """run() raises TimeoutError and does not leave the process running."""
+    before = execution.diagnostics()
+
+    with pytest.raises(TimeoutError):
+        execution.run([sys.executable, "-c", "import time; time.sleep(60)"],
+                      timeout=0.5)
+
+    after = execution.diagnostics()
+    assert after.timed_out == before.timed_out + 1
+    assert after.running == before.running
+    assert after.leaked_processes == before.leaked_processes
+
+
+def test_stream_cancelled():
+    """Cancelling a stream kills its process and raises CancelledError
+    once the lines already written have been read."""
+    before = execution.diagnostics()
+    cancel = execution.CancelToken()
+    lines = []
+
+    with pytest.raises(CancelledError):
+        for line in execution.stream(
+                [sys.executable, "-c",
+                 "import time; print('first', flush=True); time.sleep(60)"],
+                cancel=cancel):
+            lines.append(line.strip())
+            cancel.cancel()
+
+    after = execution.diagnostics()
+    assert lines == [b"first"]
+    assert after.cancelled == before.cancelled + 1
+    assert after.running == before.running
+    with pytest.raises(CancelledError):
+        execution.run([sys.executable, "-c", ""], cancel=cancel)
+
+
+def test_cancel_does_not_wait_for_callbacks(capsys):
+    """The subscribed functions run in another thread, so cancelling
+    returns at once, and their errors are logged."""
+    cancel = execution.CancelToken()
+    called = threading.Event()
+
+    def slow() -> None:
+        sleep(1)
+        called.set()
+
+    def failing() -> None:
+        raise OSError("Access is denied")
+
+    cancel.subscribe(failing)
+    cancel.subscribe(slow)
+    start = monotonic()
+    cancel.cancel()
+    cancel.cancel()
+
+    assert monotonic() - start < 0.5
+    assert cancel.cancelled
+    assert called.wait(5)
+    assert "OSError: Access is denied" in capsys.readouterr().err
@@ -0,0 +1,79 @@
+"""Tests of the IPv4 addresses and subnet masks packed as integers"""
+
+import pytest
+
+import ipv4
+
+
+@pytest.mark.parametrize("ip, packed", [
+    ("192.168.1.10", 0xC0A8010A),
+    ("192.168.001.010", 0xC0A8010A),
+    ("010.000.00.1", 0x0A000001),
+    ("0.0.0.0", 0),
+    ("255.255.255.255", 0xFFFFFFFF)])
+def test_pack(ip, packed):
+    """Octets may have leading zeros up to three digits."""
+    assert ipv4.pack(ip) == packed
+    assert ipv4.unpack(packed) == ipv4.unpack(ipv4.pack(ip))
+
+
+@pytest.mark.parametrize("ip", [
+    "", None, "192.168.1", "192.168.1.10.1", "192.168.1.256",
+    "192.168.0001.1", "192.168..1", "192.168.1.-1", "192.168.1.+1",
+    " 192.168.1.10", "192.168.1.10\n", "0x7f.0.0.1", "1e2.0.0.1"])
+def test_pack_invalid(ip):
+    """Anything that is not four decimal octets is invalid."""
+    assert ipv4.pack(ip) is None
+    assert not ipv4.is_valid(ip)
+
+
+@pytest.mark.parametrize("mask, bits", [
+    ("0.0.0.0", 0),
+    ("128.0.0.0", 1),
+    ("255.255.255.000", 24),
+    ("255.255.255.254", 31),
+    ("255.255.255.255", 32),
+    ("255.0.255.0", None),
+    ("255.255.255.253", None),
+    ("0.255.255.255", None),
+    ("255.255.255", None),
+    ("", None)])
+def test_prefix_length(mask, bits):
+    """Only contiguous masks have a prefix length, from /0 to /32."""
+    assert ipv4.prefix_length(mask) == bits
+    assert ipv4.is_valid_mask(mask) == (bits is not None)
+
+
+def test_subnet_mask():
+    """Prefix lengths are converted back to subnet masks."""
+    assert ipv4.subnet_mask(0) == "0.0.0.0"
+    assert ipv4.subnet_mask(24) == "255.255.255.0"
+    assert ipv4.subnet_mask(32) == "255.255.255.255"
+    assert ipv4.subnet_mask(None) == ""
+    for bits in (-1, 33):
+        with pytest.raises(ValueError):
+            ipv4.subnet_mask(bits)
+
+
+def test_network():
+    """The subnet of /0 is everything and that of /32 (or no prefix
+    length) is the address alone."""
+    ip = ipv4.pack("192.168.1.10")
+
+    assert ipv4.network(ip, 24) == (ipv4.pack("192.168.1.0"),
+                                    ipv4.pack("192.168.1.255"))
+    assert ipv4.network(ip, 0) == (0, 0xFFFFFFFF)
+    assert ipv4.network(ip, 32) == (ip, ip)
+    assert ipv4.network(ip, None) == (ip, ip)
+
+
+def test_invalid_positions():
+    """The positions of every invalid value are returned, repeated
+    values included."""
+    values = ["10.0.0.1", "10.0.0.300", "", "10.0.0.300", "010.0.0.1"]
+
+    assert ipv4.invalid(values) == [1, 2, 3]
+    assert ipv4.invalid(values, allow_empty=True) == [1, 3]
+    assert ipv4.invalid(["255.255.255.0", "255.0.255.0", "", "0.0.0.0"],
+                        masks=True) == [1, 2]
+    assert ipv4.invalid([]) == []
@@ -0,0 +1,161 @@
+"""Tests of the Linux backend over a fake /sys, /proc and /etc tree"""
+
+import os
+
+import pytest
+
+import linux_adapters
+from linux_adapters import LinuxNetworkAdapters
+
+# Interfaces: name -> files of /sys/class/net/<name>
+INTERFACES = {
+    "lo": {"ifindex": "1", "flags": "0x9", "operstate": "unknown",
+           "address": "00:00:00:00:00:00"},
+    "eth0": {"ifindex": "2", "flags": "0x1003", "operstate": "up",
+             "address": "52:54:00:12:34:56"},
+    "br0": {"ifindex": "3", "flags": "0x1003", "operstate": "down",
+            "address": "52:54:00:ab:cd:ef",
+            "uevent": "DEVTYPE=bridge\nINTERFACE=br0\nIFINDEX=3\n"},
+    "eth1": {"ifindex": "4", "flags": "0x1002", "operstate": "down",
+             "address": "52:54:00:00:00:01"},
+    "wg0": {"ifindex": "5", "flags": "0x91", "operstate": "unknown"},
+    "eth2": {"ifindex": "6", "flags": "0x1003", "operstate": "notpresent"},
+}
+
+# /proc/net/route: addresses and masks in little-endian hexadecimal
+ROUTES = (
+    "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask"
+    "\t\tMTU\tWindow\tIRTT\n"
+    "eth0\t00000000\t0101A8C0\t0003\t0\t0\t600\t00000000\t0\t0\t0\n"
+    "eth0\t00000000\tFE01A8C0\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+    "eth0\t0001A8C0\t00000000\t0001\t0\t0\t600\t00FFFFFF\t0\t0\t0\n"
+    "br0\t00000000\t0100000A\t0003\t0\t0\t50\t00000000\t0\t0\t0\n"
+    "br0\t0000000A\t00000000\t0001\t0\t0\t0\t000000FF\t0\t0\t0\n"
+    "veth9\t00000000\t0100A8C0\t0003\t0\t0\t0\t00000000\t0\t0\t0\n"
+)
+
+# Netlink dump: (index, ip, prefix_length, permanent)
+ADDRESSES = [(1, "127.0.0.1", 8, True),
+             (2, "192.168.1.50", 24, False),
+             (2, "192.168.1.10", 24, True),
+             (3, "10.0.0.5", 8, True),
+             (9, "172.16.0.1", 16, True)]
+
+
+def write(root, path: str, text: str) -> None:
+    """Write a file of the fake tree, creating its directories.
+
+    Args:
+        root (pathlib.Path): Root of the tree.
+        path (str): Path relative to the root.
+        text (str): Content.
+    """
+    file = root / path
+    file.parent.mkdir(parents=True, exist_ok=True)
+    file.write_text(text, encoding="utf-8")
+
+
+@pytest.fixture(name="root")
+def fixture_root(tmp_path, monkeypatch):
+    """Fake tree with INTERFACES, ROUTES and a resolv.conf, and the
+    netlink dump replaced by ADDRESSES."""
+    for name, files in INTERFACES.items():
+        for file, text in files.items():
+            write(tmp_path, f"sys/class/net/{name}/{file}", text + "\n")
+    # The driver of a physical network adapter
+    (tmp_path / "sys/bus/pci/drivers/e1000e").mkdir(parents=True)
+    (tmp_path / "sys/class/net/eth0/device").mkdir()
+    os.symlink(tmp_path / "sys/bus/pci/drivers/e1000e",
+               tmp_path / "sys/class/net/eth0/device/driver")
+    write(tmp_path, "proc/net/route", ROUTES)
+    write(tmp_path, "etc/resolv.conf",
+          "# Generated by NetworkManager\nsearch lan\n"
+          "nameserver 9.9.9.9\nnameserver fe80::1\nnameserver 1.1.1.1\n"
+          "nameserver 8.8.8.8\n")
+    monkeypatch.setattr(linux_adapters, "iter_netlink_ipv4",
+                        lambda: iter(ADDRESSES))
+
+    return tmp_path
+
+
+def test_status_from_flags_and_operstate(root):
+    """The loopback interface is skipped, an interface that is not up is
+    disabled and the operational state gives the status of the rest."""
+    info = LinuxNetworkAdapters(root=str(root)).get_info()
+
+    assert list(info) == [2, 3, 4, 5, 6]
+    assert {index: a_info.status for index, a_info in info.items()} == {
+        2: "Up", 3: "Disconnected", 4: "Disabled", 5: "Up",
+        6: "Not Present"}
+    assert info[2].name == "eth0" and info[2].desc == "e1000e"
+    assert info[3].desc == "bridge"
+    assert info[2].mac == "52-54-00-12-34-56"
+    assert info[5].mac == ""
+
+
+def test_addresses_and_gateways(root):
+    """The permanent address is the primary one and, of several default
+    routes, the one with the lowest metric gives the gateway."""
+    info = LinuxNetworkAdapters(root=str(root)).get_info()
+
+    assert info[2].ip == "192.168.1.10"
+    assert info[2].prefix_origin == "Manual"
+    assert [addr.prefix_origin for addr in info[2].addresses] == [
+        "Manual", "Dhcp"]
+    assert info[2].gateway == "192.168.1.254"
+    assert info[3].gateway == "10.0.0.1"
+    assert info[4].gateway == "" and info[4].ip == ""
+
+
+def test_dns_servers(root):
+    """The IPv4 servers of resolv.conf are shown in the network adapters
+    with a default gateway."""
+    info = LinuxNetworkAdapters(root=str(root)).get_info()
+
+    assert (info[2].pref_dns, info[2].alt_dns) == ("9.9.9.9", "1.1.1.1")
+    assert (info[3].pref_dns, info[3].alt_dns) == ("9.9.9.9", "1.1.1.1")
+    assert (info[5].pref_dns, info[5].alt_dns) == ("", "")
+
+
+def test_dns_servers_of_systemd_resolved(root):
+    """The servers of systemd-resolved are used instead of its stub."""
+    write(root, "etc/resolv.conf", "nameserver 127.0.0.53\n")
+    write(root, "run/systemd/resolve/resolv.conf", "nameserver 10.0.0.2\n")
+
+    info = LinuxNetworkAdapters(root=str(root)).get_info()
+
+    assert (info[2].pref_dns, info[2].alt_dns) == ("10.0.0.2", "")
+
+
+def test_failed_sources(root, monkeypatch):
+    """A source that cannot be read is reported in failed_queries and the
+    rest of the information is returned."""
+    def no_netlink():
+        raise PermissionError("Netlink is not available")
+        yield  # pylint: disable=unreachable
+
+    monkeypatch.setattr(linux_adapters, "iter_netlink_ipv4", no_netlink)
+    os.remove(root / "proc/net/route")
+    net = LinuxNetworkAdapters(root=str(root))
+
+    info = net.get_info()
+
+    assert sorted(net.failed_queries) == ["gateway", "ip"]
+    assert info[2].status == "Up" and info[2].ip == ""
+
+
+def test_iter_routes(root):
+    """Routes of interfaces that no longer exist are skipped, and they
+    can be filtered by network adapter index."""
+    net = LinuxNetworkAdapters(root=str(root))
+
+    routes = list(net.iter_routes())
+    eth0 = list(net.iter_routes(index=2))
+
+    assert {route.index for route in routes} == {2, 3}
+    assert len(routes) == 5
+    assert [(route.destination, route.next_hop, route.route_metric)
+            for route in eth0] == [("0.0.0.0/0", "192.168.1.1", 600),
+                                   ("0.0.0.0/0", "192.168.1.254", 100),
+                                   ("192.168.1.0/24", "0.0.0.0", 600)]
+    assert all(route.interface_metric == 0 for route in routes)
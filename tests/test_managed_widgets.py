@@ -0,0 +1,151 @@
+"""Tests of the tooltips and menus updated in place"""
+
+import os
+
+import pytest
+
+from benchmarks import leak_check
+import managed_widgets
+from managed_widgets import ActionMenu, ManagedToolTip
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class FakeMenu:
+    """Menu that records the options sent to Tk."""
+
+    def __init__(self) -> None:
+        self.entries = []  # Options of each entry
+        self.configured = []  # (index, options) of each entryconfigure()
+
+    def add_command(self, **options) -> None:
+        """Add an entry."""
+        self.entries.append(options)
+
+    def entryconfigure(self, index: int, **options) -> None:
+        """Change the options of an entry."""
+        self.configured.append((index, options))
+        self.entries[index].update(options)
+
+    def index(self, index: str) -> int:
+        """Get the index of the last entry."""
+        assert index == "end"
+        return len(self.entries) - 1
+
+
+class FakeWidget:
+    """Widget that records its bindings and pending after() calls."""
+
+    def __init__(self) -> None:
+        self.bindings = []  # (sequence, func, add) of each bind()
+        self.pending = {}  # Id -> function of each pending after()
+
+    def after(self, _delay: int, func) -> str:
+        """Schedule a function."""
+        after_id = f"after#{len(self.pending)}"
+        self.pending[after_id] = func
+        return after_id
+
+    def after_cancel(self, after_id: str) -> None:
+        """Cancel a scheduled function."""
+        del self.pending[after_id]
+
+    def bind(self, sequence: str, func, add: str = "") -> None:
+        """Bind a function to an event."""
+        self.bindings.append((sequence, func, add))
+
+
+class FakeLabel:
+    """Label of the tooltip window."""
+
+    def __init__(self) -> None:
+        self.configured = []  # Options of each configure()
+
+    def configure(self, **options) -> None:
+        """Change the options of the label."""
+        self.configured.append(options)
+
+
+class FakeStyle:
+    """ttk.Style that does not need Tk."""
+
+    def configure(self, *_args, **_kwargs) -> None:
+        """Change a style."""
+
+
+@pytest.fixture(name="menu")
+def fixture_menu() -> ActionMenu:
+    """ActionMenu with a fake menu and two entries, without Tk."""
+    menu = ActionMenu.__new__(ActionMenu)
+    menu.menu = FakeMenu()
+    menu._entries = {}  # pylint: disable=protected-access
+    menu._options = {}  # pylint: disable=protected-access
+    menu.add("enable", "Enable", print)
+    menu.add("dhcp", "Enable DHCP", print)
+    return menu
+
+
+@pytest.fixture(name="tooltip")
+def fixture_tooltip(monkeypatch) -> ManagedToolTip:
+    """ManagedToolTip of a fake widget, without Tk."""
+    monkeypatch.setattr(managed_widgets.ttk, "Style", FakeStyle)
+    return ManagedToolTip(FakeWidget(), "Prefix origin", wraplength=300)
+
+
+def test_set_entry_sends_changed_options(menu):
+    """Only the options that change are sent to Tk."""
+    assert len(menu) == 2
+    assert menu.set_entry("enable", label="Disable", state="normal")
+    assert not menu.set_entry("enable", label="Disable", state="normal")
+    assert menu.set_entry("enable", label="Disable", state="disabled")
+    menu.set_state("disabled")
+
+    assert menu.menu.configured == [
+        (0, {"label": "Disable", "state": "normal"}),
+        (0, {"state": "disabled"}),
+        (1, {"state": "disabled"})]
+    assert menu.entry("enable", "label") == "Disable"
+    assert menu.entry("dhcp", "state") == "disabled"
+
+    with pytest.raises(KeyError):
+        menu.add("dhcp", "Enable DHCP", print)
+
+
+def test_tooltip_bound_once(tooltip):
+    """The functions are added to the existing bindings of the widget."""
+    bound = [(sequence, add) for sequence, _, add in tooltip.widget.bindings]
+    assert bound == [("<Enter>", "+"), ("<Leave>", "+"), ("<Motion>", "+"),
+                     ("<ButtonPress>", "+")]
+
+    tooltip.text = "Dhcp"
+    assert len(tooltip.widget.bindings) == 4
+
+
+def test_tooltip_text(tooltip):
+    """The label is only reconfigured when the text changes, and an empty
+    text cancels the pending show."""
+    # pylint: disable=protected-access
+    tooltip._label = FakeLabel()
+    tooltip.text = "Prefix origin"
+    tooltip.text = "Dhcp"
+    tooltip.text = "Dhcp"
+    assert tooltip._label.configured == [{"text": "Dhcp"}]
+
+    tooltip._label = None
+    tooltip._schedule()
+    assert len(tooltip.widget.pending) == 1
+    tooltip.text = ""
+    assert tooltip.text == "" and not tooltip.widget.pending
+    tooltip._schedule()
+    assert not tooltip.widget.pending
+
+
+def test_leak_check(monkeypatch, capsys):
+    """Refreshing a card many times does not leak Tk or Python objects."""
+    monkeypatch.chdir(ROOT)
+    code = leak_check.check(2000)
+
+    output = capsys.readouterr().out
+    if output.startswith("skipped"):
+        pytest.skip(output.strip())
+    assert code == 0, output
@@ -0,0 +1,85 @@
+"""Tests of importing profiles from CSV files"""
+
+import pytest
+
+from net_adap_profiles import read_profiles_csv
+
+HEADER = "name;ip;mask;gateway;pref_dns;alt_dns\n"
+OFFICE = {"ip": "192.168.1.10", "mask": "255.255.255.0",
+          "gateway": "192.168.1.1", "pref_dns": "1.1.1.1", "alt_dns": ""}
+
+
+def read(*rows: str, profiles: dict = None) -> dict:
+    """Read the rows of a CSV file with a header.
+
+    Args:
+        *rows (str): Rows, delimited by ";".
+        profiles (dict, optional): Existing profiles. Defaults to None.
+
+    Returns:
+        dict: Existing profiles and the new ones.
+    """
+    return read_profiles_csv([HEADER] + [row + "\n" for row in rows], ";",
+                             profiles or {})
+
+
+def test_profiles_read():
+    """Each row is a profile and an empty gateway is saved as
+    0.0.0.0."""
+    profiles = read("Office;192.168.1.10;255.255.255.0;192.168.1.1;"
+                    "1.1.1.1;",
+                    "Lab;10.0.0.5;255.0.0.0;;;8.8.8.8")
+
+    assert profiles == {
+        "Office": OFFICE,
+        "Lab": {"ip": "10.0.0.5", "mask": "255.0.0.0",
+                "gateway": "0.0.0.0", "pref_dns": "", "alt_dns": "8.8.8.8"}}
+    assert read() == {}
+
+
+@pytest.mark.parametrize("row", [
+    "Office;192.168.1.10;255.255.255.0;192.168.1.1;1.1.1.1",
+    "Office;192.168.1.10;255.255.255.0;192.168.1.1;1.1.1.1;;",
+    "Office,192.168.1.10,255.255.255.0,192.168.1.1,1.1.1.1,"])
+def test_invalid_columns(row):
+    """Rows with more or fewer columns (e.g., another delimiter) are
+    rejected."""
+    with pytest.raises(ValueError, match="columns"):
+        read("Lab;10.0.0.5;255.0.0.0;;;", row)
+
+
+@pytest.mark.parametrize("row", [
+    # A valid address does not make an invalid subnet mask valid
+    "Office;192.168.1.10;255.255.256.0;;;",
+    "Office;192.168.1.10;255.0.255.0;;;",
+    "Office;192.168.1.10;192.168.1.10;;;",
+    "Office;192.168.1.10;;;;",
+    "Office;192.168.1.300;255.255.255.0;;;",
+    "Office;;255.255.255.0;;;",
+    "Office;192.168.1.10;255.255.255.0;192.168.1;;",
+    "Office;192.168.1.10;255.255.255.0;;1.1.1.1.1;",
+    "Office;192.168.1.10;255.255.255.0;;;dns.google"])
+def test_invalid_addresses(row):
+    """Any invalid address or subnet mask rejects the whole file."""
+    existing = {"Office": OFFICE}
+
+    with pytest.raises(ValueError, match="address or subnet mask"):
+        read("Lab;10.0.0.5;255.0.0.0;;;", row, profiles=existing)
+    assert existing == {"Office": OFFICE}
+
+
+def test_names_sanitized_before_duplicate_check():
+    """Names are cleaned before checking if they exist, so a profile whose
+    name only differs in removed characters is not overwritten."""
+    existing = {"Office": OFFICE}
+
+    profiles = read("Office!;10.0.0.1;255.0.0.0;;;",
+                    "Off*ice;10.0.0.2;255.0.0.0;;;",
+                    "Lab (2);10.0.0.3;255.0.0.0;;;",
+                    profiles=existing)
+
+    assert profiles["Office"] == OFFICE
+    assert profiles["Office_2"]["ip"] == "10.0.0.1"
+    assert profiles["Office_3"]["ip"] == "10.0.0.2"
+    assert profiles["Lab 2"]["ip"] == "10.0.0.3"
+    assert existing == {"Office": OFFICE}
@@ -0,0 +1,168 @@
+"""Tests of the configuration transactions"""
+
+import pytest
+
+import network_adapters
+from net_config import (CAPTURE_SCRIPT, ROLLBACK_SCRIPTS, ConfigTransaction,
+                        StepResult, TransactionResult, parse_result)
+from powershell import CommandResult
+
+# Output of a transaction whose steps succeeded, as written by
+# ConvertTo-Json -Compress (the keys of a hashtable come in any order)
+SUCCESS_OUTPUT = (
+    b'{"rollback":[],"steps":[{"name":"remove_primary_ip","error":""},'
+    b'{"name":"set_ip_mask","error":""}],"rolled_back":false}\r\n')
+
+# Output of a transaction whose second step failed and was rolled back
+FAILED_OUTPUT = (
+    b'{"rollback":[],"steps":[{"name":"remove_primary_ip","error":""},'
+    b'{"name":"set_ip_mask","error":"PermissionDenied: Acceso denegado."}],'
+    b'"rolled_back":true}\r\n')
+
+# Output of a transaction whose rollback also failed (cp850 message)
+ROLLBACK_OUTPUT = (
+    b'{"rollback":["No se encontr\xa2 la ruta."],"steps":[{"name":'
+    b'"set_def_gateway","error":"InvalidArgument: Direcci\xa2n no v'
+    b'\xa0lida."}],"rolled_back":true}\r\n')
+
+
+class FakeRunner:
+    """Command runner that answers every command with the same output."""
+
+    def __init__(self, stdout: bytes) -> None:
+        self.stdout = stdout  # Output of every command
+        self.commands = []  # Arguments of each command run
+
+    def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Run a command."""
+        # pylint: disable=unused-argument
+        self.commands.append(args)
+        return CommandResult(self.stdout, b"", 0)
+
+
+@pytest.fixture(name="enconding", autouse=True)
+def fixture_enconding(monkeypatch) -> str:
+    """The terminal enconding is already known."""
+    monkeypatch.setattr(network_adapters, "_ENCONDING", "cp850")
+    return "cp850"
+
+
+def test_parse_success(enconding):
+    """All the steps succeeded and nothing was rolled back."""
+    result = parse_result(CommandResult(SUCCESS_OUTPUT, b"", 0), enconding)
+
+    assert result == TransactionResult(
+        [StepResult("remove_primary_ip", ""), StepResult("set_ip_mask", "")],
+        False, [])
+    assert result
+    assert result.error == ""
+    result.raise_for_error()
+
+
+def test_parse_failed_step(enconding):
+    """The failed step keeps its error and the transaction was rolled
+    back."""
+    result = parse_result(CommandResult(FAILED_OUTPUT, b"", 0), enconding)
+
+    assert not result
+    assert result.rolled_back
+    assert result.rollback_errors == []
+    assert bool(result.steps[0]) and not result.steps[1]
+    assert result.error == "PermissionDenied: Acceso denegado."
+
+
+def test_parse_rollback_errors(enconding):
+    """The errors of the rollback are decoded with the enconding."""
+    result = parse_result(CommandResult(ROLLBACK_OUTPUT, b"", 0), enconding)
+
+    assert result.rolled_back
+    assert result.rollback_errors == ["No se encontró la ruta."]
+    assert result.error == "InvalidArgument: Dirección no válida."
+
+
+@pytest.mark.parametrize("stdout", [
+    b"", b"Get-NetIPAddress : Access denied\r\n", b'{"steps": []}',
+    b'{"steps": [{"name": "set_ip_mask"}], "rolled_back": false,'
+    b' "rollback": []}'])
+def test_parse_unreadable(enconding, stdout):
+    """Output that is not a transaction result raises NotImplementedError
+    with the error output of the command."""
+    output = CommandResult(stdout, b"The script could not be parsed.\r\n", 1)
+
+    with pytest.raises(NotImplementedError,
+                       match="could not be parsed.$"):
+        parse_result(output, enconding)
+
+
+@pytest.mark.parametrize("error, exception", [
+    ("PermissionDenied: Access is denied", PermissionError),
+    ("ObjectNotFound: No MSFT_NetAdapter objects found", KeyError),
+    ("InvalidArgument: Invalid parameter", NotImplementedError)])
+def test_raise_for_error(error, exception):
+    """The error of the failed step is mapped to the same exceptions as
+    NetworkAdapters."""
+    result = TransactionResult(
+        [StepResult("reset_dns_servers", ""), StepResult("set_net_dhcp",
+                                                         error)],
+        True, [])
+
+    with pytest.raises(exception):
+        result.raise_for_error()
+
+
+def test_commit():
+    """The whole transaction is run as a single powershell.exe command."""
+    runner = FakeRunner(SUCCESS_OUTPUT)
+    transaction = ConfigTransaction(7, runner=runner)
+    transaction.set_ip_mask("192.168.001.010", "255.255.255.0")
+
+    result = transaction.commit()
+
+    assert result and not result.rolled_back
+    assert runner.commands == [["powershell.exe", transaction.script()]]
+
+
+def test_commit_without_steps():
+    """An empty transaction succeeds without running anything."""
+    runner = FakeRunner(b"")
+
+    assert ConfigTransaction(7, runner=runner).commit() == TransactionResult(
+        [], False, [])
+    assert runner.commands == []
+
+
+def test_set_ip_mask_keeps_secondary_addresses():
+    """Only the primary address is replaced, and the new address is
+    written without leading zeros."""
+    transaction = ConfigTransaction(7)
+    transaction.set_ip_mask("192.168.001.010", "255.255.255.0")
+
+    assert [name for name, _, _ in transaction.steps] == [
+        "remove_primary_ip", "set_ip_mask"]
+    assert "'192.168.1.10'" in transaction.steps[0][2]
+    assert "-IPAddress 192.168.1.10 -PrefixLength 24" in (
+        transaction.steps[1][2])
+
+
+def test_routes_restored_into_their_store():
+    """The default routes are saved from the active and persistent stores
+    and each one is created again in the store it came from."""
+    assert "-PolicyStore $txStore" in CAPTURE_SCRIPT
+    assert "'PersistentStore'" in CAPTURE_SCRIPT
+    assert "Expression = {$txStore}" in CAPTURE_SCRIPT
+
+    rollback = ROLLBACK_SCRIPTS["gateway"]
+    assert "'PersistentStore'" in rollback
+    assert rollback.index("Remove-NetRoute") < rollback.index("New-NetRoute")
+    assert "-PolicyStore $txRoute.Store" in rollback
+    assert "-PolicyStore ActiveStore" not in rollback
+
+
+def test_gateway_rollback_in_script():
+    """The rollback of the gateway runs only if a step has failed."""
+    transaction = ConfigTransaction(7, runner=object())
+    transaction.set_def_gateway("192.168.1.1")
+    script = transaction.script()
+
+    assert script.startswith("$txIdx = 7; " + CAPTURE_SCRIPT)
+    assert ("if ($txFailed) { try { " + ROLLBACK_SCRIPTS["gateway"]) in script
@@ -0,0 +1,106 @@
+"""Tests of the concurrent queries of NetworkAdapters.get_info()"""
+
+from concurrent import futures
+import threading
+from time import monotonic
+
+import pytest
+
+import network_adapters
+from network_adapters import NetworkAdapters
+from powershell import CommandResult
+
+# Output of each query (Format-List) by cmdlet
+OUTPUTS = {
+    "Get-NetAdapter": "ifIndex : 7\r\nName : Ethernet\r\n"
+                      "InterfaceDescription : Intel(R) Ethernet\r\n"
+                      "Status : Up\r\nMacAddress : 00-15-5D-01-02-03\r\n",
+    "Get-NetIPAddress": "InterfaceIndex : 7\r\nIPAddress : 192.168.1.10\r\n"
+                        "PrefixLength : 24\r\nPrefixOrigin : Manual\r\n"
+                        "SuffixOrigin : Manual\r\n",
+    "Get-DnsClientServerAddress": "InterfaceIndex : 7\r\n"
+                                  "ServerAddresses : {1.1.1.1, 8.8.8.8}\r\n",
+    "Get-NetRoute": "ifIndex : 7\r\nNextHop : 192.168.1.1\r\n"
+                    "RouteMetric : 0\r\nInterfaceMetric : 25\r\n",
+}
+
+
+class DelayingRunner:
+    """Runner that answers each query after its own delay. The delays are
+    waited on an event, so that the test can release a query left running
+    after the deadline."""
+
+    def __init__(self, delays: dict) -> None:
+        self.delays = delays  # Seconds by cmdlet
+        self.release = threading.Event()
+
+    def run(self, args: list, timeout: float = None) -> CommandResult:
+        """Wait for the delay of the cmdlet and return its output."""
+        # pylint: disable=unused-argument
+        self.release.wait(self.delays.get(args[1], 0))
+        return CommandResult(OUTPUTS[args[1]].encode("cp850"), b"", 0)
+
+
+@pytest.fixture(name="adapters")
+def fixture_adapters(monkeypatch):
+    """NetworkAdapters factory over a DelayingRunner, with the enconding
+    already detected."""
+    monkeypatch.setattr(network_adapters, "_ENCONDING", "cp850")
+    runners = []
+
+    def create(delays: dict) -> NetworkAdapters:
+        runners.append(DelayingRunner(delays))
+        return NetworkAdapters(runner=runners[-1])
+
+    yield create
+
+    for runner in runners:
+        runner.release.set()
+
+
+def test_queries_run_concurrently(adapters):
+    """get_info() takes about as long as the slowest query, not as long as
+    all of them one after another."""
+    delays = {"Get-NetAdapter": 0.4, "Get-NetIPAddress": 0.3,
+              "Get-DnsClientServerAddress": 0.2, "Get-NetRoute": 0.3}
+    net = adapters(delays)
+
+    start = monotonic()
+    info = net.get_info(snapshot=False)
+    elapsed = monotonic() - start
+
+    assert max(delays.values()) <= elapsed < max(delays.values()) + 0.3
+    assert elapsed < sum(delays.values())
+    assert not net.failed_queries
+    assert info[7]["name"] == "Ethernet"
+    assert info[7]["ip"] == "192.168.1.10"
+    assert info[7]["pref_dns"] == "1.1.1.1"
+    assert info[7]["gateway"] == "192.168.1.1"
+
+
+def test_query_past_deadline(adapters):
+    """A query that does not finish in time is reported in failed_queries
+    and the information of the others is returned at the deadline."""
+    net = adapters({"Get-NetAdapter": 0.1, "Get-NetRoute": 10})
+
+    start = monotonic()
+    info = net.get_info(snapshot=False, timeout=0.5)
+    elapsed = monotonic() - start
+
+    assert 0.5 <= elapsed < 1.5
+    assert list(net.failed_queries) == ["gateway"]
+    assert isinstance(net.failed_queries["gateway"], futures.TimeoutError)
+    assert info[7]["name"] == "Ethernet"
+    assert info[7]["ip"] == "192.168.1.10"
+    assert info[7]["gateway"] == ""
+
+
+def test_failed_queries_reset_by_snapshot(adapters):
+    """A snapshot that succeeds clears the failures of the previous call."""
+    net = adapters({"Get-NetRoute": 10})
+    net.get_info(snapshot=False, timeout=0.2)
+    assert list(net.failed_queries) == ["gateway"]
+
+    net._get_snapshot = dict  # pylint: disable=protected-access
+    assert net.get_info() == {}
+    assert not net.failed_queries
@@ -0,0 +1,309 @@
+"""Tests of the pool of PowerShell sessions with a stand-in process"""
+
+import base64
+from concurrent.futures import CancelledError
+import queue
+import threading
+
+import pytest
+
+import powershell
+from powershell import POWERSHELL, CommandResult, PowerShellPool
+
+
+class FakeSession:
+    """Stand-in for powershell.exe running HOST_SCRIPT: each request line
+    is answered by a handler, called with the decoded script, that returns
+    (returncode, stdout, stderr), None to make the process exit or
+    Ellipsis to never answer (a hung command)."""
+
+    def __init__(self, handler, noise: bool = False) -> None:
+        self.handler = handler
+        self.noise = noise  # Write a line outside the frames first
+        self.stdin = self
+        self.stdout = self
+        self.pid = 0
+        self.returncode = None
+        self._lines = queue.Queue()
+        self._busy = False  # Running a request
+        self._closing = False  # stdin closed while running a request
+
+    def close(self) -> None:
+        """Close stdin: the session loop ends after the running request."""
+        if self._busy:
+            self._closing = True
+        else:
+            self._exit()
+
+    def _exit(self) -> None:
+        if self.returncode is None:
+            self.returncode = 0
+            self._lines.put(b"")
+
+    def flush(self) -> None:
+        """Nothing is buffered."""
+
+    def kill(self) -> None:
+        """End the process."""
+        self._exit()
+
+    def poll(self):
+        """Exit code, None while running."""
+        return self.returncode
+
+    def readline(self) -> bytes:
+        """Next line of stdout (b"" at the end)."""
+        return self._lines.get()
+
+    def wait(self, timeout=None) -> int:  # pylint: disable=unused-argument
+        """Exit code."""
+        return self.returncode
+
+    def write(self, data: bytes) -> None:
+        """Answer a request line."""
+        req_id, request = data.decode().split()
+        self._busy = True
+        try:
+            reply = self.handler(base64.b64decode(request).decode("utf-8"))
+        finally:
+            self._busy = False
+        if reply is None:
+            self._exit()
+            return
+        if reply is Ellipsis:
+            return
+
+        code, out, err = reply
+        if self.noise:
+            self._lines.put(b"WARNING: written outside the loop\r\n")
+        self._lines.put(" ".join([
+            req_id, str(code), base64.b64encode(out).decode(),
+            base64.b64encode(err).decode()]).encode() + b"\r\n")
+        if self._closing:
+            self._exit()
+
+
+class Launcher:
+    """Launcher of FakeSession processes that counts the launches"""
+
+    def __init__(self, handler, noise: bool = False) -> None:
+        self.handler = handler
+        self.noise = noise
+        self.launches = 0
+
+    def __call__(self) -> FakeSession:
+        self.launches += 1
+        return FakeSession(self.handler, self.noise)
+
+
+@pytest.fixture(name="spawned")
+def fixture_spawned(monkeypatch) -> list:
+    """Commands run in a new process instead of a session."""
+    spawned = []
+
+    def run(args, timeout=None, cancel=None):
+        # pylint: disable=unused-argument
+        spawned.append(args)
+        return CommandResult(b"spawned", b"", 0)
+
+    monkeypatch.setattr(powershell.execution, "run", run)
+
+    return spawned
+
+
+def test_framing(spawned):
+    """The script arrives intact and the frame of its request is decoded,
+    skipping the lines written outside the loop."""
+    scripts = []
+
+    def handler(script):
+        scripts.append(script)
+        return 1, "salida\n".encode("cp850"), b"error\n"
+
+    pool = PowerShellPool(launcher=Launcher(handler, noise=True))
+    result = pool.run([POWERSHELL, "Get-NetAdapter", "|", "Format-List"])
+
+    assert scripts == ["Get-NetAdapter | Format-List"]
+    assert result == CommandResult("salida\n".encode("cp850"), b"error\n", 1)
+    assert not spawned
+    pool.close()
+
+
+def test_sessions_are_reused(spawned):
+    """Consecutive commands run in the same session."""
+    launcher = Launcher(lambda script: (0, script.encode(), b""))
+    pool = PowerShellPool(launcher=launcher)
+
+    for number in range(5):
+        assert pool.run([POWERSHELL, str(number)]).stdout == \
+            str(number).encode()
+
+    assert launcher.launches == 1
+    assert not spawned
+    pool.close()
+
+
+def test_retry_on_restarted_session(spawned):
+    """A session that exits is restarted and the command is sent again."""
+    calls = []
+
+    def handler(script):
+        calls.append(script)
+        return None if len(calls) == 1 else (0, b"ok", b"")
+
+    launcher = Launcher(handler)
+    pool = PowerShellPool(launcher=launcher)
+
+    assert pool.run([POWERSHELL, "Get-Date"]).stdout == b"ok"
+    assert calls == ["Get-Date", "Get-Date"]
+    assert launcher.launches == 2
+    assert not spawned
+    pool.close()
+
+
+def test_fallback_after_failures(spawned):
+    """Once the sessions keep failing, every command starts a process."""
+    launcher = Launcher(lambda script: None)
+    pool = PowerShellPool(launcher=launcher)
+
+    for number in range(powershell.MAX_FAILURES):
+        assert pool.run([POWERSHELL, str(number)]).stdout == b"spawned"
+    assert pool.fallback
+
+    launches = launcher.launches
+    pool.run([POWERSHELL, "Get-Date"])
+    assert launcher.launches == launches
+    assert len(spawned) == powershell.MAX_FAILURES + 1
+
+
+def test_launch_error_falls_back(spawned):
+    """powershell.exe cannot be started (e.g., not on Windows)."""
+    def launcher():
+        raise FileNotFoundError(POWERSHELL)
+
+    pool = PowerShellPool(launcher=launcher)
+    for _ in range(powershell.MAX_FAILURES):
+        pool.run([POWERSHELL, "Get-Date"])
+
+    assert pool.fallback
+    assert len(spawned) == powershell.MAX_FAILURES
+
+
+def test_other_programs_are_spawned(spawned):
+    """Only PowerShell commands are run in the sessions."""
+    launcher = Launcher(lambda script: (0, b"", b""))
+    pool = PowerShellPool(launcher=launcher)
+
+    pool.run(["nmap", "-sn", "10.0.0.0/24"])
+
+    assert launcher.launches == 0
+    assert spawned == [["nmap", "-sn", "10.0.0.0/24"]]
+
+
+def test_waiting_caller_wakes_on_fallback(monkeypatch, spawned):
+    """A caller waiting for a busy session is not blocked forever when the
+    pool switches to fallback."""
+    monkeypatch.setattr(powershell, "ACQUIRE_WAIT", 0.05)
+    release = threading.Event()
+
+    def handler(script):
+        if script == "busy":
+            release.wait(5)
+        return 0, script.encode(), b""
+
+    pool = PowerShellPool(size=1, launcher=Launcher(handler))
+    busy = threading.Thread(target=pool.run, args=([POWERSHELL, "busy"],))
+    busy.start()
+    while not pool._sessions:  # pylint: disable=protected-access
+        pass
+
+    results = []
+    waiting = threading.Thread(
+        target=lambda: results.append(pool.run([POWERSHELL, "waiting"])))
+    waiting.start()
+    pool.fallback = True
+    pool.close()
+    waiting.join(2)
+    release.set()
+    busy.join(2)
+
+    assert not waiting.is_alive()
+    assert results[0].stdout == b"spawned"
+
+
+def test_released_session_closed_after_close(spawned):
+    """A session running a command when the pool is closed is terminated
+    when released instead of going back to the idle sessions."""
+    started = threading.Event()
+    release = threading.Event()
+    sessions = []
+
+    def launcher():
+        sessions.append(FakeSession(handler))
+        return sessions[-1]
+
+    def handler(script):
+        started.set()
+        release.wait(5)
+        return 0, script.encode(), b""
+
+    pool = PowerShellPool(size=1, launcher=launcher)
+    busy = threading.Thread(target=pool.run, args=([POWERSHELL, "busy"],))
+    busy.start()
+    started.wait(5)
+    pool.close()
+    release.set()
+    busy.join(2)
+
+    assert sessions[0].poll() is not None
+    assert pool._idle.empty()  # pylint: disable=protected-access
+    assert not spawned
+
+
+def test_scripts_run_in_child_scope():
+    """Each script runs in its own scope with the default error preference,
+    so that a script changing it does not silence the errors of the next
+    ones in the same session."""
+    assert "[scriptblock]::Create($script)" in powershell.HOST_SCRIPT
+    assert "Invoke-Expression" not in powershell.HOST_SCRIPT
+    loop = powershell.HOST_SCRIPT.split("while ($true) {", 1)[1]
+    assert loop.index("$ErrorActionPreference = 'Continue'") < \
+        loop.index("[scriptblock]::Create")
+
+
+
+def test_cancel_kills_the_session(monkeypatch, spawned):
+    """Cancelling a command kills the session running it, without
+    counting it as a failure, and the next command restarts the session."""
+    monkeypatch.setattr(powershell.execution, "kill_tree", lambda pid: 0)
+    started = threading.Event()
+
+    def handler(script):
+        if script == "hung":
+            started.set()
+            return Ellipsis
+        return 0, script.encode(), b""
+
+    launcher = Launcher(handler)
+    pool = PowerShellPool(launcher=launcher)
+    cancel = powershell.CancelToken()
+    errors = []
+
+    def run():
+        try:
+            pool.run([POWERSHELL, "hung"], cancel=cancel)
+        except CancelledError as err:
+            errors.append(err)
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    started.wait(5)
+    cancel.cancel()
+    worker.join(5)
+
+    assert len(errors) == 1
+    assert not pool.fallback
+    assert pool.run([POWERSHELL, "Get-Date"]).stdout == b"Get-Date"
+    assert launcher.launches == 2
+    assert not spawned
+    pool.close()
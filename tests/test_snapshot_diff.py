@@ -0,0 +1,70 @@
+"""Tests of the differences between snapshots of the network adapters"""
+
+from adapter_info import AdapterInfo, IPAddress
+import ipv4
+from snapshot_diff import SnapshotDiff, changed_fields, diff_snapshots
+
+ETHERNET = {"name": "Ethernet", "status": "Up", "mac": "00-15-5D-01-02-03",
+            "ip": "192.168.1.10", "prefix_length": "24",
+            "prefix_origin": "Manual", "suffix_origin": "Manual",
+            "gateway": "192.168.1.1", "pref_dns": "1.1.1.1"}
+
+
+def adapter(index: int = 7, **changes) -> AdapterInfo:
+    """Get the record of a network adapter.
+
+    Args:
+        index (int, optional): Network adapter index. Defaults to 7.
+        **changes: Values that differ from ETHERNET.
+
+    Returns:
+        AdapterInfo: Network adapter record.
+    """
+    return AdapterInfo.from_dict(index, {**ETHERNET, **changes})
+
+
+def test_classification():
+    """Network adapters are added, removed or changed, sorted by index,
+    and those that did not change are not listed."""
+    old = {3: adapter(3), 7: adapter(7), 12: adapter(12), 20: adapter(20)}
+    new = {7: adapter(7), 9: adapter(9), 12: adapter(12, status="Disabled"),
+           1: adapter(1), 20: adapter(20, gateway="")}
+
+    diff = diff_snapshots(old, new)
+
+    assert diff == SnapshotDiff(added=[1, 9], removed=[3],
+                                changed={12: ["status"], 20: ["gateway"]})
+    assert list(diff.changed) == [12, 20]
+
+
+def test_no_differences():
+    """Equal snapshots, or no snapshots at all, have no differences."""
+    old = {7: adapter()}
+
+    assert not diff_snapshots(old, {7: adapter()})
+    assert not diff_snapshots(None, {})
+    assert diff_snapshots(None, old) == SnapshotDiff([7], [], {})
+
+
+def test_addresses_without_suffix():
+    """Addresses are named without the "_int" suffix of the fields."""
+    new = adapter(ip="192.168.1.20", gateway="192.168.1.254",
+                  pref_dns="8.8.8.8", alt_dns="8.8.4.4")
+
+    assert changed_fields(adapter(), new) == [
+        "ip", "gateway", "pref_dns", "alt_dns", "addresses"]
+    assert changed_fields(adapter(), adapter()) == []
+
+
+def test_secondary_addresses():
+    """A change in the secondary addresses alone is reported as
+    "addresses"."""
+    primary = IPAddress(ipv4.pack("192.168.1.10"), 24, "Manual", "Manual")
+    secondary = IPAddress(ipv4.pack("192.168.1.11"), 24, "Manual", "Manual")
+
+    old = adapter(addresses=[primary])
+    new = adapter(addresses=[primary, secondary])
+
+    assert new.ip == old.ip
+    assert changed_fields(old, new) == ["addresses"]
+    assert diff_snapshots({7: old}, {7: new}).changed == {7: ["addresses"]}
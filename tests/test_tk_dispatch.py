@@ -0,0 +1,138 @@
+"""Tests of the queue of updates run in the Tk thread"""
+
+import pytest
+
+import tk_dispatch
+from tk_dispatch import TkDispatcher
+
+STEP = 0.005  # Seconds that each posted function takes (fake clock)
+
+
+class FakeWidget:
+    """Widget whose after() calls are run by the test."""
+
+    def __init__(self) -> None:
+        self.pending = {}  # Id -> (milliseconds, function) of each after()
+        self._ids = 0
+
+    def after(self, delay: int, func) -> str:
+        """Schedule a function."""
+        self._ids += 1
+        after_id = f"after#{self._ids}"
+        self.pending[after_id] = (delay, func)
+        return after_id
+
+    def after_cancel(self, after_id: str) -> None:
+        """Cancel a scheduled function."""
+        del self.pending[after_id]
+
+    def run_next(self) -> int:
+        """Run the oldest scheduled function.
+
+        Returns:
+            int: Its delay in milliseconds.
+        """
+        after_id = next(iter(self.pending))
+        delay, func = self.pending.pop(after_id)
+        func()
+        return delay
+
+
+@pytest.fixture(name="clock")
+def fixture_clock(monkeypatch) -> list:
+    """Fake monotonic clock of the dispatcher ([seconds])."""
+    clock = [0.0]
+    monkeypatch.setattr(tk_dispatch, "monotonic", lambda: clock[0])
+    return clock
+
+
+def test_keyed_updates_are_coalesced():
+    """A keyed function replaces the pending one with the same key and
+    keeps its position; functions without a key are always run."""
+    dispatcher = TkDispatcher(FakeWidget())
+    ran = []
+
+    dispatcher.post(ran.append, "snapshot 1", key="adapters")
+    dispatcher.post(ran.append, "toast")
+    dispatcher.post(ran.append, "snapshot 2", key="adapters")
+    dispatcher.post(ran.append, "scan", key="nmap")
+    dispatcher.post(ran.append, "snapshot 3", key="adapters")
+    dispatcher.post(ran.append, "toast")
+
+    assert len(dispatcher) == 4
+    assert dispatcher.drain() == 4
+    assert ran == ["snapshot 3", "toast", "scan", "toast"]
+
+    dispatcher.post(ran.append, "snapshot 4", key="adapters")
+    dispatcher.drain()
+    assert ran[-1] == "snapshot 4"
+
+
+def test_pump_budget(clock):
+    """Each pump runs functions until its budget is spent and schedules
+    the next one sooner while there are functions left."""
+    widget = FakeWidget()
+    dispatcher = TkDispatcher(widget, interval=20, idle_interval=100,
+                              budget=2 * STEP - STEP / 2)
+    ran = []
+
+    def update(number: int) -> None:
+        clock[0] += STEP
+        ran.append(number)
+
+    for number in range(5):
+        dispatcher.post(update, number)
+    dispatcher.start()
+
+    delays = []
+    for _ in range(3):
+        widget.run_next()
+        delays.append(next(iter(widget.pending.values()))[0])
+        assert len(ran) == min(2 * len(delays), 5)
+
+    assert delays == [20, 20, 100]
+    assert ran == [0, 1, 2, 3, 4]
+    assert (dispatcher.runs, dispatcher.pumps) == (5, 3)
+
+    widget.run_next()
+    assert dispatcher.pumps == 3
+
+
+def test_no_reentry_from_modal_dialogs():
+    """While a function runs (e.g., showing a modal dialog with its own
+    event loop), no pump is scheduled and drain() runs nothing, so the
+    next functions are not run inside it."""
+    widget = FakeWidget()
+    dispatcher = TkDispatcher(widget)
+    ran = []
+
+    def dialog() -> None:
+        ran.append("dialog")
+        assert not widget.pending
+        assert dispatcher.drain() == 0
+        ran.append("closed")
+
+    dispatcher.post(dialog)
+    dispatcher.post(ran.append, "update")
+    dispatcher.start()
+    widget.run_next()
+
+    assert ran == ["dialog", "closed", "update"]
+    assert len(widget.pending) == 1
+
+
+def test_close_leaves_nothing_scheduled():
+    """Closing stops the pump and discards the pending functions, also
+    when a function closes the dispatcher."""
+    widget = FakeWidget()
+    dispatcher = TkDispatcher(widget)
+    dispatcher.post(dispatcher.close)
+    dispatcher.post(print, "discarded")
+    dispatcher.start()
+
+    widget.run_next()
+
+    assert not widget.pending
+    assert len(dispatcher) == 0
+    dispatcher.post(print, "ignored")
+    assert len(dispatcher) == 0
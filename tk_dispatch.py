@@ -0,0 +1,178 @@
+"""Run the updates of the background threads in the Tk thread
+
+Tk widgets must only be used from the thread running the main loop.
+Background threads post functions to the dispatcher, which keeps them in
+a thread-safe queue drained by an after() pump in the Tk thread. Each
+pump runs the pending functions for up to BUDGET seconds, so a burst of
+small updates is applied in a few frames without freezing the window.
+Functions posted with a key replace the pending one with the same key
+(e.g., only the last snapshot of the network adapters is shown).
+"""
+
+from collections import deque
+import threading
+from time import monotonic
+import tkinter as tk
+import traceback
+from typing import Callable, Hashable
+
+INTERVAL = 20  # Milliseconds between pumps while there are updates
+IDLE_INTERVAL = 100  # Milliseconds between pumps while there are none
+BUDGET = 0.008  # Seconds of updates run by each pump
+
+_DISPATCHER = None  # Dispatcher of the application (see get_dispatcher())
+_DISPATCHER_LOCK = threading.Lock()
+
+
+class TkDispatcher:
+    """Queue of functions to run in the Tk thread, posted from any thread"""
+
+    def __init__(self, widget, interval: int = INTERVAL,
+                 idle_interval: int = IDLE_INTERVAL,
+                 budget: float = BUDGET) -> None:
+        self.widget = widget  # Any Tk widget, used for after()
+        self.interval = interval
+        self.idle_interval = idle_interval
+        self.budget = budget
+        self.runs = 0  # Functions run
+        self.pumps = 0  # Pumps that ran at least one function
+        self._queue = deque()  # (key, function, args) in order
+        self._keyed = {}  # Key -> (function, args) of the pending updates
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._closed = False
+        self._draining = False  # drain() is running (not re-entered)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def close(self) -> None:
+        """Stop the pump. The pending functions are discarded."""
+        self._closed = True
+        if self._after_id is not None:
+            try:
+                self.widget.after_cancel(self._after_id)
+            except tk.TclError:
+                pass
+            self._after_id = None
+
+        with self._lock:
+            self._queue.clear()
+            self._keyed.clear()
+
+    def drain(self, budget: float = None) -> int:
+        """Run the pending functions. Must be called from the Tk thread.
+        A call from one of the functions (e.g., from the event loop of a
+        modal dialog) runs nothing, so the functions never run nested.
+
+        Args:
+            budget (float, optional): Seconds after which the remaining
+                functions are left for the next pump (at least one is
+                run). Defaults to None (all).
+
+        Returns:
+            int: Functions run.
+        """
+        if self._draining:
+            return 0
+
+        deadline = None if budget is None else monotonic() + budget
+        ran = 0
+        self._draining = True
+        try:
+            while True:
+                with self._lock:
+                    if not self._queue:
+                        break
+                    key, func, args = self._queue.popleft()
+                    if key is not None:
+                        func, args = self._keyed.pop(key)
+
+                try:
+                    func(*args)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    traceback.print_exc()
+                ran += 1
+
+                if deadline is not None and monotonic() >= deadline:
+                    break
+        finally:
+            self._draining = False
+
+        self.runs += ran
+
+        return ran
+
+    def post(self, func: Callable, *args, key: Hashable = None) -> None:
+        """Run a function in the Tk thread. Can be called from any thread.
+
+        Args:
+            func (Callable): Function that updates the widgets.
+            *args: Arguments of the function.
+            key (Hashable, optional): Identifier of the state updated by
+                the function. A pending function with the same key is
+                replaced, keeping its position. Defaults to None (always
+                run).
+        """
+        with self._lock:
+            if self._closed:
+                return
+            if key is None:
+                self._queue.append((None, func, args))
+            else:
+                if key not in self._keyed:
+                    self._queue.append((key, None, None))
+                self._keyed[key] = (func, args)
+
+    def _pump(self) -> None:
+        """Run the pending functions (in the Tk thread) until the budget
+        is spent, then schedule the next pump. While a function shows a
+        modal dialog, the updates wait until it returns instead of running
+        inside it."""
+        self._after_id = None
+        if self._closed:
+            return
+
+        try:
+            if self.drain(self.budget):
+                self.pumps += 1
+        finally:
+            if not self._closed and self._after_id is None:
+                try:
+                    self._after_id = self.widget.after(
+                        self.interval if len(self) else self.idle_interval,
+                        self._pump)
+                except tk.TclError:  # The widget has been destroyed
+                    pass
+
+    def start(self) -> None:
+        """Start the pump. Must be called from the Tk thread."""
+        self._closed = False
+        if self._after_id is None:
+            self._after_id = self.widget.after(self.interval, self._pump)
+
+
+def get_dispatcher(widget=None) -> TkDispatcher:
+    """Get the dispatcher of the application, creating and starting it the
+    first time (from the Tk thread).
+
+    Args:
+        widget (optional): Tk widget that runs the pump. Only needed the
+            first time. Defaults to None.
+
+    Raises:
+        RuntimeError: The dispatcher has not been created yet.
+
+    Returns:
+        TkDispatcher: Shared dispatcher.
+    """
+    global _DISPATCHER  # pylint: disable=global-statement
+    with _DISPATCHER_LOCK:
+        if _DISPATCHER is None:
+            if widget is None:
+                raise RuntimeError("The Tk dispatcher has not been created")
+            _DISPATCHER = TkDispatcher(widget)
+            _DISPATCHER.start()
+
+    return _DISPATCHER